@@ -6,35 +6,83 @@
 """
 
 from ._version import __version__ as version
-from .analytics import AnalyzerFacade
+from .analytics import AnalysisSpec, AnalyzerFacade
 from .authentication.auth import CalendarAuth
+from .collecting.cache import EventCache
 from .collecting.collector import AsyncCalendarDataCollector
-from .processing.transformer import (AsyncDataTransformer,
-                                     EventDurationPeriodsStrategy,
-                                     ManyEventsDurationStrategy,
-                                     OneEventDurationStrategy)
-from .visualization.visual_design import (VisualDesign, base_plot_design,
-                                          pastel_palette)
-from .visualization.visualizer_factory import (BarPlot, LinePlot,
-                                               MultyLinePlot, PiePlot,
-                                               PlotFactory)
+from .collecting.decoding import EventRecord
+from .collecting.pool import PoolStats, SessionPool
+from .collecting.scheduler import RequestScheduler, SchedulerStats, TokenBucket
+from .collecting.store import EventChanges, EventStore
+from .processing.columnar import EventColumns
+from .processing.intervals import (
+    BusyTimeStrategy,
+    ConcurrencyStrategy,
+    FreeTimeStrategy,
+    IntervalTotalsStrategy,
+    OverlapStrategy,
+)
+from .processing.memo import TransformCache, TransformCacheStats
+from .processing.online import DailyTotals, PeriodTotals, SummaryTotals
+from .processing.rollup import RollupIndex
+from .processing.summary_index import SummaryIndex
+from .processing.transformer import (
+    AsyncDataTransformer,
+    EventDurationPeriodsStrategy,
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+from .reports import ReportJob, run_reports
+from .visualization.visual_design import VisualDesign, base_plot_design, pastel_palette
+from .visualization.visualizer_factory import (
+    BarPlot,
+    LinePlot,
+    MultyLinePlot,
+    PiePlot,
+    PlotFactory,
+)
 
 __all__ = [
+    "AnalysisSpec",
     "AnalyzerFacade",
     "AsyncCalendarDataCollector",
     "AsyncDataTransformer",
     "BarPlot",
+    "BusyTimeStrategy",
     "CalendarAuth",
+    "ConcurrencyStrategy",
+    "DailyTotals",
+    "EventCache",
+    "EventChanges",
+    "EventColumns",
     "EventDurationPeriodsStrategy",
+    "EventRecord",
+    "EventStore",
+    "FreeTimeStrategy",
+    "IntervalTotalsStrategy",
     "LinePlot",
     "ManyEventsDurationStrategy",
     "MultyLinePlot",
     "OneEventDurationStrategy",
+    "OverlapStrategy",
+    "PeriodTotals",
     "PiePlot",
     "PlotFactory",
+    "PoolStats",
+    "ReportJob",
+    "RequestScheduler",
+    "RollupIndex",
+    "SchedulerStats",
+    "SessionPool",
+    "SummaryIndex",
+    "SummaryTotals",
+    "TokenBucket",
+    "TransformCache",
+    "TransformCacheStats",
     "VisualDesign",
     "base_plot_design",
     "pastel_palette",
+    "run_reports",
 ]
 
 __author__ = "Berupor"
@@ -9,30 +9,154 @@ required by the plotting functions. The plotting is done by creating instances o
 The AnalyzerFacade class provides three methods for analyzing events: `analyze_one`,
 `analyze_many`, and `analyze_one_with_periods`. The `analyze_one` method analyzes a single
 event, the analyze_many method analyzes multiple events, and the analyze_one_with_periods
-method analyzes a single event over a period of time.
+method analyzes a single event over a period of time. The `analyze_batch` method runs
+several analyses, described by AnalysisSpec objects, on a single collection of events.
+Given an executor, the facade keeps collecting on the event loop and aggregates and plots
+the events in the executor's worker processes.
 
 The AnalyzerBuilder class is a builder class that allows for creating instances of the
 AnalyzerFacade class with different options.
 
 """
+
+import asyncio
 import ssl
-from datetime import datetime
-from typing import Type
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime
+from typing import Callable, Type
 
 import aiohttp
 import certifi
+import pandas as pd
 import plotly.graph_objs as go
 from google.oauth2.credentials import Credentials  # type: ignore
 
+from .collecting.cache import EventCache
 from .collecting.collector import AsyncCalendarDataCollector
+from .collecting.endpoints import BASE_URL
+from .collecting.pool import SessionPool
+from .collecting.scheduler import RequestScheduler
+from .collecting.store import EventStore, as_utc
 from .core import exceptions
-from .processing.transformer import (EventDurationPeriodsStrategy,
-                                     EventDurationStrategy,
-                                     ManyEventsDurationStrategy,
-                                     OneEventDurationStrategy)
+from .processing.columnar import EventColumns
+from .processing.intervals import (
+    BusyTimeStrategy,
+    ConcurrencyStrategy,
+    FreeTimeStrategy,
+    IntervalStrategy,
+    IntervalTotalsStrategy,
+    OverlapStrategy,
+)
+from .processing.memo import TransformCache, event_fingerprint
+from .processing.summary_index import MATCH_MODES, SummaryIndex
+from .processing.transformer import (
+    PERIOD_MODES,
+    EventDurationPeriodsStrategy,
+    EventDurationStrategy,
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
 from .visualization.visual_design import VisualDesign, base_plot_design
 from .visualization.visualizer_factory import PlotFactory
 
+STRATEGIES: dict[str, Type[EventDurationStrategy]] = {
+    "one": OneEventDurationStrategy,
+    "many": ManyEventsDurationStrategy,
+    "one_with_periods": EventDurationPeriodsStrategy,
+    "busy": BusyTimeStrategy,
+    "overlap": OverlapStrategy,
+    "concurrency": ConcurrencyStrategy,
+    "free_time": FreeTimeStrategy,
+    "intervals": IntervalTotalsStrategy,
+}
+
+PLOT_TYPES = {
+    "one": ("Line",),
+    "many": ("Bar", "Pie"),
+    "one_with_periods": ("MultyLine",),
+    "busy": ("Line",),
+    "overlap": ("Line",),
+    "concurrency": ("Line",),
+    "free_time": ("Line",),
+    "intervals": ("Bar", "Pie"),
+}
+
+
+@dataclass(frozen=True)
+class AnalysisSpec:
+    """
+    The description of one analysis of `AnalyzerFacade.analyze_batch`.
+
+    Attributes:
+        method (str): One of 'one', 'many' or 'one_with_periods', like the `analyze_*` methods,
+            or one of the interval analyses: 'busy', 'overlap', 'concurrency' and 'free_time'
+            per day, and 'intervals' for the busy, double-booked and free hours of the range.
+        start_time (datetime): The start time for the analysis.
+        end_time (datetime): The end time for the analysis.
+        plot_type (str): The type of plot to generate.
+        event_name (str, optional): The event to analyze, for the 'one' and 'one_with_periods' methods.
+        match (str): How summaries are matched against `event_name`: "exact", "casefold",
+            "normalized", "prefix" or "regex".
+        max_events (int): The maximum number of events, for the 'many' method.
+        ascending (bool): If True, show the shortest events, for the 'many' method.
+        other (bool): If True, add an "Other" bucket with the remaining events, for the 'many' method.
+        period_days (int): The number of days in each period, for the 'one_with_periods' method.
+        num_periods (int): The number of periods, for the 'one_with_periods' method.
+        reference_date (date, optional): The last day of the periods, for the 'one_with_periods'
+            method. Defaults to the Monday of the current week for rolling periods and to today otherwise.
+        period_mode (str): "rolling", "week" or "month", for the 'one_with_periods' method.
+        timezone (str): The timezone of the days, for the interval analyses.
+        work_hours (tuple[float, float]): The working hours free time is measured in, for
+            the interval analyses.
+        style_class (VisualDesign): The style of the plot.
+    """
+
+    method: str
+    start_time: datetime
+    end_time: datetime
+    plot_type: str
+    event_name: str | None = None
+    match: str = "exact"
+    max_events: int = 5
+    ascending: bool = False
+    other: bool = False
+    period_days: int = 7
+    num_periods: int = 2
+    reference_date: date | None = None
+    period_mode: str = "rolling"
+    timezone: str = "UTC"
+    work_hours: tuple[float, float] = (9, 18)
+    style_class: VisualDesign = field(default_factory=lambda: base_plot_design)
+
+    def __post_init__(self):
+        if self.method not in STRATEGIES:
+            raise ValueError("Invalid method specified")
+        if self.plot_type not in PLOT_TYPES[self.method]:
+            raise exceptions.InvalidPlotTypeError(
+                self.plot_type, method=f"analyze_{self.method}"
+            )
+        if self.method in ("one", "one_with_periods") and self.event_name is None:
+            raise ValueError(f"The '{self.method}' method requires an event_name")
+        if self.period_mode not in PERIOD_MODES:
+            raise ValueError(f"Invalid period mode: '{self.period_mode}'")
+        if self.match not in MATCH_MODES:
+            raise ValueError(f"Invalid match: '{self.match}'")
+
+    def params(self) -> tuple:
+        """Return the parameters the data of the analysis depends on, without its plot."""
+        params = {
+            spec_field.name: getattr(self, spec_field.name)
+            for spec_field in fields(self)
+            if spec_field.name not in ("plot_type", "style_class")
+        }
+        # The default reference date moves with the current day.
+        if params["reference_date"] is None and self.method == "one_with_periods":
+            params["reference_date"] = (
+                EventDurationPeriodsStrategy.default_reference_date(self.period_mode)
+            )
+        return tuple(params.items())
+
 
 class AnalyzerFacade:
     """
@@ -46,12 +170,30 @@ class AnalyzerFacade:
 
     Args:
         creds (Credentials): Google credentials class instance.
+        store (EventStore, optional): An event store shared between sessions. When given,
+            events are collected with incremental sync instead of being downloaded on every call.
+        cache (EventCache, optional): A persistent event cache. When given, only the parts of a
+            time range that are not cached yet are downloaded.
+        scheduler (RequestScheduler, optional): The scheduler that throttles and retries the
+            API requests. Share one scheduler between facades to enforce a project-wide rate.
+        pool (SessionPool, optional): A connection pool to borrow the HTTP session from.
+            By default every facade opens and closes a session of its own.
+        base_url (str, optional): The root of the Calendar API, e.g. a local mock server.
+        expand_recurring (bool): If True, recurring events are expanded locally from their
+            master events instead of being downloaded instance by instance.
+        executor (Executor, optional): An executor, typically a ProcessPoolExecutor, that
+            aggregates and plots the collected events. The events are sent to it as
+            EventColumns. By default this work runs on the event loop.
+        transform_cache (TransformCache, optional): A cache of analysis results, so analyses
+            of events that did not change are not recomputed. Not used with an executor,
+            whose workers do not share memory with the facade.
 
     Attributes:
         creds (Credentials): An instance of the Credentials class.
-        plot_type (str): The type of chart to be generated.
-        max_events (int): The maximum number of events to be analyzed.
-        ascending (bool): If True, sort the events in ascending order of duration.
+        store (EventStore): The event store used for incremental collection, if any.
+        cache (EventCache): The event cache used for collection, if any.
+        scheduler (RequestScheduler): The scheduler of the API requests, if one was given.
+        pool (SessionPool): The connection pool the session is borrowed from, if any.
         data_collector (AsyncCalendarDataCollector): An instance of the CalendarDataCollector class.
 
     Examples:
@@ -84,29 +226,65 @@ class AnalyzerFacade:
         period_days=period_days,
         num_periods=num_periods,
         )
+
+        # Run several analyses on a single collection of events
+        figures = await analyzer.analyze_batch([
+            AnalysisSpec("one", start_time, end_time, "Line", event_name="Meeting"),
+            AnalysisSpec("many", start_time, end_time, "Pie"),
+        ])
         ```
+
+    The facade keeps no state between calls, so analyses can run concurrently on one facade.
     """
 
-    def __init__(self, creds: Credentials):
-        self.style_class = None
+    def __init__(
+        self,
+        creds: Credentials,
+        store: EventStore | None = None,
+        cache: EventCache | None = None,
+        scheduler: RequestScheduler | None = None,
+        pool: SessionPool | None = None,
+        base_url: str = BASE_URL,
+        expand_recurring: bool = False,
+        executor: Executor | None = None,
+        transform_cache: TransformCache | None = None,
+    ):
         self.creds = creds
-        self.plot_type = "Line"
-        self.max_events = 5
-        self.ascending = False
+        self.store = store
+        self.cache = cache
+        self.scheduler = scheduler
+        self.pool = pool
+        self.base_url = base_url
+        self.expand_recurring = expand_recurring
+        self.executor = executor
+        self.transform_cache = transform_cache
 
         self.session = None
         self.data_collector = None
 
     async def __aenter__(self):
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        self.session = aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(ssl=ssl_context)
+        if self.pool is not None:
+            self.session = self.pool.acquire()
+        else:
+            ssl_context = ssl.create_default_context(cafile=certifi.where())
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=ssl_context)
+            )
+        self.data_collector = AsyncCalendarDataCollector(
+            self.creds,
+            self.session,
+            store=self.store,
+            cache=self.cache,
+            scheduler=self.scheduler,
+            base_url=self.base_url,
+            expand_recurring=self.expand_recurring,
         )
-        self.data_collector = AsyncCalendarDataCollector(self.creds, self.session)
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if self.session:
+        if self.pool is not None:
+            self.pool.release()
+        elif self.session:
             await self.session.close()
 
         self.session = None
@@ -119,7 +297,8 @@ class AnalyzerFacade:
         event_name: str,
         plot_type: str,
         style_class: VisualDesign = base_plot_design,
-        **kwargs
+        match: str = "exact",
+        **kwargs,
     ) -> go.Figure:
         """
         Analyze a single event and generate a plot.
@@ -132,13 +311,15 @@ class AnalyzerFacade:
             event_name (str): The name of the event to analyze.
             plot_type (str): The type of plot to generate.
             style_class (Type[VisualDesign]): The class that defines the style of the plot.
+            match (str): How event summaries are matched against `event_name`: "exact",
+                "casefold", "normalized", "prefix" or "regex". Defaults to "exact".
             **kwargs: Additional keyword arguments for the plot creation.
 
         Returns:
             go.Figure: The plot generated by the PlotFactory.
 
         Raises:
-            None
+            InvalidPlotTypeError: If the plot type cannot be used for the analysis.
 
         Examples:
             To analyze a single event from March 1, 2023 to March 18, 2023 with the name "Meeting" and generate a plot, use:
@@ -151,19 +332,20 @@ class AnalyzerFacade:
             plot = await analyzer.analyze_one(start_time, end_time, event_name)
             ```
         """
-        if plot_type not in ("Line",):
-            raise exceptions.InvalidPlotTypeError(self.plot_type, method="analyze_one")
-
-        self.style_class = style_class
-        self.plot_type = plot_type
-
-        return await self._analyze(
-            start_time=start_time,
-            end_time=end_time,
-            event_name=event_name,
-            method="one",
-            transformer_strategy=OneEventDurationStrategy(),
+        (figure,) = await self.analyze_batch(
+            [
+                AnalysisSpec(
+                    "one",
+                    start_time,
+                    end_time,
+                    plot_type,
+                    event_name=event_name,
+                    match=match,
+                    style_class=style_class,
+                )
+            ]
         )
+        return figure
 
     async def analyze_many(
         self,
@@ -173,7 +355,9 @@ class AnalyzerFacade:
         max_events: int = 5,
         ascending=False,
         style_class: VisualDesign = base_plot_design,
-        **kwargs
+        calendar_ids: list[str] | None = None,
+        other: bool = False,
+        **kwargs,
     ) -> go.Figure:
         """
         Analyze multiple calendar events and generate a plot of their durations.
@@ -185,13 +369,17 @@ class AnalyzerFacade:
             max_events (int): The maximum number of events to analyze.
             ascending (bool): If True, sort the events in ascending order of duration.
             style_class (Type[VisualDesign]): The class that defines the style of the plot.
+            calendar_ids (list[str], optional): The calendars to aggregate events across.
+                Defaults to the primary calendar only.
+            other (bool): If True, add an "Other" bucket with the total duration of the
+                remaining events.
             **kwargs: Additional keyword arguments for the plot creation.
 
         Returns:
             go.Figure: The plot generated by the PlotFactory.
 
         Raises:
-            None
+            InvalidPlotTypeError: If the plot type cannot be used for the analysis.
 
         Examples:
             ```
@@ -203,20 +391,22 @@ class AnalyzerFacade:
             ```
         """
 
-        if plot_type not in ("Bar", "Pie"):
-            raise exceptions.InvalidPlotTypeError(self.plot_type, method="analyze_many")
-
-        self.style_class = style_class
-        self.plot_type = plot_type
-        self.max_events = max_events
-        self.ascending = ascending
-
-        return await self._analyze(
-            start_time=start_time,
-            end_time=end_time,
-            method="many",
-            transformer_strategy=ManyEventsDurationStrategy(),
+        (figure,) = await self.analyze_batch(
+            [
+                AnalysisSpec(
+                    "many",
+                    start_time,
+                    end_time,
+                    plot_type,
+                    max_events=max_events,
+                    ascending=ascending,
+                    other=other,
+                    style_class=style_class,
+                )
+            ],
+            calendar_ids=calendar_ids,
         )
+        return figure
 
     async def analyze_one_with_periods(
         self,
@@ -227,7 +417,10 @@ class AnalyzerFacade:
         period_days: int = 7,
         num_periods: int = 2,
         style_class: VisualDesign = base_plot_design,
-        **kwargs
+        reference_date: date | None = None,
+        period_mode: str = "rolling",
+        match: str = "exact",
+        **kwargs,
     ) -> go.Figure:
         """
         Analyze a single event over multiple periods of time and generate a plot.
@@ -241,6 +434,13 @@ class AnalyzerFacade:
             period_days (int, optional): The number of days in each period. Defaults to 7.
             num_periods (int, optional): The number of periods to analyze. Defaults to 2.
             plot_type (str): The type of plot to generate.
+            reference_date (date, optional): The last day of the analysis. Defaults to the Monday
+                of the current week for rolling periods and to today otherwise. Pass it to get
+                reproducible results.
+            period_mode (str, optional): "rolling" for periods of `period_days` days, "week" for
+                ISO weeks or "month" for calendar months. Defaults to "rolling".
+            match (str, optional): How event summaries are matched against `event_name`:
+                "exact", "casefold", "normalized", "prefix" or "regex". Defaults to "exact".
             style_class (Type[VisualDesign]): The class that defines the style of the plot.
             **kwargs: Additional keyword arguments for the plot creation.
 
@@ -248,7 +448,7 @@ class AnalyzerFacade:
             go.Figure: The plot generated by the PlotFactory.
 
         Raises:
-            None
+            InvalidPlotTypeError: If the plot type cannot be used for the analysis.
 
         Examples:
             To analyze a single event named "Meeting" from March 1, 2023 to March 31, 2023 over two periods of 7 days and generate a plot, use:
@@ -263,88 +463,249 @@ class AnalyzerFacade:
             plot = await analyzer.analyze_one_with_periods(start_time, end_time, event_name, period_days, num_periods)
             ```
         """
-        if plot_type not in ("MultyLine",):
-            raise exceptions.InvalidPlotTypeError(
-                self.plot_type, method="analyze_one_with_periods"
-            )
-
-        self.style_class = style_class
-        self.plot_type = plot_type
-
-        return await self._analyze(
-            start_time=start_time,
-            end_time=end_time,
-            event_name=event_name,
-            method="one_with_periods",
-            period_days=period_days,
-            num_periods=num_periods,
-            transformer_strategy=EventDurationPeriodsStrategy(),
+        (figure,) = await self.analyze_batch(
+            [
+                AnalysisSpec(
+                    "one_with_periods",
+                    start_time,
+                    end_time,
+                    plot_type,
+                    event_name=event_name,
+                    period_days=period_days,
+                    num_periods=num_periods,
+                    reference_date=reference_date,
+                    period_mode=period_mode,
+                    match=match,
+                    style_class=style_class,
+                )
+            ]
         )
+        return figure
 
-    async def _analyze(
+    async def analyze_batch(
         self,
-        start_time: datetime,
-        end_time: datetime,
-        transformer_strategy: EventDurationStrategy,
-        event_name: str = None,  # type: ignore
-        method: str = "one",
-        period_days: int = 7,
-        num_periods: int = 2,
-        **kwargs
-    ) -> go.Figure:
+        specs: list[AnalysisSpec],
+        calendar_ids: list[str] | None = None,
+    ) -> list[go.Figure]:
         """
-        Analyzes calendar events data and creates a plot using the specified method.
+        Run several analyses on a single collection of events.
+
+        The events of the union of the time ranges of the analyses are collected and
+        normalized once, and every analysis aggregates the events of its own time range.
+        A report of six charts makes one collection instead of six.
 
         Args:
-            start_time (datetime): The start time for the analysis.
-            end_time (datetime): The end time for the analysis.
-            event_name (str, optional): The name of the event to analyze. Required for the 'one' and 'one_with_periods' methods. Defaults to None.
-            transformer_strategy (DataTransformerStrategy): The strategy to use for data transformation.
-            method (str, optional): The method to use for analysis. Must be one of 'one', 'many', or 'one_with_periods'. Defaults to 'one'.
-            period_days (int, optional): The number of days in each period. Required for the 'one_with_periods' method. Defaults to 7.
-            num_periods (int, optional): The number of periods to analyze. Required for the 'one_with_periods' method. Defaults to 2.
-            **kwargs: Additional keyword arguments for the plot creation.
+            specs (list[AnalysisSpec]): The analyses to run.
+            calendar_ids (list[str], optional): The calendars to aggregate events across.
+                Defaults to the primary calendar only.
 
         Returns:
-            go.Figure: The plot generated by the PlotFactory.
+            list[go.Figure]: The plot of every analysis, in the order of `specs`.
 
         Raises:
-            ValueError: If an invalid method is specified.
+            NotEnoughDataError: If an analysis over periods does not have enough data.
+
+        Examples:
+            ```
+            start_time = datetime(2023, 3, 1, tzinfo=pytz.UTC)
+            end_time = datetime(2023, 3, 31, tzinfo=pytz.UTC)
+            pie, line = await analyzer.analyze_batch([
+                AnalysisSpec("many", start_time, end_time, "Pie"),
+                AnalysisSpec("one", start_time, end_time, "Line", event_name="Meeting"),
+            ])
+            ```
         """
-        plot_creator = await PlotFactory(
-            plot_type=self.plot_type,
-            style_class=self.style_class,
+        if not specs:
+            return []
+
+        start_time = min((spec.start_time for spec in specs), key=as_utc)
+        end_time = max((spec.end_time for spec in specs), key=as_utc)
+        strategies = [STRATEGIES[spec.method]() for spec in specs]
+        fields = tuple(
+            dict.fromkeys(
+                field for strategy in strategies for field in strategy.required_fields
+            )
         )
+        # Cached results are keyed by the etags of the events, which change on every
+        # modification, so the events are only normalized when a result is missing.
+        memoize = self.transform_cache is not None and self.executor is None
+        if memoize:
+            fields += ("etag", "updated")
+
+        if calendar_ids:
+            calendar_events = await self.data_collector.collect_many(
+                start_time=start_time,
+                end_time=end_time,
+                calendar_ids=calendar_ids,
+                fields=fields,
+                flat=not memoize,
+            )
+        else:
+            calendar_events = await self.data_collector.collect_data(
+                start_time=start_time,
+                end_time=end_time,
+                fields=fields,
+                flat=not memoize,
+            )
 
-        calendar_events = await self.data_collector.collect_data(
-            start_time=start_time,
-            end_time=end_time,
+        # Batches that only look at one event only need to normalize that event.
+        names = {spec.event_name for spec in specs}
+        exact = all(spec.match == "exact" for spec in specs)
+        summary = names.pop() if len(names) == 1 and exact else None
+        # Untitled events still block time, so the interval analyses count them.
+        untitled = any(
+            isinstance(strategy, IntervalStrategy) for strategy in strategies
         )
 
-        if method == "one":
-            event_durations = await transformer_strategy.calculate_duration(
-                events=calendar_events, event_name=event_name
+        if self.executor is None:
+            return await _render(
+                specs,
+                lambda: EventColumns.from_events(
+                    calendar_events, summary=summary, untitled=untitled
+                ).to_frame(),
+                start_time,
+                end_time,
+                transform_cache=self.transform_cache,
+                fingerprint=event_fingerprint(calendar_events) if memoize else "",
             )
-            return await plot_creator.plot(
-                events=event_durations, event_name=event_name
+        columns = EventColumns.from_events(
+            calendar_events, summary=summary, untitled=untitled
+        )
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, render_batch, specs, columns, start_time, end_time
+        )
+
+    @staticmethod
+    def _select(
+        frame: pd.DataFrame,
+        spec: AnalysisSpec,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        """Return the events of the frame that overlap the time range of an analysis."""
+        if spec.start_time == start_time and spec.end_time == end_time:
+            return frame
+        overlaps = (frame["end"] > pd.Timestamp(as_utc(spec.start_time))) & (
+            frame["start"] < pd.Timestamp(as_utc(spec.end_time))
+        )
+        return frame[overlaps]
+
+    @staticmethod
+    def _calculate(
+        spec: AnalysisSpec,
+        strategy: EventDurationStrategy,
+        frame: pd.DataFrame,
+        index: SummaryIndex | None = None,
+    ) -> pd.DataFrame:
+        """Aggregate the events of an analysis with its strategy."""
+        if isinstance(strategy, IntervalStrategy):
+            return strategy.calculate_frame(
+                frame,
+                timezone=spec.timezone,
+                work_hours=spec.work_hours,
+                start_time=spec.start_time,
+                end_time=spec.end_time,
             )
-        elif method == "many":
-            event_durations = await transformer_strategy.calculate_duration(
-                events=calendar_events,
-                max_events=self.max_events,
-                ascending=self.ascending,
+        if spec.method == "one":
+            return strategy.calculate_frame(
+                frame, event_name=spec.event_name, match=spec.match, index=index
             )
-            return await plot_creator.plot(events=event_durations)
-        elif method == "one_with_periods":
-            event_durations = await transformer_strategy.calculate_duration(
-                events=calendar_events,
-                event_name=event_name,
-                period_days=period_days,
-                num_periods=num_periods,
+        if spec.method == "many":
+            return strategy.calculate_frame(
+                frame,
+                max_events=spec.max_events,
+                ascending=spec.ascending,
+                other=spec.other,
             )
+        return strategy.calculate_frame(
+            frame,
+            event_name=spec.event_name,
+            period_days=spec.period_days,
+            num_periods=spec.num_periods,
+            reference_date=spec.reference_date,
+            mode=spec.period_mode,
+            match=spec.match,
+            index=index,
+        )
 
-            return await plot_creator.plot(
-                events=event_durations, event_name=event_name
-            )
+
+async def _render(
+    specs: list[AnalysisSpec],
+    load_frame: Callable[[], pd.DataFrame],
+    start_time: datetime,
+    end_time: datetime,
+    transform_cache: TransformCache | None = None,
+    fingerprint: str = "",
+) -> list[go.Figure]:
+    # The frame is only built once an analysis misses the cache. The events and the
+    # summary index of every time range are shared by the analyses of that range, so
+    # analyses of single events only touch the rows of their event. Untitled events
+    # are only shown to the interval analyses.
+    frame = None
+    ranges: dict[tuple, pd.DataFrame] = {}
+    indexes: dict[tuple, SummaryIndex] = {}
+    figures = []
+    for spec in specs:
+        strategy = STRATEGIES[spec.method]()
+
+        def calculate() -> pd.DataFrame:
+            nonlocal frame
+            if frame is None:
+                frame = load_frame()
+            titled = not isinstance(strategy, IntervalStrategy)
+            span = (spec.start_time, spec.end_time, titled)
+            if span not in ranges:
+                rows = AnalyzerFacade._select(frame, spec, start_time, end_time)
+                if titled and rows["summary"].hasnans:
+                    rows = rows[rows["summary"].notna()]
+                ranges[span] = rows
+            index = None
+            if spec.event_name is not None:
+                if span not in indexes:
+                    indexes[span] = SummaryIndex.from_frame(ranges[span])
+                index = indexes[span]
+            return AnalyzerFacade._calculate(spec, strategy, ranges[span], index=index)
+
+        if transform_cache is None:
+            event_durations = calculate()
         else:
-            raise ValueError("Invalid method specified")
+            key = transform_cache.key(strategy, fingerprint, *spec.params())
+            event_durations = transform_cache.memoize(key, calculate)
+        plot_creator = await PlotFactory(
+            plot_type=spec.plot_type,
+            style_class=spec.style_class,
+        )
+        if spec.plot_type in ("Bar", "Pie"):
+            figures.append(await plot_creator.plot(events=event_durations))
+        else:
+            event_name = spec.event_name
+            if isinstance(strategy, IntervalStrategy):
+                event_name = strategy.label
+            figures.append(
+                await plot_creator.plot(events=event_durations, event_name=event_name)
+            )
+    return figures
+
+
+def render_batch(
+    specs: list[AnalysisSpec],
+    columns: EventColumns,
+    start_time: datetime,
+    end_time: datetime,
+) -> list[go.Figure]:
+    """
+    Aggregate and plot the collected events of a batch of analyses.
+
+    This is the CPU-bound part of `AnalyzerFacade.analyze_batch`, run in the worker
+    processes of the facade's executor.
+
+    Args:
+        specs (list[AnalysisSpec]): The analyses to run.
+        columns (EventColumns): The events of the union of the time ranges of the analyses.
+        start_time (datetime): The start of the union of the time ranges.
+        end_time (datetime): The end of the union of the time ranges.
+
+    Returns:
+        list[go.Figure]: The plot of every analysis, in the order of `specs`.
+    """
+    return asyncio.run(_render(specs, columns.to_frame, start_time, end_time))
@@ -1,9 +1,9 @@
 import os.path
+from pathlib import Path
 
 from google.auth.transport.requests import Request  # type: ignore
 from google.oauth2.credentials import Credentials  # type: ignore
 from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
-from pathlib import Path
 
 
 class CalendarAuth:
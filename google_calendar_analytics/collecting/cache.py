@@ -0,0 +1,200 @@
+"""
+# **EventCache**
+
+This module provides a persistent cache of calendar events stored in SQLite.
+Besides the events themselves the cache records which time ranges of every
+calendar have been downloaded, so a query only has to fetch the parts of its
+time range that are not covered yet. Covered ranges expire after a TTL.
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .store import as_utc, event_time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS events_by_time ON events (calendar_id, start, end);
+CREATE TABLE IF NOT EXISTS coverage (
+    calendar_id TEXT NOT NULL,
+    time_min REAL NOT NULL,
+    time_max REAL NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_by_calendar ON coverage (calendar_id, time_min);
+"""
+
+
+class EventCache:
+    """
+    SQLite-backed cache of calendar events with a time-range coverage index.
+
+    Args:
+        path (str | Path): The database file. Defaults to an in-memory database,
+            pass a file path for the cache to survive a process restart.
+        ttl (float): The number of seconds a downloaded time range stays valid.
+
+    Examples:
+        ```python
+        cache = EventCache("events.sqlite", ttl=15 * 60)
+        async with AnalyzerFacade(creds=creds, cache=cache) as analyzer:
+            fig = await analyzer.analyze_many(start_time, end_time, plot_type="Bar")
+        ```
+    """
+
+    def __init__(self, path: str | Path = ":memory:", ttl: float = 3600):
+        self.path = str(path)
+        self.ttl = ttl
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def evict_expired(self) -> None:
+        """Drop the time ranges and events downloaded longer than `ttl` seconds ago."""
+        expired_before = time.time() - self.ttl
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM coverage WHERE fetched_at < ?", (expired_before,)
+            )
+            self._connection.execute(
+                "DELETE FROM events WHERE fetched_at < ?", (expired_before,)
+            )
+
+    def invalidate(self, calendar_id: str) -> None:
+        """Drop everything cached for a calendar."""
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM coverage WHERE calendar_id = ?", (calendar_id,)
+            )
+            self._connection.execute(
+                "DELETE FROM events WHERE calendar_id = ?", (calendar_id,)
+            )
+
+    def missing_ranges(
+        self, calendar_id: str, start_time: datetime, end_time: datetime
+    ) -> list[tuple[datetime, datetime]]:
+        """
+        Return the parts of a time range that are not covered by the cache.
+
+        Args:
+            calendar_id (str): The calendar to look up.
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+
+        Returns:
+            list[tuple[datetime, datetime]]: The uncovered sub-ranges, in UTC.
+        """
+        self.evict_expired()
+        time_min, time_max = (
+            as_utc(start_time).timestamp(),
+            as_utc(end_time).timestamp(),
+        )
+
+        covered = self._connection.execute(
+            "SELECT time_min, time_max FROM coverage "
+            "WHERE calendar_id = ? AND time_min < ? AND time_max > ? "
+            "ORDER BY time_min",
+            (calendar_id, time_max, time_min),
+        ).fetchall()
+
+        gaps = []
+        cursor = time_min
+        for covered_min, covered_max in covered:
+            if covered_min > cursor:
+                gaps.append((cursor, covered_min))
+            cursor = max(cursor, covered_max)
+            if cursor >= time_max:
+                break
+        if cursor < time_max:
+            gaps.append((cursor, time_max))
+
+        return [
+            (
+                datetime.fromtimestamp(gap_min, timezone.utc),
+                datetime.fromtimestamp(gap_max, timezone.utc),
+            )
+            for gap_min, gap_max in gaps
+        ]
+
+    def store(
+        self,
+        calendar_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        events: list[dict],
+    ) -> None:
+        """
+        Save the events downloaded for a time range and mark the range as covered.
+
+        Args:
+            calendar_id (str): The calendar the events belong to.
+            start_time (datetime): The start of the downloaded time range.
+            end_time (datetime): The end of the downloaded time range.
+            events (list[dict]): Every event overlapping the time range.
+        """
+        fetched_at = time.time()
+        rows = [
+            (
+                calendar_id,
+                event["id"],
+                event_time(event, "start").timestamp(),
+                event_time(event, "end").timestamp(),
+                json.dumps(event),
+                fetched_at,
+            )
+            for event in events
+            if "id" in event
+        ]
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._connection.execute(
+                "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                (
+                    calendar_id,
+                    as_utc(start_time).timestamp(),
+                    as_utc(end_time).timestamp(),
+                    fetched_at,
+                ),
+            )
+
+    def events_between(
+        self, calendar_id: str, start_time: datetime, end_time: datetime
+    ) -> list[dict]:
+        """
+        Return the cached events overlapping a time range, ordered by start time.
+
+        Args:
+            calendar_id (str): The calendar to read.
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+
+        Returns:
+            list[dict]: The matching events.
+        """
+        rows = self._connection.execute(
+            "SELECT payload FROM events "
+            "WHERE calendar_id = ? AND start < ? AND end > ? "
+            "ORDER BY start",
+            (
+                calendar_id,
+                as_utc(end_time).timestamp(),
+                as_utc(start_time).timestamp(),
+            ),
+        ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
@@ -1,48 +1,591 @@
-from datetime import datetime
+import asyncio
+import hashlib
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import AsyncGenerator
 
 import aiohttp
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+
+from google_calendar_analytics.core import exceptions
+from google_calendar_analytics.processing.columnar import EventColumns
+
+from .cache import EventCache
+from .decoding import EventRecord, flatten_events, loads, record_time
+from .endpoints import BASE_URL, CalendarEndpoints, CalendarRequest
+from .recurrence import RECURRENCE_FIELDS, expand_events
+from .scheduler import RequestScheduler
+from .store import EventChanges, EventStore, as_utc, event_time
+from .tokens import TokenRefresher
 
 
 class AsyncCalendarDataCollector:
-    """A class to collect data from a Google Calendar."""
+    """
+    A class to collect data from a Google Calendar.
+
+    Args:
+        creds (Credentials): Google credentials class instance.
+        session (aiohttp.ClientSession): The session the API requests are sent with.
+        store (EventStore, optional): Enables incremental collection with sync tokens.
+        cache (EventCache, optional): Enables collection through a persistent event cache.
+        scheduler (RequestScheduler, optional): Throttles and retries the API requests.
+            Defaults to a scheduler of the collector's own.
+        base_url (str): The root of the Calendar API.
+        expand_recurring (bool): If True, recurring events are listed as one master event
+            per series plus its exceptions, and expanded into instances locally, instead
+            of the API sending every instance. Applies to the events that are not served
+            by the event store or cache.
+    """
+
+    # The largest page the Calendar API serves for events and calendar lists.
+    MAX_EVENTS_PER_PAGE = 2500
+    MAX_CALENDARS_PER_PAGE = 250
 
-    def __init__(self, creds: Credentials, session: aiohttp.ClientSession):
-        self.service = build("calendar", "v3", credentials=creds)
+    # Event fields that are always requested: deduplication needs the id and
+    # incremental sync needs the status to recognize deleted events.
+    BASE_FIELDS = ("id", "status")
+
+    # Event fields kept by the event store and the event cache, which serve
+    # every strategy and therefore cannot use a per-call projection.
+    STORED_FIELDS = BASE_FIELDS + (
+        "summary",
+        "start",
+        "end",
+        "attendees",
+        "etag",
+        "updated",
+    )
+
+    def __init__(
+        self,
+        creds: Credentials,
+        session: aiohttp.ClientSession,
+        store: EventStore | None = None,
+        cache: EventCache | None = None,
+        scheduler: RequestScheduler | None = None,
+        base_url: str = BASE_URL,
+        expand_recurring: bool = False,
+    ):
+        self.endpoints = CalendarEndpoints(base_url)
         self.session = session
         self.creds = creds
+        self.store = store
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
+        self.expand_recurring = expand_recurring
+        self.tokens = TokenRefresher(creds)
+        self.user = self._user_key(creds)
 
-    async def _make_request(self, request):
-        """Make an API request using aiohttp.ClientSession."""
-        try:
-            url = request.uri
-            headers = request.headers.copy()
-            headers["Authorization"] = f"Bearer {self.creds.token}"
+        # In-flight collections by (calendar, time_min, time_max, fields, flat).
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.coalesced = 0
+
+    @staticmethod
+    def _user_key(creds: Credentials) -> str:
+        """
+        Return the key the scheduler throttles the requests of a user by.
 
+        Collectors of the same user share a key, so they share the user's rate limit. The
+        refresh token identifies a user and outlives the access tokens, it is hashed so the
+        scheduler does not keep the secret around.
+        """
+        secret = getattr(creds, "refresh_token", None) or getattr(creds, "token", None)
+        if not isinstance(secret, str):
+            return f"creds-{id(creds)}"
+        return hashlib.sha256(secret.encode()).hexdigest()
+
+    async def _make_request(self, request: CalendarRequest):
+        """
+        Make an API request using aiohttp.ClientSession.
+
+        The request goes through the scheduler, which throttles it and retries it
+        on rate limits and server errors. The access token is refreshed before it
+        expires, and a request rejected with 401 is replayed once with a new token.
+
+        Raises:
+            CalendarAPIError: If the API rejected the request for good.
+        """
+        url = request.uri
+        headers = request.headers.copy()
+
+        async def fetch(token: str):
+            headers["Authorization"] = f"Bearer {token}"
             async with self.session.get(url, headers=headers) as resp:
-                return await resp.json()
-        except aiohttp.ClientError as e:
-            print(f"Error: {e}")
+                body = await resp.read()
+            try:
+                payload = loads(body)
+            except ValueError:
+                # Gateways answer server errors with HTML, the status decides what to do.
+                if resp.status < 400:
+                    raise
+                payload = None
+            return resp.status, resp.headers, payload
+
+        async def send():
+            token = await self.tokens.token()
+            response = await fetch(token)
+            if response[0] == 401 and self.tokens.can_refresh:
+                await self.tokens.refresh(stale_token=token)
+                response = await fetch(self.creds.token)
+            return response
+
+        return await self.scheduler.run(send, user=self.user)
+
+    @classmethod
+    def _fields_param(cls, fields: tuple[str, ...] | None) -> str | None:
+        """
+        Build the partial-response `fields` parameter of an events list request.
+
+        Args:
+            fields (tuple[str, ...], optional): The event fields to request.
+                None requests full event resources.
+
+        Returns:
+            str | None: The `fields` parameter, or None for full resources.
+        """
+        if fields is None:
             return None
+        item_fields = list(dict.fromkeys(cls.BASE_FIELDS + tuple(fields)))
+        return f"nextPageToken,nextSyncToken,items({','.join(item_fields)})"
 
     async def _get_events_by_time_range(
-            self,
-            time_min: str,
-            time_max: str,
-            calendar_id: str,
+        self,
+        time_min: str,
+        time_max: str,
+        calendar_id: str,
+        fields: tuple[str, ...] | None = None,
+        flat: bool = False,
     ) -> list:
         """Helper function to retrieve events in a specific time range."""
         events = []
-        page_token = None
+        async for page in self._iter_pages(
+            time_min, time_max, calendar_id, fields, flat=flat
+        ):
+            events.extend(page)
+        return events
 
-        while True:
-            request = self.service.events().list(
-                calendarId=calendar_id,
+    async def _iter_pages(
+        self,
+        time_min: str,
+        time_max: str,
+        calendar_id: str,
+        fields: tuple[str, ...] | None = None,
+        flat: bool = False,
+    ) -> AsyncGenerator[list, None]:
+        """
+        Yield the event pages of a time range, prefetching the next page.
+
+        The request of the next page is started as soon as a page arrives, so it is
+        in flight while the caller processes the current page. With `flat`, every page
+        is turned into EventRecords before it is yielded.
+
+        With `expand_recurring`, the masters and exceptions of every page are gathered
+        first, since an exception can arrive on another page than its master, and the
+        expanded events are yielded as a single page.
+        """
+        if not self.expand_recurring:
+            # Close the raw pages as soon as the caller stops, to cancel the prefetch.
+            async with aclosing(
+                self._iter_raw_pages(time_min, time_max, calendar_id, fields)
+            ) as pages:
+                async for items in pages:
+                    yield flatten_events(items, calendar_id) if flat else items
+            return
+
+        listed = []
+        async for items in self._iter_raw_pages(
+            time_min, time_max, calendar_id, fields, single_events=False
+        ):
+            listed.extend(items)
+        expanded = expand_events(
+            listed, datetime.fromisoformat(time_min), datetime.fromisoformat(time_max)
+        )
+        if flat:
+            yield flatten_events(expanded, calendar_id)
+        else:
+            yield expanded
+
+    async def _iter_raw_pages(
+        self,
+        time_min: str,
+        time_max: str,
+        calendar_id: str,
+        fields: tuple[str, ...] | None = None,
+        single_events: bool = True,
+    ) -> AsyncGenerator[list, None]:
+        """Yield the event resources of every page of a listing, see `_iter_pages`."""
+        if fields is not None and not single_events:
+            fields = tuple(fields) + RECURRENCE_FIELDS
+
+        def list_request(page_token: str | None):
+            return self.endpoints.events_list(
+                calendar_id,
                 timeMin=time_min,
                 timeMax=time_max,
+                singleEvents=single_events,
+                # Only single events can be ordered, and the cancelled exceptions
+                # of a series are only listed with the deleted events.
+                orderBy="startTime" if single_events else None,
+                showDeleted=None if single_events else True,
+                maxResults=self.MAX_EVENTS_PER_PAGE,
+                fields=self._fields_param(fields),
+                pageToken=page_token,
+            )
+
+        pending = asyncio.ensure_future(self._make_request(list_request(None)))
+        try:
+            while True:
+                response = await pending
+
+                if response is None:
+                    return
+
+                page_token = response.get("nextPageToken")
+                if page_token:
+                    pending = asyncio.ensure_future(
+                        self._make_request(list_request(page_token))
+                    )
+
+                yield response.get("items", [])
+
+                if not page_token:
+                    return
+        finally:
+            if not pending.done():
+                pending.cancel()
+
+    async def iter_events(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        calendar_id: str = "primary",
+        fields: tuple[str, ...] | None = None,
+        pages: bool = False,
+        flat: bool = False,
+    ) -> AsyncGenerator:
+        """
+        Stream the events of a time range as they arrive.
+
+        Events are always streamed from the API, bypassing the event store and cache,
+        and only one page is held in memory at a time while the next one is prefetched.
+
+        Args:
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+            calendar_id (str): The calendar to collect events from.
+            fields (tuple[str, ...], optional): The event fields to download.
+            pages (bool): If True, yield whole pages (lists of events) instead of events.
+            flat (bool): If True, yield EventRecords instead of event resources.
+
+        Yields:
+            dict | EventRecord | list: The events, or pages of events, in `startTime` order.
+
+        Examples:
+            ```python
+            async for event in collector.iter_events(start_time, end_time):
+                print(event["summary"])
+            ```
+        """
+        # Close the pages as soon as the caller stops, to cancel the prefetch.
+        async with aclosing(
+            self._iter_pages(
+                time_min=self._format_time(start_time),
+                time_max=self._format_time(end_time),
+                calendar_id=calendar_id,
+                fields=fields,
+                flat=flat,
+            )
+        ) as page_iterator:
+            async for page in page_iterator:
+                if pages:
+                    yield page
+                else:
+                    for event in page:
+                        yield event
+
+    @staticmethod
+    def _format_time(moment: datetime) -> str:
+        """Format a datetime as an RFC 3339 UTC timestamp, treating naive datetimes as UTC."""
+        return (
+            as_utc(moment).astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+            + "Z"
+        )
+
+    @staticmethod
+    def _split_time_range(
+        start_time: datetime,
+        end_time: datetime,
+        shards: int,
+    ) -> list[tuple[datetime, datetime]]:
+        """Split [start_time, end_time] into `shards` contiguous sub-windows."""
+        step = (end_time - start_time) / shards
+        bounds = [start_time + step * i for i in range(shards)] + [end_time]
+        return [
+            (window_start, window_end)
+            for window_start, window_end in zip(bounds, bounds[1:])
+            if window_start < window_end
+        ]
+
+    async def _fetch_windows(
+        self,
+        calendar_id: str,
+        windows: list[tuple[datetime, datetime]],
+        max_concurrency: int,
+        fields: tuple[str, ...] | None = None,
+        flat: bool = False,
+    ) -> list[list]:
+        """Fetch several time windows concurrently, at most `max_concurrency` at once."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_window(window_start: datetime, window_end: datetime) -> list:
+            async with semaphore:
+                return await self._get_events_by_time_range(
+                    calendar_id=calendar_id,
+                    time_min=self._format_time(window_start),
+                    time_max=self._format_time(window_end),
+                    fields=fields,
+                    flat=flat,
+                )
+
+        return list(
+            await asyncio.gather(
+                *(
+                    fetch_window(window_start, window_end)
+                    for window_start, window_end in windows
+                )
+            )
+        )
+
+    @staticmethod
+    def _event_start(event: dict | EventRecord) -> datetime:
+        """Return the start of an event resource or record as an aware datetime."""
+        if isinstance(event, EventRecord):
+            return record_time(event)
+        return event_time(event)
+
+    @classmethod
+    def _merge_events(cls, windows: list[list]) -> list:
+        """
+        Merge the events of several time windows in `startTime` order.
+
+        An event that crosses a window edge is returned by every window it overlaps,
+        so events are deduplicated by id before sorting.
+        """
+        seen = set()
+        merged = []
+        for events in windows:
+            for event in events:
+                event_id = (
+                    event.id if isinstance(event, EventRecord) else event.get("id")
+                )
+                if event_id is not None:
+                    if event_id in seen:
+                        continue
+                    seen.add(event_id)
+                merged.append(event)
+
+        merged.sort(key=cls._event_start)
+        return merged
+
+    async def _sync_pages(
+        self,
+        calendar_id: str,
+        sync_token: str | None,
+    ) -> tuple[dict, EventChanges]:
+        """
+        Walk every page of a full or incremental sync into the store.
+
+        Returns:
+            tuple[dict, EventChanges]: The last page and the changes applied to the store.
+        """
+        # Only called by `sync`, which checks that the collector has a store.
+        assert self.store is not None
+        page_token = None
+        # A full sync always starts from an emptied store.
+        changes = EventChanges(reset=sync_token is None)
+
+        while True:
+            request = self.endpoints.events_list(
+                calendar_id,
                 singleEvents=True,
-                orderBy="startTime",
+                showDeleted=sync_token is not None,
+                syncToken=sync_token,
+                maxResults=self.MAX_EVENTS_PER_PAGE,
+                fields=self._fields_param(self.STORED_FIELDS),
+                pageToken=page_token,
+            )
+
+            response = await self._make_request(request)
+
+            page_changes = self.store.apply(calendar_id, response.get("items", []))
+            changes.added.extend(page_changes.added)
+            changes.removed.extend(page_changes.removed)
+            changes.modified.extend(page_changes.modified)
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return response, changes
+
+    async def sync(self, calendar_id: str = "primary") -> EventChanges:
+        """
+        Bring the event store of a calendar up to date.
+
+        The first sync of a calendar downloads all of its events. Every following sync
+        sends the stored `nextSyncToken` and only downloads the events that changed or
+        were deleted since. When the API invalidates the token (410 Gone), the store of
+        the calendar is dropped and a full sync is done instead.
+
+        Args:
+            calendar_id (str): The calendar to synchronize.
+
+        Returns:
+            EventChanges: The events added, removed and modified by this sync.
+
+        Raises:
+            ValueError: If the collector was created without an event store.
+            CalendarAPIError: If the API rejected the sync for good.
+        """
+        if self.store is None:
+            raise ValueError("Incremental sync requires an EventStore")
+
+        async with self.store.lock(calendar_id):
+            sync_token = self.store.sync_token(calendar_id)
+            if sync_token is None:
+                self.store.reset(calendar_id)
+
+            try:
+                response, changes = await self._sync_pages(calendar_id, sync_token)
+            except exceptions.CalendarAPIError as e:
+                if e.status != 410:
+                    raise
+                self.store.reset(calendar_id)
+                response, changes = await self._sync_pages(calendar_id, None)
+
+            self.store.set_sync_token(calendar_id, response.get("nextSyncToken"))
+            return changes
+
+    async def collect_data(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        calendar_id: str = "primary",
+        shards: int = 1,
+        max_concurrency: int = 4,
+        fields: tuple[str, ...] | None = None,
+        flat: bool = False,
+    ) -> list:
+        """
+        Collect data from the calendar for the specified time range.
+
+        When the collector has an event store, the store is synchronized incrementally
+        and serves the time range instead of the time range being downloaded. When it
+        has an event cache, only the parts of the time range the cache does not cover
+        are downloaded.
+
+        Concurrent calls for the same calendar, time range and projection share a
+        single in-flight collection (single-flight) instead of each fetching the events.
+
+        Args:
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+            calendar_id (str): The calendar to collect events from.
+            shards (int): The number of sub-windows the time range is split into.
+                Sub-windows are fetched concurrently and merged in `startTime` order.
+            max_concurrency (int): The maximum number of sub-windows fetched at once.
+            fields (tuple[str, ...], optional): The event fields to download, usually the
+                `required_fields` of the strategy the events are collected for. Defaults to
+                full event resources. The event store and cache always keep `STORED_FIELDS`.
+            flat (bool): If True, return flat EventRecords instead of event resources.
+
+        Returns:
+            list: The events of the time range.
+        """
+        key = (
+            calendar_id,
+            self._format_time(start_time),
+            self._format_time(end_time),
+            tuple(fields) if fields is not None else None,
+            flat,
+        )
+
+        if key in self._inflight:
+            self.coalesced += 1
+        else:
+            future = asyncio.ensure_future(
+                self._collect_data(
+                    start_time,
+                    end_time,
+                    calendar_id,
+                    shards=shards,
+                    max_concurrency=max_concurrency,
+                    fields=fields,
+                    flat=flat,
+                )
+            )
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return list(await asyncio.shield(self._inflight[key]))
+
+    async def _collect_data(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        calendar_id: str,
+        shards: int,
+        max_concurrency: int,
+        fields: tuple[str, ...] | None,
+        flat: bool,
+    ) -> list:
+        """Collect the events of a time range, see `collect_data`."""
+        if self.store is not None:
+            await self.sync(calendar_id)
+            events = self.store.events_between(calendar_id, start_time, end_time)
+            if flat:
+                return flatten_events(events, calendar_id)
+            return events
+
+        if self.cache is not None:
+            gaps = self.cache.missing_ranges(calendar_id, start_time, end_time)
+            fetched = await self._fetch_windows(
+                calendar_id, gaps, max_concurrency, fields=self.STORED_FIELDS
+            )
+            for (gap_start, gap_end), events in zip(gaps, fetched):
+                self.cache.store(calendar_id, gap_start, gap_end, events)
+            events = self.cache.events_between(calendar_id, start_time, end_time)
+            if flat:
+                return flatten_events(events, calendar_id)
+            return events
+
+        if shards <= 1:
+            return await self._get_events_by_time_range(
+                calendar_id=calendar_id,
+                time_min=self._format_time(start_time),
+                time_max=self._format_time(end_time),
+                fields=fields,
+                flat=flat,
+            )
+
+        windows = self._split_time_range(start_time, end_time, shards)
+        return self._merge_events(
+            await self._fetch_windows(
+                calendar_id, windows, max_concurrency, fields=fields, flat=flat
+            )
+        )
+
+    async def list_calendars(self) -> list[dict]:
+        """
+        List the calendars of the user.
+
+        Returns:
+            list[dict]: The calendar list entries, each with at least an `id` and a `summary`.
+        """
+        calendars = []
+        page_token = None
+
+        while True:
+            request = self.endpoints.calendar_list(
+                maxResults=self.MAX_CALENDARS_PER_PAGE,
                 pageToken=page_token,
             )
 
@@ -51,23 +594,106 @@ class AsyncCalendarDataCollector:
             if response is None:
                 break
 
-            events.extend(response.get("items", []))
+            calendars.extend(response.get("items", []))
             page_token = response.get("nextPageToken")
             if not page_token:
                 break
 
-        return events
+        return calendars
 
-    async def collect_data(
-            self,
-            start_time: datetime,
-            end_time: datetime,
-            calendar_id: str = "primary",
+    async def collect_many(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        calendar_ids: list[str] | None = None,
+        max_concurrency: int = 4,
+        fields: tuple[str, ...] | None = None,
+        flat: bool = False,
     ) -> list:
-        """Collect data from the calendar for the specified time range."""
+        """
+        Collect data from several calendars concurrently.
 
-        return await self._get_events_by_time_range(
-            calendar_id=calendar_id,
-            time_min=start_time.isoformat() + "Z",
-            time_max=end_time.isoformat() + "Z",
+        Every returned event is tagged with the id of its calendar in a `calendarId` key,
+        or in the `calendar_id` of the EventRecords.
+
+        Args:
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+            calendar_ids (list[str], optional): The calendars to collect events from.
+                Defaults to every calendar of the user.
+            max_concurrency (int): The maximum number of calendars collected at once.
+            fields (tuple[str, ...], optional): The event fields to download.
+            flat (bool): If True, return flat EventRecords instead of event resources.
+
+        Returns:
+            list: The events of every calendar, in `startTime` order.
+        """
+        if calendar_ids is None:
+            calendar_ids = [calendar["id"] for calendar in await self.list_calendars()]
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def collect_calendar(calendar_id: str) -> list:
+            async with semaphore:
+                events = await self.collect_data(
+                    start_time=start_time,
+                    end_time=end_time,
+                    calendar_id=calendar_id,
+                    fields=fields,
+                    flat=flat,
+                )
+            if flat:
+                return events
+            return [{**event, "calendarId": calendar_id} for event in events]
+
+        calendars = await asyncio.gather(
+            *(collect_calendar(calendar_id) for calendar_id in calendar_ids)
         )
+
+        events = [event for calendar in calendars for event in calendar]
+        events.sort(key=self._event_start)
+        return events
+
+    async def collect_columns(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        calendar_ids: list[str] | None = None,
+        fields: tuple[str, ...] | None = None,
+        columns: EventColumns | None = None,
+    ) -> EventColumns:
+        """
+        Collect events into compact EventColumns.
+
+        Without an event store or cache, the events are streamed and every page is
+        packed into the columns as soon as it arrives, so only one page of event
+        resources is held in memory at a time. Otherwise the events are served by
+        `collect_data` and packed afterwards.
+
+        Args:
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+            calendar_ids (list[str], optional): The calendars to collect events from.
+                Defaults to the primary calendar only.
+            fields (tuple[str, ...], optional): The event fields to download.
+            columns (EventColumns, optional): Columns to append the events to.
+
+        Returns:
+            EventColumns: The timed events of every calendar. They are not ordered.
+        """
+        columns = columns if columns is not None else EventColumns()
+
+        for calendar_id in calendar_ids or ["primary"]:
+            if self.store is not None or self.cache is not None:
+                events = await self.collect_data(
+                    start_time, end_time, calendar_id, fields=fields, flat=True
+                )
+                columns.extend(events)
+                continue
+
+            async for page in self.iter_events(
+                start_time, end_time, calendar_id, fields=fields, pages=True, flat=True
+            ):
+                columns.extend(page)
+
+        return columns
@@ -0,0 +1,88 @@
+"""
+# **Decoding**
+
+This module decodes Calendar API responses. It uses `orjson` when it is
+installed and falls back to the standard `json` module otherwise. Event pages
+can be turned straight into flat `EventRecord` tuples, so the nested event
+resources are dropped as soon as a page is decoded and the transformers never
+have to walk them.
+"""
+
+import json
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import Any, NamedTuple, Optional
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def loads(data: bytes) -> Any:
+    """Decode a JSON document with the fastest parser available."""
+    if not data:
+        return None
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(document: Any) -> str:
+    """Encode a JSON document with the fastest encoder available."""
+    if orjson is not None:
+        return orjson.dumps(document).decode()
+    return json.dumps(document)
+
+
+class EventRecord(NamedTuple):
+    """
+    A flat record of a calendar event.
+
+    Attributes:
+        id (str): The event id.
+        summary (str | None): The title of the event.
+        start (str): The ISO start, a `dateTime` or, for all-day events, a `date`.
+        end (str): The ISO end, a `dateTime` or, for all-day events, a `date`.
+        all_day (bool): Whether the event lasts whole days.
+        calendar_id (str | None): The calendar the event belongs to.
+    """
+
+    id: str
+    summary: str | None
+    start: str
+    end: str
+    all_day: bool
+    calendar_id: str | None = None
+
+
+def flatten_event(event: dict, calendar_id: str | None = None) -> EventRecord:
+    """Turn an event resource into an EventRecord."""
+    start, end = event.get("start", {}), event.get("end", {})
+    all_day = "dateTime" not in start
+    return EventRecord(
+        id=event.get("id", ""),
+        summary=event.get("summary"),
+        start=start.get("date", "") if all_day else start["dateTime"],
+        end=end.get("date", "") if all_day else end.get("dateTime", ""),
+        all_day=all_day,
+        calendar_id=event.get("calendarId", calendar_id),
+    )
+
+
+def flatten_events(
+    events: list[dict], calendar_id: str | None = None
+) -> list[EventRecord]:
+    """Turn a page of event resources into EventRecords."""
+    return [flatten_event(event, calendar_id) for event in events]
+
+
+def record_time(record: EventRecord, key: str = "start") -> datetime:
+    """Return the start or end of a record as an aware datetime, like `event_time`."""
+    moment = record.start if key == "start" else record.end
+    if not moment:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    if record.all_day:
+        return datetime.fromisoformat(moment).replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(moment)
@@ -0,0 +1,63 @@
+"""
+# **CalendarEndpoints**
+
+This module builds the few Google Calendar API v3 requests the collector makes.
+It replaces the `googleapiclient` discovery service, which is costly to build
+and was only used by the collector to format request URLs.
+"""
+
+from dataclasses import dataclass, field
+from urllib.parse import quote, urlencode
+
+BASE_URL = "https://www.googleapis.com/calendar/v3"
+
+
+@dataclass(frozen=True)
+class CalendarRequest:
+    """
+    A prepared GET request of the Calendar API.
+
+    Attributes:
+        uri (str): The full request URL, query string included.
+        headers (dict): The request headers, without authorization.
+    """
+
+    uri: str
+    headers: dict = field(default_factory=lambda: {"Accept": "application/json"})
+
+
+class CalendarEndpoints:
+    """
+    Builds Calendar API requests.
+
+    Parameters use the names of the API reference (`timeMin`, `pageToken`, ...).
+    Parameters set to None are left out of the query string.
+
+    Args:
+        base_url (str): The root of the Calendar API, e.g. the address of a local mock server.
+    """
+
+    def __init__(self, base_url: str = BASE_URL):
+        self.base_url = base_url.rstrip("/")
+
+    @staticmethod
+    def _query(params: dict) -> str:
+        query = {
+            name: str(value).lower() if isinstance(value, bool) else value
+            for name, value in params.items()
+            if value is not None
+        }
+        return urlencode(query)
+
+    def _request(self, path: str, params: dict) -> CalendarRequest:
+        query = self._query(params)
+        uri = f"{self.base_url}{path}"
+        return CalendarRequest(f"{uri}?{query}" if query else uri)
+
+    def events_list(self, calendar_id: str, **params) -> CalendarRequest:
+        """Build an `events.list` request of a calendar."""
+        return self._request(f"/calendars/{quote(calendar_id, safe='')}/events", params)
+
+    def calendar_list(self, **params) -> CalendarRequest:
+        """Build a `calendarList.list` request."""
+        return self._request("/users/me/calendarList", params)
@@ -0,0 +1,155 @@
+"""
+# **SessionPool**
+
+This module provides a pool of HTTP connections shared by many
+`AnalyzerFacade` instances. Facades borrow the pool's `aiohttp.ClientSession`
+instead of opening their own, so TLS handshakes, sockets and DNS lookups are
+reused across the analyses of a multi-tenant worker.
+"""
+
+import asyncio
+import ssl
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import aiohttp
+import certifi
+
+
+@dataclass
+class PoolStats:
+    """
+    Utilization of a SessionPool.
+
+    Attributes:
+        borrows (int): The number of times the session was borrowed.
+        active_borrowers (int): The number of borrowers holding the session now.
+        peak_borrowers (int): The largest number of simultaneous borrowers.
+        limit (int): The maximum number of connections.
+        limit_per_host (int): The maximum number of connections to a single host.
+        connections_in_use (int): The connections serving a request now.
+        idle_connections (int): The keep-alive connections ready for reuse.
+    """
+
+    borrows: int = 0
+    active_borrowers: int = 0
+    peak_borrowers: int = 0
+    limit: int = 0
+    limit_per_host: int = 0
+    connections_in_use: int = 0
+    idle_connections: int = 0
+
+
+class SessionPool:
+    """
+    A process-level pool of HTTP connections to the Calendar API.
+
+    The session is created lazily, on the event loop of its first borrower. A session
+    only works on the loop it was created on, so borrowing the pool from another loop,
+    e.g. in a later `asyncio.run`, replaces the session with one of that loop.
+
+    Args:
+        limit (int): The maximum number of connections.
+        limit_per_host (int): The maximum number of connections to a single host.
+        keepalive_timeout (float): The seconds an idle connection is kept open.
+        ttl_dns_cache (int): The seconds a DNS lookup is cached.
+
+    Examples:
+        ```python
+        pool = SessionPool.shared()
+        async with AnalyzerFacade(creds=creds, pool=pool) as analyzer:
+            fig = await analyzer.analyze_many(start_time, end_time, plot_type="Bar")
+        print(pool.stats)
+        ```
+    """
+
+    _shared: "SessionPool | None" = None
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 60.0,
+        ttl_dns_cache: int = 300,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._borrows = 0
+        self._active = 0
+        self._peak = 0
+
+    @classmethod
+    def shared(cls) -> "SessionPool":
+        """Return the pool shared by the whole process, creating it on first use."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        connector = aiohttp.TCPConnector(
+            ssl=ssl_context,
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+            use_dns_cache=True,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    def acquire(self) -> aiohttp.ClientSession:
+        """Borrow the pooled session. Every call must be paired with `release`."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # The session of a previous loop cannot be closed from this one, its
+            # connections went away with that loop.
+            self._session = self._create_session()
+            self._loop = loop
+        self._borrows += 1
+        self._active += 1
+        self._peak = max(self._peak, self._active)
+        return self._session
+
+    def release(self) -> None:
+        """Give back a borrowed session. The connections stay open for other borrowers."""
+        self._active = max(0, self._active - 1)
+
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Borrow the pooled session for the duration of a `with` block."""
+        session = self.acquire()
+        try:
+            yield session
+        finally:
+            self.release()
+
+    async def close(self) -> None:
+        """Close the pooled session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    @property
+    def stats(self) -> PoolStats:
+        in_use = idle = 0
+        connector = self._session.connector if self._session is not None else None
+        if connector is not None:
+            in_use = len(getattr(connector, "_acquired", ()))
+            idle = sum(
+                len(conns) for conns in getattr(connector, "_conns", {}).values()
+            )
+        return PoolStats(
+            borrows=self._borrows,
+            active_borrowers=self._active,
+            peak_borrowers=self._peak,
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            connections_in_use=in_use,
+            idle_connections=idle,
+        )
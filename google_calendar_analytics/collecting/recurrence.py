@@ -0,0 +1,237 @@
+"""
+# **Recurrence expansion**
+
+This module expands recurring events locally. With `singleEvents=False` the
+Calendar API returns one master event per series, with its RRULE, RDATE and
+EXDATE lines, plus the instances that were moved, edited or cancelled
+(exceptions). `expand_events` turns such a listing into the instances the API
+returns with `singleEvents=True`, so a daily standup costs one event resource
+instead of one per day.
+
+Occurrences are generated on the wall clock of the master's `timeZone`, like
+the API does, so a 10:00 meeting stays at 10:00 across daylight saving time.
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrule, rruleset, rrulestr
+
+from .store import event_time
+
+# The event fields the expansion needs besides the fields of the analyses.
+RECURRENCE_FIELDS = ("recurrence", "recurringEventId", "originalStartTime")
+
+_UNTIL = re.compile(r"UNTIL=(\d{8})(T\d{6})?(Z?)")
+
+
+def _zone(moment: dict) -> tzinfo:
+    """Return the timezone of a start, from its `timeZone` or from its UTC offset."""
+    if moment.get("timeZone"):
+        try:
+            return ZoneInfo(moment["timeZone"])
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    if "dateTime" in moment:
+        return datetime.fromisoformat(moment["dateTime"]).tzinfo or timezone.utc
+    return timezone.utc
+
+
+def _parse_value(value: str, zone: tzinfo, source: tzinfo | None) -> datetime:
+    """
+    Parse an iCalendar DATE or DATE-TIME into a naive wall-clock time of `zone`.
+
+    Args:
+        value (str): `YYYYMMDD`, `YYYYMMDDTHHMMSS` or `YYYYMMDDTHHMMSSZ`.
+        zone (tzinfo): The timezone the occurrences are generated in.
+        source (tzinfo, optional): The TZID of the value, if it has one.
+    """
+    if "T" not in value:
+        return datetime.strptime(value, "%Y%m%d")
+    moment = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        moment = moment.replace(tzinfo=timezone.utc)
+    elif source is not None:
+        moment = moment.replace(tzinfo=source)
+    else:
+        return moment
+    return moment.astimezone(zone).replace(tzinfo=None)
+
+
+def _parse_dates(line: str, zone: tzinfo) -> list[datetime]:
+    """Parse the values of an RDATE or EXDATE line, in `zone` if its TZID is unknown."""
+    head, _, values = line.partition(":")
+    source: tzinfo | None = None
+    for parameter in head.split(";")[1:]:
+        name, _, argument = parameter.partition("=")
+        if name.upper() == "TZID":
+            # Outlook writes Windows names, such as "W. Europe Standard Time".
+            try:
+                source = ZoneInfo(argument)
+            except (ZoneInfoNotFoundError, ValueError):
+                source = zone
+    return [_parse_value(value, zone, source) for value in values.split(",") if value]
+
+
+def _localize_until(line: str, zone: tzinfo, all_day: bool) -> str:
+    """Rewrite the UNTIL of an RRULE on the naive wall clock the rule is expanded on."""
+
+    def replace(match: re.Match) -> str:
+        day, clock, utc = match.groups()
+        if not clock:
+            # A date UNTIL includes the whole day.
+            return f"UNTIL={day}" if all_day else f"UNTIL={day}T235959"
+        value = _parse_value(f"{day}{clock}{utc}", zone, None)
+        return f"UNTIL={value:%Y%m%dT%H%M%S}"
+
+    return _UNTIL.sub(replace, line)
+
+
+def _occurrences(
+    master: dict, zone: tzinfo, first: datetime, last: datetime
+) -> list[datetime]:
+    """Return the naive wall-clock starts of a series between `first` and `last`."""
+    start = master["start"]
+    all_day = "dateTime" not in start
+    if all_day:
+        dtstart = datetime.fromisoformat(start["date"])
+    else:
+        dtstart = (
+            datetime.fromisoformat(start["dateTime"])
+            .astimezone(zone)
+            .replace(tzinfo=None)
+        )
+
+    series = rruleset()
+    # The API always counts the start of a series as its first instance.
+    series.rdate(dtstart)
+    for line in master.get("recurrence", []):
+        kind = line.split(":", 1)[0].split(";", 1)[0].upper()
+        if kind == "RRULE":
+            rule = rrulestr(_localize_until(line, zone, all_day), dtstart=dtstart)
+            assert isinstance(rule, rrule)
+            series.rrule(rule)
+        elif kind == "RDATE":
+            for moment in _parse_dates(line, zone):
+                series.rdate(moment)
+        elif kind == "EXDATE":
+            for moment in _parse_dates(line, zone):
+                series.exdate(moment)
+    return series.between(first, last, inc=True)
+
+
+def _instance_id(master_id: str, start: datetime, all_day: bool) -> str:
+    if all_day:
+        return f"{master_id}_{start:%Y%m%d}"
+    return f"{master_id}_{start.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+
+
+def _original_key(moment: dict) -> datetime | date:
+    if "dateTime" in moment:
+        return datetime.fromisoformat(moment["dateTime"]).astimezone(timezone.utc)
+    return date.fromisoformat(moment["date"])
+
+
+def expand_event(
+    master: dict,
+    time_min: datetime,
+    time_max: datetime,
+    exceptions: list[dict] | tuple = (),
+) -> list[dict]:
+    """
+    Expand a recurring master event into its instances that overlap a time range.
+
+    The instances that have an exception, whether it is cancelled or modified, are
+    left out: modified exceptions are events of their own in the listing.
+
+    Args:
+        master (dict): The master event, with its `recurrence` lines.
+        time_min (datetime): The start of the time range, aware.
+        time_max (datetime): The end of the time range, aware.
+        exceptions (list[dict]): The exceptions of the series.
+
+    Returns:
+        list[dict]: The instances, like the API returns them with `singleEvents=True`.
+    """
+    start, end = master["start"], master.get("end", master["start"])
+    all_day = "dateTime" not in start
+    zone = _zone(start)
+    duration = event_time(master, "end") - event_time(master, "start")
+    overridden = {_original_key(event["originalStartTime"]) for event in exceptions}
+
+    # Widen the range by the duration and a day of slack for the wall clock.
+    first = (
+        time_min.astimezone(zone).replace(tzinfo=None) - duration - timedelta(days=1)
+    )
+    last = time_max.astimezone(zone).replace(tzinfo=None) + timedelta(days=1)
+
+    template = {key: value for key, value in master.items() if key != "recurrence"}
+    instances = []
+    for occurrence in _occurrences(master, zone, first, last):
+        if all_day:
+            instance_start = occurrence.replace(tzinfo=timezone.utc)
+            key = occurrence.date()
+            start_field = {"date": key.isoformat()}
+            end_field = {"date": (key + duration).isoformat()}
+        else:
+            instance_start = occurrence.replace(tzinfo=zone)
+            key = instance_start.astimezone(timezone.utc)
+            start_field = {**start, "dateTime": instance_start.isoformat()}
+            end_field = {**end, "dateTime": (instance_start + duration).isoformat()}
+
+        if key in overridden:
+            continue
+        if not (instance_start < time_max and instance_start + duration > time_min):
+            continue
+
+        instances.append(
+            {
+                **template,
+                "id": _instance_id(master["id"], instance_start, all_day),
+                "recurringEventId": master["id"],
+                "originalStartTime": dict(start_field),
+                "start": start_field,
+                "end": end_field,
+            }
+        )
+    return instances
+
+
+def expand_events(
+    events: list[dict], time_min: datetime, time_max: datetime
+) -> list[dict]:
+    """
+    Expand a `singleEvents=False` listing into the events of `singleEvents=True`.
+
+    Args:
+        events (list[dict]): Single events, recurring masters and exceptions. Cancelled
+            events are dropped, cancelled exceptions remove their instance.
+        time_min (datetime): The start of the listed time range.
+        time_max (datetime): The end of the listed time range.
+
+    Returns:
+        list[dict]: The single events and instances overlapping the time range, in
+        `startTime` order.
+    """
+    exceptions: dict[str, list[dict]] = {}
+    for event in events:
+        if event.get("recurringEventId") and "originalStartTime" in event:
+            exceptions.setdefault(event["recurringEventId"], []).append(event)
+
+    expanded = []
+    for event in events:
+        if event.get("status") == "cancelled":
+            continue
+        if "recurrence" in event:
+            expanded.extend(
+                expand_event(event, time_min, time_max, exceptions.get(event["id"], ()))
+            )
+        elif (
+            event_time(event, "start") < time_max
+            and event_time(event, "end") > time_min
+        ):
+            expanded.append(event)
+
+    expanded.sort(key=event_time)
+    return expanded
@@ -0,0 +1,234 @@
+"""
+# **RequestScheduler**
+
+This module provides the scheduler every Google Calendar API request of the
+collector goes through. The scheduler throttles requests with a per-project
+and a per-user token bucket, and retries requests the API rejected because of
+rate limits or server errors with exponential backoff and jitter, honoring the
+`Retry-After` header. A request that keeps failing raises `CalendarAPIError`
+instead of silently truncating the collected events.
+"""
+
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Mapping
+
+import aiohttp
+
+from google_calendar_analytics.core import exceptions
+
+Response = tuple[int, Mapping[str, str], Any]
+
+
+class TokenBucket:
+    """
+    An asyncio token bucket.
+
+    Args:
+        rate (float): The number of tokens added per second.
+        capacity (float, optional): The maximum number of tokens, i.e. the largest burst.
+            Defaults to `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket, waiting until enough are available.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= tokens
+        return waited
+
+
+@dataclass
+class SchedulerStats:
+    """
+    Counters of a RequestScheduler.
+
+    Attributes:
+        requests (int): The number of requests sent, retries included.
+        retries (int): The number of requests that were retried.
+        failures (int): The number of requests that failed for good.
+        throttle_waits (int): The number of requests delayed by a token bucket.
+        throttle_wait_seconds (float): The total time spent waiting for a token bucket.
+        backoff_seconds (float): The total time spent waiting before retries.
+    """
+
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    throttle_waits: int = 0
+    throttle_wait_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+
+
+class RequestScheduler:
+    """
+    Throttles and retries Google Calendar API requests.
+
+    A scheduler can be shared by many collectors. The project bucket then limits
+    the request rate of the whole process, while every user gets a bucket of its own.
+
+    Args:
+        project_rate (float): The requests per second allowed for the whole project.
+        user_rate (float): The requests per second allowed for a single user.
+        max_retries (int): The number of times a request is retried before failing.
+        base_delay (float): The backoff delay of the first retry, in seconds.
+        max_delay (float): The largest backoff delay, in seconds.
+        max_users (int): The number of user buckets kept. The bucket of the least recently
+            active user is dropped first, a returning user starts with a full bucket.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded"})
+
+    def __init__(
+        self,
+        project_rate: float = 100.0,
+        user_rate: float = 10.0,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 32.0,
+        max_users: int = 10_000,
+    ):
+        self.project_bucket = TokenBucket(project_rate)
+        self.user_rate = user_rate
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_users = max_users
+        self.stats = SchedulerStats()
+        self._user_buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def _user_bucket(self, user: str) -> TokenBucket:
+        bucket = self._user_buckets.get(user)
+        if bucket is None:
+            bucket = self._user_buckets[user] = TokenBucket(self.user_rate)
+            while len(self._user_buckets) > self.max_users:
+                self._user_buckets.popitem(last=False)
+        else:
+            self._user_buckets.move_to_end(user)
+        return bucket
+
+    async def _throttle(self, user: str) -> None:
+        waited = await self.project_bucket.acquire()
+        waited += await self._user_bucket(user).acquire()
+        if waited:
+            self.stats.throttle_waits += 1
+            self.stats.throttle_wait_seconds += waited
+
+    @classmethod
+    def _is_retryable(cls, status: int, payload: Any) -> bool:
+        if status in cls.RETRY_STATUSES:
+            return True
+        if status == 403 and isinstance(payload, dict):
+            errors = payload.get("error", {}).get("errors", [])
+            return any(
+                error.get("reason") in cls.RATE_LIMIT_REASONS for error in errors
+            )
+        return False
+
+    @staticmethod
+    def _retry_after(headers: Mapping[str, str]) -> float | None:
+        """Parse a `Retry-After` header given either in seconds or as an HTTP date."""
+        value = headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    @staticmethod
+    def _error_message(payload: Any) -> str:
+        if isinstance(payload, dict):
+            return str(payload.get("error", {}).get("message", ""))
+        return ""
+
+    async def run(
+        self,
+        send: Callable[[], Awaitable[Response]],
+        user: str = "default",
+    ) -> Any:
+        """
+        Send a request through the token buckets, retrying it when it is retryable.
+
+        Args:
+            send (Callable): Sends the request and returns its status, headers and payload.
+                It is called once per attempt.
+            user (str): The user the request is made for.
+
+        Returns:
+            Any: The payload of the successful response.
+
+        Raises:
+            CalendarAPIError: If the request failed with a non-retryable status, or
+                still failed after `max_retries` retries.
+        """
+        attempt = 0
+        while True:
+            await self._throttle(user)
+            self.stats.requests += 1
+
+            headers: Mapping[str, str] = {}
+            try:
+                status, headers, payload = await send()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, payload = 0, {"error": {"message": str(e)}}
+                retryable = True
+            else:
+                if status < 400:
+                    return payload
+                retryable = self._is_retryable(status, payload)
+
+            if not retryable or attempt >= self.max_retries:
+                self.stats.failures += 1
+                raise exceptions.CalendarAPIError(
+                    status, self._error_message(payload), attempts=attempt + 1
+                )
+
+            delay = self._retry_after(headers)
+            if delay is None:
+                delay = self._backoff(attempt)
+
+            self.stats.retries += 1
+            self.stats.backoff_seconds += delay
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,158 @@
+"""
+# **EventStore**
+
+This module provides a local store of calendar events that is kept current with
+the incremental synchronization of the Google Calendar API. After one full sync
+the store remembers the `nextSyncToken` of every calendar, so the following syncs
+only download the events that changed or were deleted since the previous one.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+
+def event_time(event: dict, key: str = "start") -> datetime:
+    """
+    Return the start or end of an event as an aware datetime.
+
+    All-day events only carry a `date`, they are treated as starting at UTC midnight.
+
+    Args:
+        event (dict): The event resource.
+        key (str): Either "start" or "end".
+
+    Returns:
+        datetime: The moment the event starts or ends.
+    """
+    moment = event.get(key, {})
+    if "dateTime" in moment:
+        return datetime.fromisoformat(moment["dateTime"])
+    if "date" in moment:
+        return datetime.fromisoformat(moment["date"]).replace(tzinfo=timezone.utc)
+    return datetime.min.replace(tzinfo=timezone.utc)
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Treat naive datetimes as UTC, the same way the collector queries the API."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+@dataclass
+class EventChanges:
+    """
+    The changes a sync applied to the store.
+
+    Attributes:
+        added (list[dict]): Events that were not in the store before.
+        removed (list[dict]): Events that were deleted, as they were stored.
+        modified (list[tuple[dict, dict]]): Pairs of (previous, current) event versions.
+        reset (bool): Whether the store was emptied before a full sync, so every event
+            is reported as added and the events stored before are gone.
+    """
+
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    modified: list = field(default_factory=list)
+    reset: bool = False
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified or self.reset)
+
+
+class EventStore:
+    """
+    In-memory store of calendar events and their sync tokens.
+
+    A single store can be shared by many collectors, so it outlives the
+    `AnalyzerFacade` sessions that refresh it.
+    """
+
+    def __init__(self):
+        self._events: dict[str, dict[str, dict]] = {}
+        self._sync_tokens: dict[str, str] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def lock(self, calendar_id: str) -> asyncio.Lock:
+        """Return the lock that serializes the syncs of a calendar."""
+        if calendar_id not in self._locks:
+            self._locks[calendar_id] = asyncio.Lock()
+        return self._locks[calendar_id]
+
+    def sync_token(self, calendar_id: str) -> str | None:
+        """Return the token of the last completed sync, if there was one."""
+        return self._sync_tokens.get(calendar_id)
+
+    def set_sync_token(self, calendar_id: str, token: str | None) -> None:
+        if token:
+            self._sync_tokens[calendar_id] = token
+
+    def reset(self, calendar_id: str) -> None:
+        """Forget the events and the sync token of a calendar, forcing a full sync."""
+        self._events.pop(calendar_id, None)
+        self._sync_tokens.pop(calendar_id, None)
+
+    def apply(self, calendar_id: str, items: list[dict]) -> EventChanges:
+        """
+        Apply a page of synced events to the store.
+
+        Cancelled events are removed, every other event replaces its stored version.
+
+        Args:
+            calendar_id (str): The calendar the events belong to.
+            items (list[dict]): The events returned by the API.
+
+        Returns:
+            EventChanges: What changed in the store.
+        """
+        events = self._events.setdefault(calendar_id, {})
+        changes = EventChanges()
+
+        for item in items:
+            event_id = item.get("id")
+            if event_id is None:
+                continue
+
+            previous = events.get(event_id)
+            if item.get("status") == "cancelled":
+                if previous is not None:
+                    del events[event_id]
+                    changes.removed.append(previous)
+                continue
+
+            events[event_id] = item
+            if previous is None:
+                changes.added.append(item)
+            else:
+                changes.modified.append((previous, item))
+
+        return changes
+
+    def events_between(
+        self, calendar_id: str, start_time: datetime, end_time: datetime
+    ) -> list[dict]:
+        """
+        Return the stored events overlapping a time range, ordered by start time.
+
+        Args:
+            calendar_id (str): The calendar to read.
+            start_time (datetime): The start of the time range.
+            end_time (datetime): The end of the time range.
+
+        Returns:
+            list[dict]: The matching events.
+        """
+        start_time, end_time = as_utc(start_time), as_utc(end_time)
+        events = [
+            event
+            for event in self._events.get(calendar_id, {}).values()
+            if event_time(event, "start") < end_time
+            and event_time(event, "end") > start_time
+        ]
+        events.sort(key=event_time)
+        return events
+
+    def __len__(self):
+        return sum(len(events) for events in self._events.values())
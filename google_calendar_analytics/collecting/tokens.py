@@ -0,0 +1,70 @@
+"""
+# **TokenRefresher**
+
+This module keeps the access token of the collector's credentials fresh.
+`google-auth` refreshes credentials with a blocking HTTP call, so the refresh
+runs in a worker thread, and concurrent requests share a single in-flight
+refresh instead of each refreshing the token on its own.
+"""
+
+import asyncio
+import datetime
+
+from google.auth.transport.requests import Request  # type: ignore
+from google.oauth2.credentials import Credentials  # type: ignore
+
+
+class TokenRefresher:
+    """
+    Refreshes Google credentials without blocking the event loop.
+
+    Args:
+        creds (Credentials): The credentials to keep fresh.
+        margin (float): The number of seconds before expiry at which the token
+            is refreshed proactively.
+    """
+
+    def __init__(self, creds: Credentials, margin: float = 300):
+        self.creds = creds
+        self.margin = datetime.timedelta(seconds=margin)
+        self.refreshes = 0
+        self._refreshing: asyncio.Future | None = None
+
+    @property
+    def can_refresh(self) -> bool:
+        return bool(getattr(self.creds, "refresh_token", None))
+
+    def _expires_soon(self) -> bool:
+        # google-auth stores the expiry as a naive UTC datetime.
+        expiry = getattr(self.creds, "expiry", None)
+        if expiry is None:
+            return False
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return expiry - now < self.margin
+
+    def _refresh(self) -> None:
+        self.creds.refresh(Request())
+        self.refreshes += 1
+
+    async def refresh(self, stale_token: str | None = None) -> None:
+        """
+        Refresh the credentials, joining the refresh already in flight if there is one.
+
+        Args:
+            stale_token (str, optional): The token a request was rejected with. If the
+                credentials already hold another token, it was refreshed in the meantime
+                and no new refresh is started.
+        """
+        if stale_token is not None and self.creds.token != stale_token:
+            return
+
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(asyncio.to_thread(self._refresh))
+
+        await asyncio.shield(self._refreshing)
+
+    async def token(self) -> str:
+        """Return a valid access token, refreshing it first when it is about to expire."""
+        if self.can_refresh and (self._expires_soon() or not self.creds.token):
+            await self.refresh()
+        return self.creds.token
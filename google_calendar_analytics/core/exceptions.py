@@ -37,3 +37,19 @@ class InvalidPlotTypeError(ValueError):
             f"\n\nThe plot type '{self.plot_type}' is invalid for '{self.method}'. \n"
             f"Please choose from the following options: {options_str}. \n\n"
         )
+
+
+@dataclass
+class CalendarAPIError(RuntimeError):
+    status: int
+    message: str = ""
+    attempts: int = 1
+
+    def __str__(self):
+        return (
+            f"\n\nThe Google Calendar API request failed with status {self.status} "
+            f"after {self.attempts} attempt(s). \n"
+            f"{self.message}\n\n"
+            f"If the API is rate limiting the requests, try lowering the request rates "
+            f"of the RequestScheduler or the number of concurrent requests."
+        )
@@ -0,0 +1,330 @@
+"""
+# **Columnar events**
+
+This module provides `EventColumns`, a compact, columnar container of timed
+events. Every event takes about 32 bytes: its UTC start and end as int64 epoch
+milliseconds, its duration as float32 hours, its local start date as an int32
+day number, and its summary and calendar as int32 codes into string tables.
+Events can be appended page by page as they are collected, so the event
+resources never have to be held in memory all at once, and the columns pickle
+into their raw arrays, so they are cheap to send to worker processes.
+"""
+
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+from google_calendar_analytics.collecting.decoding import EventRecord
+
+_SUFFIX = re.compile(r"(\.\d+)?(Z|[+-]\d{2}:?\d{2})?")
+
+_COLUMNS = ("start", "end", "duration", "day", "summary_code", "calendar_code")
+_DTYPES = (np.int64, np.int64, np.float32, np.int32, np.int32, np.int32)
+
+
+def parse_utc(values: pd.Series) -> pd.Series:
+    """
+    Parse ISO 8601 timestamps with mixed UTC offsets into UTC datetimes.
+
+    Args:
+        values (pd.Series): ISO 8601 strings.
+
+    Returns:
+        pd.Series: The timestamps as `datetime64[ns, UTC]`.
+    """
+    try:
+        return pd.to_datetime(values, utc=True, format="ISO8601")
+    except ValueError:
+        # pandas < 2.0 has no "ISO8601" format but parses mixed offsets without one.
+        return pd.to_datetime(values, utc=True)
+
+
+@functools.lru_cache(maxsize=1024)
+def _suffix_ms(suffix: str) -> int:
+    """
+    Return the milliseconds to add to the local part of an ISO timestamp to get UTC.
+
+    The suffix is everything after `YYYY-MM-DDTHH:MM:SS`: optional fractional seconds
+    and the UTC offset. A calendar only uses a handful of distinct suffixes, so they
+    are parsed once and cached.
+    """
+    match = _SUFFIX.fullmatch(suffix)
+    if match is None:
+        raise ValueError(f"Invalid ISO 8601 suffix: {suffix!r}")
+    fraction, offset = match.groups()
+    milliseconds = round(float("0" + fraction) * 1000) if fraction else 0
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        hours, minutes = int(offset[1:3]), int(offset[-2:])
+        milliseconds -= sign * (hours * 60 + minutes) * 60_000
+    return milliseconds
+
+
+def _parse_local(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse ISO timestamps into their local wall-clock time and their UTC time.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The local and the UTC times as `datetime64[ms]`.
+
+    Raises:
+        ValueError: If a timestamp is not `YYYY-MM-DDTHH:MM:SS[.fff][offset]`.
+    """
+    local = np.array([value[:19] for value in values], dtype="datetime64[ms]")
+    adjust = np.fromiter(
+        (_suffix_ms(value[19:]) for value in values), dtype=np.int64, count=len(values)
+    )
+    return local, local + adjust.astype("timedelta64[ms]")
+
+
+def _parse_times(
+    starts: list[str], ends: list[str]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parse ISO starts and ends.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The UTC starts and ends as epoch
+        milliseconds and the local start dates as days since the epoch.
+    """
+    try:
+        local_start, utc_start = _parse_local(starts)
+        _, utc_end = _parse_local(ends)
+        day = local_start.astype("datetime64[D]")
+    except ValueError:
+        utc_start = (
+            parse_utc(pd.Series(starts, dtype=object)).dt.tz_localize(None).to_numpy()
+        )
+        utc_end = (
+            parse_utc(pd.Series(ends, dtype=object)).dt.tz_localize(None).to_numpy()
+        )
+        # The first ten characters of an ISO timestamp are its local date.
+        day = np.array([start[:10] for start in starts], dtype="datetime64[D]")
+    return (
+        utc_start.astype("datetime64[ms]").astype(np.int64),
+        utc_end.astype("datetime64[ms]").astype(np.int64),
+        day.astype(np.int64),
+    )
+
+
+def timed_rows(
+    events: list, summary: str | None = None, untitled: bool = False
+) -> tuple[list, list, list, list]:
+    """
+    Extract the summary, ISO start, ISO end and calendar id of every timed event.
+
+    All-day events are skipped, and so are events without a title unless `untitled`.
+
+    Args:
+        events (list): Event dictionaries or EventRecords.
+        summary (str, optional): Only keep the events with this title.
+        untitled (bool): Keep the events without a title, with a None summary.
+
+    Returns:
+        tuple[list, list, list, list]: The summaries, starts, ends and calendar ids.
+    """
+    summaries, starts, ends, calendars = [], [], [], []
+    for event in events:
+        if isinstance(event, EventRecord):
+            if event.all_day or (event.summary is None and not untitled):
+                continue
+            if summary is not None and event.summary != summary:
+                continue
+            title, start, end = event.summary, event.start, event.end
+            calendar_id = event.calendar_id
+        else:
+            start = event.get("start", {}).get("dateTime")
+            end = event.get("end", {}).get("dateTime")
+            title = event.get("summary")
+            if not start or not end or (title is None and not untitled):
+                continue
+            if summary is not None and title != summary:
+                continue
+            calendar_id = event.get("calendarId")
+        summaries.append(title)
+        starts.append(start)
+        ends.append(end)
+        calendars.append(calendar_id)
+    return summaries, starts, ends, calendars
+
+
+class EventColumns:
+    """
+    A compact, columnar container of timed events.
+
+    All-day events and events without a title are left out, like in the strategies,
+    unless the untitled events are kept for the interval strategies. Appended pages are kept as chunks and concatenated the first time a column is read.
+
+    Attributes:
+        summaries (list[str | None]): The string table of the summary codes.
+        calendars (list[str | None]): The string table of the calendar codes.
+
+    Examples:
+        ```python
+        columns = EventColumns()
+        async for page in collector.iter_events(start_time, end_time, pages=True, flat=True):
+            columns.extend(page)
+        top = ManyEventsDurationStrategy().calculate_frame(columns.to_frame())
+        ```
+    """
+
+    def __init__(self):
+        self.summaries: list[str | None] = []
+        self.calendars: list[str | None] = []
+        self._summary_codes: dict[str | None, int] = {}
+        self._calendar_codes: dict[str | None, int] = {}
+        self._chunks: list[tuple[np.ndarray, ...]] = []
+
+    @classmethod
+    def from_events(
+        cls, events: list, summary: str | None = None, untitled: bool = False
+    ) -> "EventColumns":
+        """Build the columns of a list of event dictionaries or EventRecords."""
+        columns = cls()
+        columns.extend(events, summary=summary, untitled=untitled)
+        return columns
+
+    @staticmethod
+    def _encode(values: list, table: list, codes: dict) -> np.ndarray:
+        encoded = np.empty(len(values), dtype=np.int32)
+        for index, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(table)
+                table.append(value)
+            encoded[index] = code
+        return encoded
+
+    def extend(
+        self, events: list, summary: str | None = None, untitled: bool = False
+    ) -> None:
+        """
+        Append a page of events.
+
+        Args:
+            events (list): Event dictionaries or EventRecords.
+            summary (str, optional): Only keep the events with this title.
+            untitled (bool): Keep the events without a title, with a None summary.
+        """
+        summaries, starts, ends, calendars = timed_rows(events, summary, untitled)
+        if not summaries:
+            return
+
+        start, end, day = _parse_times(starts, ends)
+        duration = np.round((end - start) / 3_600_000, 2).astype(np.float32)
+        self._chunks.append(
+            (
+                start,
+                end,
+                duration,
+                day.astype(np.int32),
+                self._encode(summaries, self.summaries, self._summary_codes),
+                self._encode(calendars, self.calendars, self._calendar_codes),
+            )
+        )
+
+    def _column(self, name: str) -> np.ndarray:
+        if len(self._chunks) != 1:
+            if not self._chunks:
+                index = _COLUMNS.index(name)
+                return np.empty(0, dtype=_DTYPES[index])
+            self._chunks = [
+                tuple(np.concatenate(column) for column in zip(*self._chunks))
+            ]
+        return self._chunks[0][_COLUMNS.index(name)]
+
+    @property
+    def start(self) -> np.ndarray:
+        """The UTC starts, in epoch milliseconds."""
+        return self._column("start")
+
+    @property
+    def end(self) -> np.ndarray:
+        """The UTC ends, in epoch milliseconds."""
+        return self._column("end")
+
+    @property
+    def duration(self) -> np.ndarray:
+        """The durations, in hours rounded to two decimals."""
+        return self._column("duration")
+
+    @property
+    def day(self) -> np.ndarray:
+        """The local dates the events start on, in days since the epoch."""
+        return self._column("day")
+
+    @property
+    def summary_codes(self) -> np.ndarray:
+        return self._column("summary_code")
+
+    @property
+    def calendar_codes(self) -> np.ndarray:
+        return self._column("calendar_code")
+
+    def __len__(self) -> int:
+        return sum(len(chunk[0]) for chunk in self._chunks)
+
+    def __getstate__(self) -> dict:
+        # Only the arrays and string tables are pickled, the code lookups are rebuilt.
+        return {
+            "summaries": self.summaries,
+            "calendars": self.calendars,
+            "columns": tuple(self._column(name) for name in _COLUMNS),
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.summaries = state["summaries"]
+        self.calendars = state["calendars"]
+        self._summary_codes = {value: code for code, value in enumerate(self.summaries)}
+        self._calendar_codes = {
+            value: code for code, value in enumerate(self.calendars)
+        }
+        self._chunks = [state["columns"]] if len(state["columns"][0]) else []
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the columns, without the string tables."""
+        return sum(column.nbytes for chunk in self._chunks for column in chunk)
+
+    def to_frame(self, summary: str | None = None) -> pd.DataFrame:
+        """
+        Expand the columns into the normalized event frame of `events_to_frame`.
+
+        Args:
+            summary (str, optional): Only keep the events with this title.
+
+        Returns:
+            pd.DataFrame: The normalized events.
+        """
+        mask: slice | np.ndarray = slice(None)
+        if summary is not None:
+            code = self._summary_codes.get(summary)
+            if code is None:
+                mask = np.zeros(len(self), dtype=bool)
+            else:
+                mask = self.summary_codes == code
+
+        start = self.start[mask].astype("datetime64[ms]").astype("datetime64[ns]")
+        end = self.end[mask].astype("datetime64[ms]").astype("datetime64[ns]")
+        day = self.day[mask].astype("datetime64[D]").astype("datetime64[ns]")
+        summaries = np.array(self.summaries, dtype=object)
+        calendars = np.array(self.calendars, dtype=object)
+
+        return pd.DataFrame(
+            {
+                "summary": pd.Series(
+                    summaries[self.summary_codes[mask]] if len(summaries) else [],
+                    dtype=object,
+                ),
+                "start": pd.Series(start).dt.tz_localize("UTC"),
+                "end": pd.Series(end).dt.tz_localize("UTC"),
+                "duration": pd.Series(self.duration[mask].astype(np.float64)).round(2),
+                "day": pd.Series(day),
+                "calendar_id": pd.Series(
+                    calendars[self.calendar_codes[mask]] if len(calendars) else [],
+                    dtype=object,
+                ),
+            }
+        )
@@ -0,0 +1,46 @@
+"""
+# **Event frames**
+
+This module normalizes collected events into a single pandas DataFrame, the
+columnar form every duration strategy works on. Timestamps are parsed and
+durations computed once, with vectorized operations, instead of once per event
+and strategy.
+"""
+
+import pandas as pd
+
+from .columnar import EventColumns
+
+FRAME_COLUMNS = ("summary", "start", "end", "duration", "day", "calendar_id")
+
+
+def events_to_frame(
+    events, summary: str | None = None, untitled: bool = False
+) -> pd.DataFrame:
+    """
+    Normalize events into a DataFrame with one row per timed event.
+
+    All-day events are left out, and so are events without a title unless `untitled`,
+    like in the strategies.
+
+    Args:
+        events: Event dictionaries, EventRecords or EventColumns. A DataFrame that is
+            already normalized is returned as is.
+        summary (str, optional): Only keep the events with this title. Filtering before
+            the timestamps are parsed is much cheaper than filtering the frame.
+        untitled (bool): Keep the events without a title, with a None summary. The
+            interval strategies count them, since they still block time.
+
+    Returns:
+        pd.DataFrame: The columns `summary`, `start` and `end` (UTC), `duration` (hours,
+        rounded to two decimals), `day` (the local date the event starts on) and
+        `calendar_id`.
+    """
+    if isinstance(events, pd.DataFrame):
+        if summary is not None:
+            return events[events["summary"] == summary]
+        return events
+
+    if not isinstance(events, EventColumns):
+        events = EventColumns.from_events(events, summary=summary, untitled=untitled)
+    return events.to_frame(summary=summary)
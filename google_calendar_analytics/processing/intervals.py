@@ -0,0 +1,313 @@
+"""
+# **Interval sweep**
+
+This module analyzes events as time intervals instead of summing their
+durations, so double-booked time is only counted once and free time can be
+measured. All metrics come from one sweep over the sorted start and end points
+of the events, in O(n log n):
+
+- busy time: the time covered by at least one event
+- overlap: the time covered by at least two events (double-booking)
+- maximum concurrency: the largest number of events running at once
+- free time: the time without events within working hours
+- longest free block: the longest time without events within working hours
+
+The strategies of this module return the "Date" and "Duration" columns of the
+line plots, or the "Event" and "Duration" columns of the bar and pie plots.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from google_calendar_analytics.collecting.store import as_utc
+
+from .frame import events_to_frame
+from .transformer import EventDurationStrategy
+
+SWEEP_COLUMNS = ("Date", "Busy", "Overlap", "MaxConcurrent", "Free", "LongestFree")
+
+_HOUR_NS = 3_600_000_000_000
+
+
+def _utc_ns(times: pd.Series) -> np.ndarray:
+    naive = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    return naive.to_numpy("datetime64[ns]").astype(np.int64)
+
+
+def _localize(times: pd.DatetimeIndex, timezone: str) -> np.ndarray:
+    """Turn naive wall-clock times of a timezone into UTC nanoseconds."""
+    aware = times.tz_localize(timezone, ambiguous=False, nonexistent="shift_forward")
+    naive = aware.tz_convert("UTC").tz_localize(None)
+    return naive.to_numpy("datetime64[ns]").astype(np.int64)
+
+
+def daily_sweep(
+    frame: pd.DataFrame,
+    timezone: str = "UTC",
+    work_hours: tuple[float, float] = (9, 18),
+    start_time: datetime.datetime | None = None,
+    end_time: datetime.datetime | None = None,
+) -> pd.DataFrame:
+    """
+    Compute the interval metrics of every day of a time range.
+
+    The day boundaries and working hours are placed in `timezone`. They are added
+    to the sweep as points that do not change the number of running events, so every
+    segment between two consecutive points belongs to a single day. The events are
+    clipped to the time range, and the days without events are reported as free.
+
+    Args:
+        frame (pd.DataFrame): Events normalized by `events_to_frame`.
+        timezone (str): The timezone of the days and working hours.
+        work_hours (tuple[float, float]): The start and end hour of the working day the
+            free blocks are searched in. (0, 24) searches whole days.
+        start_time (datetime, optional): The start of the time range. Defaults to the
+            start of the day of the first event. Naive datetimes are treated as UTC.
+        end_time (datetime, optional): The end of the time range. Defaults to the end
+            of the day of the last event.
+
+    Returns:
+        pd.DataFrame: The "Date" of every day, its "Busy", "Overlap", "Free" and
+        "LongestFree" hours and its "MaxConcurrent" events.
+    """
+    frame = frame[frame["end"] > frame["start"]]
+    range_start = (
+        pd.Timestamp(as_utc(start_time))
+        if start_time is not None
+        else frame["start"].min()
+    )
+    range_end = (
+        pd.Timestamp(as_utc(end_time)) if end_time is not None else frame["end"].max()
+    )
+    if pd.isna(range_start) or pd.isna(range_end) or range_end <= range_start:
+        return pd.DataFrame(
+            {column: pd.Series(dtype=object) for column in SWEEP_COLUMNS}
+        )
+
+    first = range_start.tz_convert(timezone)
+    last = (range_end - pd.Timedelta(1)).tz_convert(timezone)
+    days = pd.date_range(
+        first.tz_localize(None).normalize(),
+        last.tz_localize(None).normalize(),
+        freq="D",
+    )
+
+    midnights = _localize(days.append(days[-1:] + pd.Timedelta(days=1)), timezone)
+    work_start = _localize(days + pd.Timedelta(hours=work_hours[0]), timezone)
+    work_end = _localize(days + pd.Timedelta(hours=work_hours[1]), timezone)
+
+    # Without a time range, the days of the events are analyzed whole.
+    bounds = np.array(
+        [
+            range_start.value if start_time is not None else midnights[0],
+            range_end.value if end_time is not None else midnights[-1],
+        ],
+        dtype=np.int64,
+    )
+    starts = np.maximum(_utc_ns(frame["start"]), bounds[0])
+    ends = np.minimum(_utc_ns(frame["end"]), bounds[1])
+    clipped = ends > starts
+    starts, ends = starts[clipped], ends[clipped]
+
+    times = np.concatenate((starts, ends, midnights, work_start, work_end, bounds))
+    deltas = np.concatenate(
+        (
+            np.ones(len(starts), dtype=np.int64),
+            -np.ones(len(ends), dtype=np.int64),
+            np.zeros(len(midnights) + 2 * len(days) + len(bounds), dtype=np.int64),
+        )
+    )
+    # At equal times ends come before starts, so back-to-back events do not overlap.
+    order = np.lexsort((deltas, times))
+    times = times[order]
+    level = np.cumsum(deltas[order])[:-1]
+    segment_start = times[:-1]
+    length = np.diff(times)
+
+    day = np.searchsorted(midnights, segment_start, side="right") - 1
+    inside = (
+        (day >= 0)
+        & (day < len(days))
+        & (segment_start >= bounds[0])
+        & (segment_start < bounds[1])
+    )
+    day, level = day[inside], level[inside]
+    segment_start, length = segment_start[inside], length[inside]
+
+    count = len(days)
+    busy = np.bincount(day, weights=length * (level >= 1), minlength=count)
+    overlap = np.bincount(day, weights=length * (level >= 2), minlength=count)
+    max_concurrent = np.zeros(count, dtype=np.int64)
+    np.maximum.at(max_concurrent, day, level)
+
+    # Consecutive free segments of the working hours of a day form a free block.
+    free = (
+        (level == 0)
+        & (segment_start >= work_start[day])
+        & (segment_start < work_end[day])
+    )
+    free_time = np.bincount(day, weights=length * free, minlength=count)
+    new_day = np.ones(len(day), dtype=bool)
+    new_day[1:] = day[1:] != day[:-1]
+    block = np.cumsum(~free | new_day)[free]
+    block_day = day[free]
+    block_ids, first_segment = np.unique(block, return_index=True)
+    block_length = np.bincount(
+        np.searchsorted(block_ids, block),
+        weights=length[free],
+        minlength=len(block_ids),
+    )
+    longest_free = np.zeros(count, dtype=np.float64)
+    np.maximum.at(longest_free, block_day[first_segment], block_length)
+
+    return pd.DataFrame(
+        {
+            "Date": days.date,
+            "Busy": (busy / _HOUR_NS).round(2),
+            "Overlap": (overlap / _HOUR_NS).round(2),
+            "MaxConcurrent": max_concurrent,
+            "Free": (free_time / _HOUR_NS).round(2),
+            "LongestFree": (longest_free / _HOUR_NS).round(2),
+        }
+    )
+
+
+class IntervalStrategy(EventDurationStrategy):
+    """
+    Base class of the strategies built on `daily_sweep`.
+
+    Subclasses pick the metric of the sweep they report for every day. Events without
+    a title are counted too, since private events and "busy" blocks still take time.
+
+    Attributes:
+        metric (str): The column of `daily_sweep` reported as "Duration".
+        label (str): What the metric measures, used as the title of the plots.
+    """
+
+    required_fields = ("start", "end")
+    metric: str = "Busy"
+    label: str = "busy time"
+
+    async def calculate_duration(  # type: ignore
+        self,
+        events: list[dict],
+        timezone: str = "UTC",
+        work_hours: tuple[float, float] = (9, 18),
+        start_time: datetime.datetime | None = None,
+        end_time: datetime.datetime | None = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate the metric of every day.
+
+        Args:
+            events (list): Event dictionaries, EventRecords, EventColumns or a normalized
+                event frame.
+            timezone (str): The timezone of the days and working hours.
+            work_hours (tuple[float, float]): The working hours free blocks are searched in.
+            start_time (datetime, optional): The start of the analysis. Defaults to the
+                start of the first event.
+            end_time (datetime, optional): The end of the analysis. Defaults to the end
+                of the last event.
+
+        Returns:
+            pandas.DataFrame: Dataframe with the "Date" and "Duration" columns.
+        """
+        return self.calculate_frame(
+            events_to_frame(events, untitled=True),
+            timezone=timezone,
+            work_hours=work_hours,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    def calculate_frame(  # type: ignore
+        self,
+        frame: pd.DataFrame,
+        timezone: str = "UTC",
+        work_hours: tuple[float, float] = (9, 18),
+        start_time: datetime.datetime | None = None,
+        end_time: datetime.datetime | None = None,
+    ) -> pd.DataFrame:
+        daily = daily_sweep(
+            frame,
+            timezone=timezone,
+            work_hours=work_hours,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        return pd.DataFrame({"Date": daily["Date"], "Duration": daily[self.metric]})
+
+
+class BusyTimeStrategy(IntervalStrategy):
+    """The hours covered by at least one event, without counting overlaps twice."""
+
+    metric = "Busy"
+    label = "busy time"
+
+
+class OverlapStrategy(IntervalStrategy):
+    """The double-booked hours, covered by at least two events at once."""
+
+    metric = "Overlap"
+    label = "double-booked time"
+
+
+class ConcurrencyStrategy(IntervalStrategy):
+    """The maximum number of events running at the same time."""
+
+    metric = "MaxConcurrent"
+    label = "concurrent events"
+
+
+class FreeTimeStrategy(IntervalStrategy):
+    """The longest block of hours without events within the working hours."""
+
+    metric = "LongestFree"
+    label = "the longest free block"
+
+
+class IntervalTotalsStrategy(IntervalStrategy):
+    """
+    The total busy, double-booked and free working hours of the whole time range.
+
+    "Busy" only counts the time covered by exactly one event, so the rows add up to
+    the time covered by events plus the free working hours.
+
+    The result has the "Event" and "Duration" columns of the bar and pie plots.
+    """
+
+    label = "busy and free time"
+
+    def calculate_frame(  # type: ignore
+        self,
+        frame: pd.DataFrame,
+        timezone: str = "UTC",
+        work_hours: tuple[float, float] = (9, 18),
+        start_time: datetime.datetime | None = None,
+        end_time: datetime.datetime | None = None,
+    ) -> pd.DataFrame:
+        daily = daily_sweep(
+            frame,
+            timezone=timezone,
+            work_hours=work_hours,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        busy, overlap, free = (
+            daily["Busy"].sum(),
+            daily["Overlap"].sum(),
+            daily["Free"].sum(),
+        )
+
+        return pd.DataFrame(
+            {
+                "Event": ["Busy", "Double-booked", "Free"],
+                "Duration": [
+                    round(busy - overlap, 2),
+                    round(overlap, 2),
+                    round(free, 2),
+                ],
+            }
+        )
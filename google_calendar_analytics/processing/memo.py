@@ -0,0 +1,204 @@
+"""
+# **Transform memoization**
+
+This module provides `TransformCache`, a size-bounded LRU cache of strategy
+results with an optional time to live. Results are keyed by a fingerprint of
+the events, the strategy and its parameters, so re-rendering a dashboard over
+events that did not change skips the transform entirely.
+
+The fingerprint of event resources is built from their ids and etags, which
+the API changes on every modification of an event. Events without an etag,
+e.g. partial responses or EventRecords, are fingerprinted by the fields the
+strategies read.
+
+```python
+cache = TransformCache(maxsize=256, ttl=600)
+top = await cache.calculate_duration(ManyEventsDurationStrategy(), events, max_events=5)
+```
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from google_calendar_analytics.collecting.decoding import EventRecord
+
+from .columnar import EventColumns
+
+
+def event_fingerprint(events) -> str:
+    """
+    Return a content fingerprint of a set of events.
+
+    Args:
+        events: Event dictionaries, EventRecords, EventColumns or a normalized event frame.
+
+    Returns:
+        str: A hex digest that changes whenever an event is added, removed, reordered
+        or modified.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(events, EventColumns):
+        for column in (
+            events.start,
+            events.end,
+            events.summary_codes,
+            events.calendar_codes,
+        ):
+            digest.update(np.ascontiguousarray(column).tobytes())
+        digest.update(repr((events.summaries, events.calendars)).encode())
+    elif isinstance(events, pd.DataFrame):
+        digest.update(
+            pd.util.hash_pandas_object(events, index=False).to_numpy().tobytes()
+        )
+        digest.update(repr(tuple(events.columns)).encode())
+    else:
+        for event in events:
+            if isinstance(event, EventRecord):
+                key = repr(tuple(event))
+            elif "etag" in event:
+                key = (
+                    f"{event.get('id')}\x1f{event['etag']}\x1f{event.get('calendarId')}"
+                )
+            else:
+                key = repr(
+                    (
+                        event.get("id"),
+                        event.get("summary"),
+                        event.get("start"),
+                        event.get("end"),
+                        event.get("calendarId"),
+                    )
+                )
+            digest.update(key.encode())
+            digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+@dataclass
+class TransformCacheStats:
+    """
+    Counters of a TransformCache.
+
+    Attributes:
+        hits (int): The lookups answered from the cache.
+        misses (int): The lookups that had to compute the result.
+        evictions (int): The results dropped to stay within `maxsize`.
+        expirations (int): The results dropped because they outlived the `ttl`.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TransformCache:
+    """
+    A size-bounded LRU cache of strategy results with an optional time to live.
+
+    Cached frames are copied on the way in and out, so callers can modify the frames
+    they get without corrupting the cache. Errors, such as NotEnoughDataError, are not
+    cached.
+
+    Args:
+        maxsize (int): The maximum number of results kept. The least recently used result
+            is evicted first.
+        ttl (float, optional): The seconds a result is kept. By default results only
+            leave the cache when they are evicted.
+
+    Attributes:
+        stats (TransformCacheStats): The hit, miss, eviction and expiration counters.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = TransformCacheStats()
+        # Results by key, with the monotonic time they expire at, least recent first.
+        self._entries: OrderedDict[tuple, tuple[float, pd.DataFrame]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(strategy, fingerprint: str, *args, **kwargs) -> tuple:
+        """Return the cache key of a strategy run on the events of a fingerprint."""
+        strategy_type = type(strategy)
+        return (
+            f"{strategy_type.__module__}.{strategy_type.__qualname__}",
+            fingerprint,
+            repr(args),
+            repr(sorted(kwargs.items())),
+        )
+
+    def get(self, key: tuple) -> pd.DataFrame | None:
+        """Return the cached result of a key, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1].copy()
+
+    def put(self, key: tuple, result: pd.DataFrame) -> None:
+        """Cache the result of a key, evicting the least recently used results."""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires, result.copy())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def memoize(
+        self, key: tuple, calculate: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Return the cached result of a key, calculating and caching it on a miss."""
+        result = self.get(key)
+        if result is None:
+            result = calculate()
+            self.put(key, result)
+        return result
+
+    async def calculate_duration(
+        self, strategy, events, *args, **kwargs
+    ) -> pd.DataFrame:
+        """
+        Run `strategy.calculate_duration`, or return its cached result.
+
+        Args:
+            strategy (EventDurationStrategy): The strategy to run.
+            events: The events, as accepted by the strategy.
+            *args: The positional arguments of the strategy.
+            **kwargs: The keyword arguments of the strategy.
+
+        Returns:
+            pd.DataFrame: The result of the strategy.
+        """
+        key = self.key(strategy, event_fingerprint(events), *args, **kwargs)
+        result = self.get(key)
+        if result is None:
+            result = await strategy.calculate_duration(events, *args, **kwargs)
+            self.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
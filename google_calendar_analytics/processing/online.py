@@ -0,0 +1,260 @@
+"""
+# **Online aggregates**
+
+This module provides aggregates that are kept current from event deltas
+instead of being recomputed from all events. Every aggregate keeps a running
+total and event count per key, and `apply` adds the added events, subtracts the
+removed ones and swaps the modified ones, at O(changes) cost. Their `to_frame`
+returns the same frame as the matching strategy.
+
+Paired with the incremental sync of the collector, a dashboard stays current
+with the few events that changed since the previous sync:
+
+```python
+totals = SummaryTotals()
+async with AnalyzerFacade(creds, store=store) as analyzer:
+    totals.apply_changes(await analyzer.data_collector.sync())
+top = totals.to_frame(max_events=5)
+```
+"""
+
+import datetime
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from google_calendar_analytics.collecting.store import EventChanges, as_utc
+
+from .columnar import EventColumns
+from .transformer import (
+    EventDurationPeriodsStrategy,
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+
+
+def _epoch_ms(moment: datetime.datetime | None) -> int | None:
+    if moment is None:
+        return None
+    return int(as_utc(moment).timestamp() * 1000)
+
+
+class OnlineAggregate(ABC):
+    """
+    Base class of the aggregates maintained from event deltas.
+
+    A key is dropped as soon as its last event is removed, so the totals do not keep
+    the rounding residue of removed events.
+
+    Args:
+        start_time (datetime, optional): Only count the events that end after it.
+        end_time (datetime, optional): Only count the events that start before it.
+    """
+
+    def __init__(
+        self,
+        start_time: datetime.datetime | None = None,
+        end_time: datetime.datetime | None = None,
+    ):
+        self.start_time = start_time
+        self.end_time = end_time
+        self._totals: dict = {}
+        self._counts: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def _columns(self, events) -> EventColumns:
+        return EventColumns.from_events(events)
+
+    @abstractmethod
+    def _keys(self, columns: EventColumns) -> tuple[np.ndarray, list]:
+        """Return the key position of every event and the keys the positions refer to."""
+
+    def _update(self, events, sign: int) -> None:
+        if not events:
+            return
+        columns = self._columns(events)
+        if not len(columns):
+            return
+
+        positions, keys = self._keys(columns)
+        duration = columns.duration.astype(np.float64)
+        inside = np.ones(len(columns), dtype=bool)
+        if self.start_time is not None:
+            inside &= columns.end > _epoch_ms(self.start_time)
+        if self.end_time is not None:
+            inside &= columns.start < _epoch_ms(self.end_time)
+
+        totals = np.bincount(
+            positions[inside], weights=duration[inside], minlength=len(keys)
+        )
+        counts = np.bincount(positions[inside], minlength=len(keys))
+        for key, total, count in zip(keys, totals, counts):
+            if not count:
+                continue
+            remaining = self._counts.get(key, 0) + sign * int(count)
+            if remaining > 0:
+                self._counts[key] = remaining
+                self._totals[key] = self._totals.get(key, 0.0) + sign * float(total)
+            else:
+                self._counts.pop(key, None)
+                self._totals.pop(key, None)
+
+    def apply(self, added=(), removed=(), modified=()) -> None:
+        """
+        Update the aggregate with the changes of some events.
+
+        Args:
+            added (list): Events that were not counted before.
+            removed (list): Events that were counted before, as they were counted.
+            modified (list[tuple]): Pairs of (previous, current) event versions.
+        """
+        self._update(list(removed) + [previous for previous, _ in modified], -1)
+        self._update(list(added) + [current for _, current in modified], 1)
+
+    def apply_changes(self, changes: EventChanges) -> None:
+        """Update the aggregate with the changes of a sync, starting over after a full sync."""
+        if changes.reset:
+            self.clear()
+        self.apply(changes.added, changes.removed, changes.modified)
+
+    def clear(self) -> None:
+        self._totals.clear()
+        self._counts.clear()
+
+
+class SummaryTotals(OnlineAggregate):
+    """
+    The total duration of every summary, the aggregate of `ManyEventsDurationStrategy`.
+
+    Examples:
+        ```python
+        totals = SummaryTotals()
+        totals.apply(added=events)
+        totals.apply(removed=[cancelled], modified=[(before, after)])
+        totals.to_frame(max_events=5)
+        ```
+    """
+
+    def _keys(self, columns: EventColumns) -> tuple[np.ndarray, list]:
+        return columns.summary_codes, columns.summaries
+
+    def totals(self) -> pd.Series:
+        """Return the hours of every summary, indexed by summary."""
+        return pd.Series(
+            self._totals,
+            index=pd.Index(list(self._totals), dtype=object),
+            dtype=np.float64,
+        ).round(2)
+
+    def to_frame(
+        self, max_events: int = 5, ascending=False, other: bool = False
+    ) -> pd.DataFrame:
+        """Return the "Event" and "Duration" columns of `ManyEventsDurationStrategy`."""
+        totals = self.totals()
+        return ManyEventsDurationStrategy._top_events(
+            totals.index.to_numpy(dtype=object),
+            totals.to_numpy(),
+            max_events,
+            ascending,
+            other,
+        )
+
+
+class DailyTotals(OnlineAggregate):
+    """
+    The daily duration of one event, the aggregate of `OneEventDurationStrategy`.
+
+    Args:
+        event_name (str): The name of the event.
+        start_time (datetime, optional): Only count the events that end after it.
+        end_time (datetime, optional): Only count the events that start before it.
+    """
+
+    def __init__(
+        self,
+        event_name: str,
+        start_time: datetime.datetime | None = None,
+        end_time: datetime.datetime | None = None,
+    ):
+        super().__init__(start_time, end_time)
+        self.event_name = event_name
+
+    def _columns(self, events) -> EventColumns:
+        return EventColumns.from_events(events, summary=self.event_name)
+
+    def _keys(self, columns: EventColumns) -> tuple[np.ndarray, list]:
+        days, positions = np.unique(columns.day, return_inverse=True)
+        return positions.ravel(), [int(day) for day in days]
+
+    def _daily_frame(self) -> pd.DataFrame:
+        """Return one row of a normalized event frame per day, in date order."""
+        days = sorted(self._totals)
+        return pd.DataFrame(
+            {
+                "summary": pd.Series([self.event_name] * len(days), dtype=object),
+                "duration": pd.Series(
+                    [round(self._totals[day], 2) for day in days], dtype=np.float64
+                ),
+                "day": pd.Series(
+                    np.array(days, dtype="datetime64[D]").astype("datetime64[ns]")
+                ),
+            }
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the "Date" and "Duration" columns of `OneEventDurationStrategy`."""
+        return OneEventDurationStrategy().calculate_frame(
+            self._daily_frame(), event_name=self.event_name
+        )
+
+
+class PeriodTotals(DailyTotals):
+    """
+    The daily duration of one event in consecutive periods, the aggregate of
+    `EventDurationPeriodsStrategy`.
+
+    The daily totals are maintained online. The days are only assigned to their periods
+    when the frame is built, so the periods follow the reference date.
+
+    Args:
+        event_name (str): The name of the event.
+        period_days (int): The number of days in each period, for rolling periods.
+        num_periods (int): The number of periods, counted back from the reference date.
+        reference_date (datetime.date, optional): The last day of the analysis. Defaults to
+            the default of `EventDurationPeriodsStrategy` when the frame is built.
+        mode (str): "rolling", "week" (ISO weeks) or "month" (calendar months).
+    """
+
+    def __init__(
+        self,
+        event_name: str,
+        period_days: int = 7,
+        num_periods: int = 2,
+        reference_date: datetime.date | None = None,
+        mode: str = "rolling",
+    ):
+        super().__init__(event_name)
+        self.period_days = period_days
+        self.num_periods = num_periods
+        self.reference_date = reference_date
+        self.mode = mode
+
+    def to_frame(self) -> pd.DataFrame:  # type: ignore
+        """
+        Return the "Date", "Day", "Duration" and "Period" columns of
+        `EventDurationPeriodsStrategy`.
+
+        Raises:
+            NotEnoughDataError: If the event does not occur on every day of the periods.
+        """
+        return EventDurationPeriodsStrategy().calculate_frame(
+            self._daily_frame(),
+            event_name=self.event_name,
+            period_days=self.period_days,
+            num_periods=self.num_periods,
+            reference_date=self.reference_date,
+            mode=self.mode,
+        )
@@ -0,0 +1,259 @@
+"""
+# **Rollup index**
+
+This module provides `RollupIndex`, a precomputed summary × day matrix of
+total event durations with prefix sums along the days. Once it is built, the
+total duration of every summary over any date range is a difference of two
+prefix sums, so the strategies can answer date-range queries without scanning
+the events again.
+
+```python
+columns = await collector.collect_columns(start_time, end_time)
+index = RollupIndex.from_events(columns)
+top = ManyEventsDurationStrategy().calculate_rollup(index, date(2023, 3, 1), date(2023, 3, 31))
+```
+"""
+
+import datetime
+import io
+
+import numpy as np
+import pandas as pd
+
+from .columnar import EventColumns
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _day_number(day: datetime.date | datetime.datetime) -> int:
+    if isinstance(day, datetime.datetime):
+        day = day.date()
+    return (day - _EPOCH).days
+
+
+class RollupIndex:
+    """
+    Total event durations per summary and local day, with prefix sums.
+
+    The matrix is dense: one float64 per summary and day between the first and the
+    last day with events. Updates only mark the prefix sums as stale, they are
+    recomputed by the next query.
+
+    Attributes:
+        summaries (list[str]): The summary of every row.
+        first_day (datetime.date | None): The day of the first column.
+    """
+
+    def __init__(self):
+        self.summaries: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._first = 0
+        self._totals = np.zeros((0, 0), dtype=np.float64)
+        self._prefix: np.ndarray | None = None
+
+    @classmethod
+    def from_events(cls, events) -> "RollupIndex":
+        """Build an index from event dictionaries, EventRecords or EventColumns."""
+        index = cls()
+        index.add(events)
+        return index
+
+    @property
+    def first_day(self) -> datetime.date | None:
+        if not self._totals.shape[1]:
+            return None
+        return _EPOCH + datetime.timedelta(days=self._first)
+
+    @property
+    def last_day(self) -> datetime.date | None:
+        if not self._totals.shape[1]:
+            return None
+        return _EPOCH + datetime.timedelta(days=self._first + self._totals.shape[1] - 1)
+
+    def __len__(self) -> int:
+        return len(self.summaries)
+
+    def _grow(self, codes: list[str], first: int, last: int) -> None:
+        """Make room for new summaries and for the days between `first` and `last`."""
+        for summary in codes:
+            if summary not in self._rows:
+                self._rows[summary] = len(self.summaries)
+                self.summaries.append(summary)
+
+        rows, days = self._totals.shape
+        if days:
+            first, last = min(first, self._first), max(last, self._first + days - 1)
+        new_days = last - first + 1
+        if (len(self.summaries), new_days) == (rows, days):
+            return
+
+        totals = np.zeros((len(self.summaries), new_days), dtype=np.float64)
+        if days:
+            offset = self._first - first
+            totals[:rows, offset : offset + days] = self._totals
+        self._totals = totals
+        self._first = first
+
+    def add(self, events, sign: float = 1.0) -> None:
+        """
+        Add the durations of events to the index.
+
+        Args:
+            events: Event dictionaries, EventRecords or EventColumns.
+            sign (float): 1 to add the events, -1 to remove them again.
+        """
+        if not isinstance(events, EventColumns):
+            events = EventColumns.from_events(events)
+        if not len(events):
+            return
+
+        days = events.day
+        self._grow(events.summaries, int(days.min()), int(days.max()))
+        rows = np.array(
+            [self._rows[summary] for summary in events.summaries], dtype=np.intp
+        )
+        np.add.at(
+            self._totals,
+            (rows[events.summary_codes], days - self._first),
+            sign * events.duration.astype(np.float64),
+        )
+        self._prefix = None
+
+    def remove(self, events) -> None:
+        """Subtract the durations of events that were added before."""
+        self.add(events, sign=-1.0)
+
+    def _prefix_sums(self) -> np.ndarray:
+        if self._prefix is None:
+            rows, days = self._totals.shape
+            self._prefix = np.zeros((rows, days + 1), dtype=np.float64)
+            np.cumsum(self._totals, axis=1, out=self._prefix[:, 1:])
+        return self._prefix
+
+    def _columns(
+        self, start: datetime.date | None, end: datetime.date | None
+    ) -> tuple[int, int]:
+        """Return the half-open column range of the inclusive date range."""
+        days = self._totals.shape[1]
+        low = 0 if start is None else _day_number(start) - self._first
+        high = days if end is None else _day_number(end) - self._first + 1
+        return min(max(low, 0), days), min(max(high, 0), days)
+
+    def totals(
+        self, start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> pd.Series:
+        """
+        Return the total duration of every summary over a date range.
+
+        Args:
+            start (datetime.date, optional): The first day, inclusive. Defaults to the first
+                day of the index.
+            end (datetime.date, optional): The last day, inclusive. Defaults to the last
+                day of the index.
+
+        Returns:
+            pd.Series: The hours of every summary, indexed by summary.
+        """
+        low, high = self._columns(start, end)
+        prefix = self._prefix_sums()
+        values = prefix[:, high] - prefix[:, low] if high > low else np.zeros(len(self))
+        return pd.Series(values.round(2), index=pd.Index(self.summaries, dtype=object))
+
+    def total(
+        self,
+        summary: str,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+    ) -> float:
+        """Return the total duration of one summary over a date range, in hours."""
+        row = self._rows.get(summary)
+        low, high = self._columns(start, end)
+        if row is None or high <= low:
+            return 0.0
+        prefix = self._prefix_sums()
+        return round(float(prefix[row, high] - prefix[row, low]), 2)
+
+    def daily(
+        self,
+        summary: str,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+    ) -> pd.Series:
+        """
+        Return the daily durations of one summary over a date range.
+
+        Returns:
+            pd.Series: The hours of every day with a non-zero total, indexed by day.
+        """
+        row = self._rows.get(summary)
+        low, high = self._columns(start, end)
+        if row is None or high <= low:
+            return pd.Series(dtype=np.float64, index=pd.DatetimeIndex([]))
+
+        values = self._totals[row, low:high]
+        offsets = np.flatnonzero(values.round(2))
+        days = (
+            (self._first + low + offsets)
+            .astype("datetime64[D]")
+            .astype("datetime64[ns]")
+        )
+        return pd.Series(values[offsets].round(2), index=pd.DatetimeIndex(days))
+
+    def to_frame(
+        self,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+        summary: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Return the non-zero cells of a date range as rows of a normalized event frame.
+
+        Every row stands for the events of one summary on one day. The frame has the
+        `summary`, `duration`, `day` and `calendar_id` columns of `events_to_frame`, which
+        is all the summary and day based strategies read.
+        """
+        parts = [
+            pd.DataFrame(
+                {
+                    "summary": pd.Series(dtype=object),
+                    "duration": pd.Series(dtype=np.float64),
+                    "day": pd.Series(dtype="datetime64[ns]"),
+                    "calendar_id": pd.Series(dtype=object),
+                }
+            )
+        ]
+        for name in self.summaries if summary is None else [summary]:
+            daily = self.daily(name, start, end)
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "summary": pd.Series([name] * len(daily), dtype=object),
+                        "duration": daily.values,
+                        "day": daily.index,
+                        "calendar_id": pd.Series([None] * len(daily), dtype=object),
+                    }
+                )
+            )
+        return pd.concat(parts, ignore_index=True)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the index into the `.npz` format of numpy."""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            totals=self._totals,
+            first=np.array(self._first, dtype=np.int64),
+            summaries=np.array(self.summaries, dtype=str),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RollupIndex":
+        """Load an index serialized by `to_bytes`."""
+        index = cls()
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            index.summaries = [str(summary) for summary in arrays["summaries"]]
+            index._totals = arrays["totals"]
+            index._first = int(arrays["first"])
+        index._rows = {summary: row for row, summary in enumerate(index.summaries)}
+        return index
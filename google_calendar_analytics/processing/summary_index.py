@@ -0,0 +1,163 @@
+"""
+# **Summary index**
+
+This module provides `SummaryIndex`, which maps the summaries of a normalized
+event frame to the positions of their rows. It is built once per collected
+dataset, after which looking up an event only touches the rows of that event
+instead of comparing every summary of the frame. Apart from exact lookups, the
+index matches summaries regardless of their case, after normalizing their
+whitespace and Unicode forms, by prefix, or by regular expression.
+
+```python
+index = SummaryIndex.from_frame(frame)
+for project in projects:
+    rows = index.select(frame, project, match="prefix")
+```
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+MATCH_MODES = ("exact", "casefold", "normalized", "prefix", "regex")
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_summary(summary: str) -> str:
+    """Fold the case, Unicode form and whitespace of a summary into its normalized key."""
+    return _SPACES.sub(" ", unicodedata.normalize("NFKC", summary).casefold()).strip()
+
+
+class SummaryIndex:
+    """
+    The row positions of every summary of an event frame.
+
+    Events without a summary never match.
+
+    Args:
+        summaries (pd.Series | list): The summary of every row.
+
+    Attributes:
+        summaries (list[str]): The distinct summaries, in the order they first appear.
+    """
+
+    def __init__(self, summaries):
+        codes, uniques = pd.factorize(pd.Series(summaries, dtype=object))
+        self.summaries: list[str] = list(uniques)
+        self._size = len(codes)
+
+        # The rows of summary i are _order[_bounds[i]:_bounds[i + 1]], in row order.
+        valid = codes >= 0
+        self._order = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        self._bounds = np.zeros(len(uniques) + 1, dtype=np.intp)
+        np.cumsum(
+            np.bincount(codes[valid], minlength=len(uniques)), out=self._bounds[1:]
+        )
+
+        self._exact = {summary: code for code, summary in enumerate(self.summaries)}
+        self._casefold: dict[str, list[int]] = {}
+        self._normalized: dict[str, list[int]] = {}
+        for code, summary in enumerate(self.summaries):
+            self._casefold.setdefault(summary.casefold(), []).append(code)
+            self._normalized.setdefault(normalize_summary(summary), []).append(code)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "SummaryIndex":
+        """Index the `summary` column of a normalized event frame."""
+        return cls(frame["summary"])
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _codes(self, name: str, match: str) -> list[int]:
+        if match == "exact":
+            code = self._exact.get(name)
+            return [] if code is None else [code]
+        if match == "casefold":
+            return self._casefold.get(name.casefold(), [])
+        if match == "normalized":
+            return self._normalized.get(normalize_summary(name), [])
+        if match == "prefix":
+            return [
+                code
+                for code, summary in enumerate(self.summaries)
+                if summary.startswith(name)
+            ]
+        if match == "regex":
+            pattern = re.compile(name)
+            return [
+                code
+                for code, summary in enumerate(self.summaries)
+                if pattern.search(summary)
+            ]
+        raise ValueError(
+            f"Invalid match: '{match}'. Available options are: {MATCH_MODES}."
+        )
+
+    def names(self, name: str, match: str = "exact") -> list[str]:
+        """Return the distinct summaries that match a name."""
+        return [self.summaries[code] for code in self._codes(name, match)]
+
+    def positions(self, name: str, match: str = "exact") -> np.ndarray:
+        """
+        Return the positions of the rows whose summary matches a name.
+
+        Args:
+            name (str): The name to look up, a prefix or a regular expression.
+            match (str): "exact", "casefold", "normalized" (case, whitespace and Unicode
+                form are ignored), "prefix" or "regex" (searched anywhere in the summary).
+
+        Returns:
+            np.ndarray: The positions, in row order.
+
+        Raises:
+            ValueError: If the match mode is unknown.
+        """
+        codes = self._codes(name, match)
+        if len(codes) == 1:
+            code = codes[0]
+            return self._order[self._bounds[code] : self._bounds[code + 1]]
+        if not codes:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(
+            np.concatenate(
+                [
+                    self._order[self._bounds[code] : self._bounds[code + 1]]
+                    for code in codes
+                ]
+            )
+        )
+
+    def select(
+        self, frame: pd.DataFrame, name: str, match: str = "exact"
+    ) -> pd.DataFrame:
+        """Return the rows of the indexed frame whose summary matches a name."""
+        return frame.iloc[self.positions(name, match)]
+
+
+def select_summary(
+    frame: pd.DataFrame,
+    name: str,
+    match: str = "exact",
+    index: SummaryIndex | None = None,
+) -> pd.DataFrame:
+    """
+    Return the rows of a normalized event frame whose summary matches a name.
+
+    Args:
+        frame (pd.DataFrame): Events normalized by `events_to_frame`.
+        name (str): The name to look up.
+        match (str): One of `MATCH_MODES`, see `SummaryIndex.positions`.
+        index (SummaryIndex, optional): An index of `frame`, reused between lookups.
+
+    Returns:
+        pd.DataFrame: The matching rows.
+    """
+    if index is None:
+        if match == "exact":
+            return frame[frame["summary"] == name]
+        index = SummaryIndex.from_frame(frame)
+    return index.select(frame, name, match)
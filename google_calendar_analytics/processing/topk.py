@@ -0,0 +1,139 @@
+"""
+# **Top-k selection**
+
+This module selects the largest (or smallest) totals without sorting every
+total, and provides `SpaceSaving`, a bounded-memory sketch of the heaviest
+summaries of an event stream that is too large, or has too many distinct
+summaries, to be aggregated exactly.
+"""
+
+import heapq
+
+import numpy as np
+
+OTHER_LABEL = "Other"
+
+
+def top_k(values: np.ndarray, k: int, ascending: bool = False) -> np.ndarray:
+    """
+    Return the positions of the k largest (or smallest) values, in order.
+
+    Only the selected values are sorted, so the cost is O(n + k log k) instead of
+    O(n log n). Ties are broken by position, so the selection is deterministic.
+
+    Args:
+        values (np.ndarray): The values to select from.
+        k (int): The number of values to select.
+        ascending (bool): If True, select the smallest values.
+
+    Returns:
+        np.ndarray: The positions of the selected values, best first.
+    """
+    values = np.asarray(values)
+    keys = values if ascending else -values
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(values):
+        # Keep every value tied with the k-th one, so ties are broken by position.
+        kth = np.partition(keys, k - 1)[k - 1]
+        candidates = np.flatnonzero(keys <= kth)
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort((candidates, keys[candidates]))
+    return candidates[order[:k]]
+
+
+class SpaceSaving:
+    """
+    The Space-Saving sketch of the heaviest keys of a weighted stream.
+
+    At most `capacity` keys are tracked. When a new key arrives and the sketch is
+    full, it replaces the lightest tracked key and inherits its weight as an error
+    bound. Every key whose true total exceeds `total / capacity` is guaranteed to be
+    tracked, and the estimate of a tracked key overshoots its true total by at most
+    its error.
+
+    Args:
+        capacity (int): The maximum number of keys tracked.
+
+    Attributes:
+        total (float): The weight of the whole stream.
+
+    Examples:
+        ```python
+        sketch = SpaceSaving(capacity=1000)
+        async for page in collector.iter_events(start_time, end_time, pages=True, flat=True):
+            for record in page:
+                sketch.update(record.summary, hours(record))
+        sketch.top(5)
+        ```
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0.0
+        self._counts: dict = {}
+        self._errors: dict = {}
+        # A min-heap of (count, key) entries. Entries are not removed when a count
+        # grows, stale ones are skipped when the lightest key is looked up.
+        self._heap: list = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _lightest(self):
+        while True:
+            count, key = self._heap[0]
+            if self._counts.get(key) == count:
+                return count, key
+            heapq.heappop(self._heap)
+
+    def update(self, key, weight: float = 1.0) -> None:
+        """Add `weight` to the total of `key`."""
+        self.total += weight
+        if key in self._counts:
+            count = self._counts[key] + weight
+        elif len(self._counts) < self.capacity:
+            count = weight
+            self._errors[key] = 0.0
+        else:
+            lightest, evicted = self._lightest()
+            heapq.heappop(self._heap)
+            del self._counts[evicted], self._errors[evicted]
+            count = lightest + weight
+            self._errors[key] = lightest
+
+        self._counts[key] = count
+        heapq.heappush(self._heap, (count, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def update_many(self, keys, weights) -> None:
+        """Add the weights of several keys, e.g. the per-summary totals of a page."""
+        for key, weight in zip(keys, weights):
+            self.update(key, float(weight))
+
+    def estimate(self, key) -> float:
+        """Return the estimated total of a key, 0 if it is not tracked."""
+        return self._counts.get(key, 0.0)
+
+    def error(self, key) -> float:
+        """Return how much the estimate of a key may overshoot its true total."""
+        return self._errors.get(key, 0.0)
+
+    def top(self, k: int) -> list[tuple]:
+        """
+        Return the k heaviest tracked keys.
+
+        Returns:
+            list[tuple]: (key, estimate, error) triples, heaviest first.
+        """
+        keys = list(self._counts)
+        counts = np.array([self._counts[key] for key in keys], dtype=np.float64)
+        return [
+            (keys[index], self._counts[keys[index]], self._errors[keys[index]])
+            for index in top_k(counts, k)
+        ]
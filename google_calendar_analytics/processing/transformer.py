@@ -1,17 +1,31 @@
 import datetime
 from abc import ABC, abstractmethod
+from typing import AsyncIterable
 
 import numpy as np
 import pandas as pd
 
 from google_calendar_analytics.core import exceptions
 
+from .columnar import EventColumns
+from .frame import events_to_frame
+from .memo import TransformCache
+from .rollup import RollupIndex
+from .summary_index import SummaryIndex, select_summary
+from .topk import OTHER_LABEL, SpaceSaving, top_k
+
 
 class EventDurationStrategy(ABC):
     """
     Abstract base class for event duration strategies.
+
+    Attributes:
+        required_fields (tuple[str, ...]): The event fields the strategy reads. The collector
+            only downloads these fields for the events it collects for the strategy.
     """
 
+    required_fields: tuple[str, ...] = ("summary", "start", "end")
+
     @abstractmethod
     async def calculate_duration(
         self, events: list[dict], *args, **kwargs
@@ -33,6 +47,58 @@ class EventDurationStrategy(ABC):
 
         pass
 
+    @abstractmethod
+    def calculate_frame(self, frame: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
+        """
+        Calculate event durations from events normalized by `events_to_frame`.
+
+        This is the synchronous, vectorized core of `calculate_duration`. It can be run
+        on a prepared frame many times, or outside of the event loop.
+
+        Args:
+            frame (pd.DataFrame): The normalized events.
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            pandas.DataFrame: Dataframe containing event durations.
+        """
+
+        pass
+
+    def calculate_rollup(
+        self,
+        index: RollupIndex,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+        *args,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """
+        Calculate event durations over a date range of a rollup index.
+
+        The index cells of the date range, filtered on `event_name` when it is given,
+        stand in for the events, so the cost depends on the number of days and not on
+        the number of events.
+
+        Args:
+            index (RollupIndex): The precomputed daily durations.
+            start (datetime.date, optional): The first day, inclusive.
+            end (datetime.date, optional): The last day, inclusive.
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        Returns:
+            pandas.DataFrame: Dataframe containing event durations.
+        """
+        summary = (
+            kwargs.get("event_name")
+            if kwargs.get("match", "exact") == "exact"
+            else None
+        )
+        frame = index.to_frame(start, end, summary=summary)
+        return self.calculate_frame(frame, *args, **kwargs)
+
     async def _get_duration(self, start, end) -> float:
         """
         Calculate the duration between two dates in hours.
@@ -59,25 +125,148 @@ class ManyEventsDurationStrategy(EventDurationStrategy):
     """
 
     async def calculate_duration(  # type: ignore
-        self, events: list[dict], max_events: int = 5, ascending=False
+        self,
+        events: list[dict],
+        max_events: int = 5,
+        ascending=False,
+        by_calendar: bool = False,
+        other: bool = False,
     ) -> pd.DataFrame:
-        event_durations = {}  # type: ignore
+        """
+        Calculate the total duration of the longest (or shortest) events.
+
+        Args:
+            events (list): Event dictionaries, EventRecords or a normalized event frame,
+                possibly from several calendars.
+            max_events (int): The maximum number of events to return.
+            ascending (bool): If True, return the events with the shortest duration.
+            by_calendar (bool): If True, events with the same name in different calendars are
+                counted separately, using the calendar tag set by `collect_many`.
+            other (bool): If True, add an "Other" row with the total duration of the events
+                that are not returned.
+
+        Returns:
+            pandas.DataFrame: Dataframe with the "Event" and "Duration" columns.
+        """
+        return self.calculate_frame(
+            events_to_frame(events),
+            max_events=max_events,
+            ascending=ascending,
+            by_calendar=by_calendar,
+            other=other,
+        )
+
+    @staticmethod
+    def _top_events(
+        names: np.ndarray,
+        totals: np.ndarray,
+        max_events: int,
+        ascending: bool,
+        other: bool,
+    ) -> pd.DataFrame:
+        """Select the top events by partial sort, with an optional "Other" row."""
+        selected = top_k(totals, max_events, ascending=ascending)
+        events = list(names[selected])
+        durations = list(totals[selected])
+        if other and len(selected) < len(totals):
+            events.append(OTHER_LABEL)
+            durations.append(round(float(totals.sum() - totals[selected].sum()), 2))
+
+        return pd.DataFrame(
+            {
+                "Event": pd.Series(events, dtype=object),
+                "Duration": pd.Series(durations, dtype=np.float64),
+            }
+        )
+
+    def calculate_frame(  # type: ignore
+        self,
+        frame: pd.DataFrame,
+        max_events: int = 5,
+        ascending=False,
+        by_calendar: bool = False,
+        other: bool = False,
+    ) -> pd.DataFrame:
+        keys = frame["summary"]
+        if by_calendar:
+            tagged = frame["calendar_id"].notna()
+            keys = keys.where(
+                ~tagged, keys + " (" + frame["calendar_id"].astype(str) + ")"
+            )
+
+        codes, names = pd.factorize(keys)
+        totals = np.bincount(
+            codes, weights=frame["duration"].to_numpy(np.float64), minlength=len(names)
+        )
+        return self._top_events(
+            np.asarray(names, dtype=object), totals, max_events, ascending, other
+        )
+
+    def calculate_rollup(  # type: ignore
+        self,
+        index: RollupIndex,
+        start: datetime.date | None = None,
+        end: datetime.date | None = None,
+        max_events: int = 5,
+        ascending=False,
+        other: bool = False,
+    ) -> pd.DataFrame:
+        totals = index.totals(start, end)
+        totals = totals[totals != 0]
+        return self._top_events(
+            totals.index.to_numpy(dtype=object),
+            totals.to_numpy(),
+            max_events,
+            ascending,
+            other,
+        )
+
+    async def calculate_stream(
+        self,
+        pages: AsyncIterable[list],
+        max_events: int = 5,
+        capacity: int = 1000,
+        other: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Approximate the longest events of a stream of event pages in bounded memory.
 
-        for event in events:
-            start, end = event.get("start", {}).get("dateTime"), event.get(
-                "end", {}
-            ).get("dateTime")
+        The events are aggregated page by page into a `SpaceSaving` sketch of `capacity`
+        summaries, so neither the events nor every distinct summary are held in memory.
+        Every event whose total duration exceeds 1 / `capacity` of the whole stream is
+        found, and its duration is overestimated by at most the duration of the lightest
+        tracked event.
 
-            if start and end:
-                summary = event["summary"]
-                duration = await self._get_duration(start, end)
-                event_durations[summary] = event_durations.get(summary, 0) + duration
+        Args:
+            pages (AsyncIterable[list]): Pages of event dictionaries or EventRecords, e.g.
+                `collector.iter_events(start_time, end_time, pages=True, flat=True)`.
+            max_events (int): The maximum number of events to return.
+            capacity (int): The maximum number of summaries tracked.
+            other (bool): If True, add an "Other" row with the rest of the total duration.
 
-        events_series = pd.Series(event_durations)
-        sorted_events = events_series.sort_values(ascending=ascending)
-        top_events = sorted_events.iloc[:max_events]
+        Returns:
+            pandas.DataFrame: Dataframe with the "Event" and "Duration" columns.
+        """
+        sketch = SpaceSaving(capacity)
+        async for page in pages:
+            columns = EventColumns.from_events(page)
+            totals = np.bincount(
+                columns.summary_codes,
+                weights=columns.duration.astype(np.float64),
+                minlength=len(columns.summaries),
+            )
+            sketch.update_many(columns.summaries, totals)
 
-        return pd.DataFrame({"Event": top_events.index, "Duration": top_events.values})
+        top = sketch.top(max_events)
+        names = np.array([key for key, _, _ in top], dtype=object)
+        estimates = np.array([round(count, 2) for _, count, _ in top], dtype=np.float64)
+        result = self._top_events(names, estimates, max_events, False, False)
+        if other and sketch.total - estimates.sum() > 0:
+            result.loc[len(result)] = [
+                OTHER_LABEL,
+                round(sketch.total - estimates.sum(), 2),
+            ]
+        return result
 
 
 class OneEventDurationStrategy(EventDurationStrategy):
@@ -88,16 +277,104 @@ class OneEventDurationStrategy(EventDurationStrategy):
         EventDurationStrategy (ABC): Abstract base class for event duration strategies.
     """
 
-    async def calculate_duration(self, events: list[dict], event_name: str) -> pd.DataFrame:  # type: ignore
-        one_event: dict[str, float] = {}
-        for event in events:
-            if event["summary"] == event_name:
-                start, end = event["start"]["dateTime"], event["end"]["dateTime"]
-                duration = await self._get_duration(start, end)
-                date = datetime.datetime.fromisoformat(start).strftime("%m.%d")
-                one_event[date] = one_event.get(date, 0) + duration
+    async def calculate_duration(  # type: ignore
+        self, events: list[dict], event_name: str, match: str = "exact"
+    ) -> pd.DataFrame:
+        """
+        Calculate the daily duration of an event.
+
+        Args:
+            events (list): Event dictionaries, EventRecords or a normalized event frame.
+            event_name (str): The name of the event.
+            match (str): How summaries are matched against the name, one of `MATCH_MODES`.
+
+        Returns:
+            pandas.DataFrame: Dataframe with the "Date" and "Duration" columns.
+        """
+        summary = event_name if match == "exact" else None
+        return self.calculate_frame(
+            events_to_frame(events, summary=summary), event_name=event_name, match=match
+        )
+
+    def calculate_frame(  # type: ignore
+        self,
+        frame: pd.DataFrame,
+        event_name: str,
+        match: str = "exact",
+        index: SummaryIndex | None = None,
+    ) -> pd.DataFrame:
+        matching = select_summary(frame, event_name, match=match, index=index)
+        one_event = (
+            matching["duration"]
+            .groupby(matching["day"].dt.strftime("%m.%d"), sort=False)
+            .sum()
+        )
+
+        return pd.DataFrame(
+            {"Date": one_event.index.astype(object), "Duration": one_event.values}
+        )
+
+
+PERIOD_MODES = ("rolling", "week", "month")
+
+
+def assign_periods(
+    days: np.ndarray,
+    reference_date: datetime.date,
+    period_days: int,
+    num_periods: int,
+    mode: str = "rolling",
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Assign days to periods counted back from a reference date, in O(n).
+
+    Period 0 is the one that contains the reference date, period 1 the one before it,
+    and so on. Days after the reference date do not belong to any period.
+
+    Args:
+        days (np.ndarray): The days, as `datetime64[D]`.
+        reference_date (datetime.date): The last day of the analysis.
+        period_days (int): The number of days in each rolling period.
+        num_periods (int): The number of periods.
+        mode (str): "rolling" for periods of `period_days` days ending on the reference date,
+            "week" for ISO weeks (Monday to Sunday) and "month" for calendar months.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, int]: The period of every day (-1 for days outside of
+        the periods), the 1-based day of every day in its period, and the number of days
+        the periods cover up to the reference date.
+    """
+    if mode not in PERIOD_MODES:
+        raise ValueError(
+            f"Invalid period mode: '{mode}'. Available options are: {PERIOD_MODES}."
+        )
 
-        return pd.DataFrame(one_event.items(), columns=["Date", "Duration"])
+    days = days.astype("datetime64[D]")
+    reference = np.datetime64(reference_date, "D")
+
+    if mode == "rolling":
+        offset = (reference - days).astype(np.int64)
+        period = offset // period_days
+        day = period_days - offset % period_days
+        covered = num_periods * period_days
+    elif mode == "week":
+        # 1970-01-01 was a Thursday, day 3 of an ISO week counted from 0.
+        weekday = (days.astype(np.int64) + 3) % 7
+        reference_weekday = (reference.astype(np.int64) + 3) % 7
+        week_start = days.astype(np.int64) - weekday
+        period = (reference.astype(np.int64) - reference_weekday - week_start) // 7
+        day = weekday + 1
+        covered = 7 * (num_periods - 1) + int(reference_weekday) + 1
+    else:
+        months = days.astype("datetime64[M]")
+        reference_month = reference.astype("datetime64[M]")
+        period = (reference_month - months).astype(np.int64)
+        day = (days - months.astype("datetime64[D]")).astype(np.int64) + 1
+        first_month = (reference_month - (num_periods - 1)).astype("datetime64[D]")
+        covered = int((reference - first_month).astype(np.int64)) + 1
+
+    period = np.where((days <= reference) & (period < num_periods), period, -1)
+    return period, day, covered
 
 
 class EventDurationPeriodsStrategy(EventDurationStrategy):
@@ -114,53 +391,99 @@ class EventDurationPeriodsStrategy(EventDurationStrategy):
         event_name: str,
         period_days: int,
         num_periods: int,
+        reference_date: datetime.date | None = None,
+        mode: str = "rolling",
+        match: str = "exact",
     ) -> pd.DataFrame:
-        period_duration = datetime.timedelta(days=period_days)
-        periods = []
-
-        for i in range(num_periods):
-            period_end = (
-                datetime.datetime.now().date()
-                - datetime.timedelta(days=datetime.datetime.now().weekday())
-                - period_duration * i
-            )
-            period_start = period_end - period_duration + datetime.timedelta(days=1)
-            periods.append((period_start, period_end))
-
-        event_duration = {}  # type: ignore
-        for event in events:
-            if event["summary"] == event_name:
-                start, end = event["start"]["dateTime"], event["end"]["dateTime"]
-                duration = await self._get_duration(start, end)
-                date = datetime.datetime.fromisoformat(start).date()
-
-                for period_index, (period_start, period_end) in enumerate(periods):
-                    if period_start <= date <= period_end:
-                        day_number = (date - period_start).days + 1
-                        date_str = date
-                        if date_str in event_duration:
-                            event_duration[date_str]["Duration"] += duration
-                        else:
-                            event_duration[date_str] = {
-                                "Date": date_str,
-                                "Day": day_number,
-                                "Duration": duration,
-                                "Period": period_index,
-                            }
-        expected_data_points = num_periods * period_days
-        available_data_points = len(event_duration)
+        """
+        Calculate the daily duration of an event in consecutive periods.
+
+        Args:
+            events (list): Event dictionaries, EventRecords or a normalized event frame.
+            event_name (str): The name of the event.
+            period_days (int): The number of days in each period, for rolling periods.
+            num_periods (int): The number of periods, counted back from the reference date.
+            reference_date (datetime.date, optional): The last day of the analysis. Defaults
+                to the Monday of the current week for rolling periods and to today otherwise.
+            mode (str): "rolling", "week" (ISO weeks) or "month" (calendar months).
+            match (str): How summaries are matched against the name, one of `MATCH_MODES`.
+
+        Returns:
+            pandas.DataFrame: Dataframe with the "Date", "Day", "Duration" and "Period" columns.
+
+        Raises:
+            NotEnoughDataError: If the event does not occur on every day of the periods.
+        """
+        return self.calculate_frame(
+            events_to_frame(events, summary=event_name if match == "exact" else None),
+            event_name=event_name,
+            period_days=period_days,
+            num_periods=num_periods,
+            reference_date=reference_date,
+            mode=mode,
+            match=match,
+        )
+
+    @staticmethod
+    def default_reference_date(mode: str = "rolling") -> datetime.date:
+        today = datetime.date.today()
+        if mode == "rolling":
+            return today - datetime.timedelta(days=today.weekday())
+        return today
+
+    def calculate_frame(  # type: ignore
+        self,
+        frame: pd.DataFrame,
+        event_name: str,
+        period_days: int,
+        num_periods: int,
+        reference_date: datetime.date | None = None,
+        mode: str = "rolling",
+        match: str = "exact",
+        index: SummaryIndex | None = None,
+    ) -> pd.DataFrame:
+        if reference_date is None:
+            reference_date = self.default_reference_date(mode)
+        if isinstance(reference_date, datetime.datetime):
+            reference_date = reference_date.date()
+
+        matching = select_summary(frame, event_name, match=match, index=index)
+        daily = matching["duration"].groupby(matching["day"]).sum()
+        days = daily.index.values.astype("datetime64[D]")
+
+        period, day, expected_data_points = assign_periods(
+            days, reference_date, period_days, num_periods, mode
+        )
+        inside = period >= 0
+        available_data_points = int(inside.sum())
 
         if available_data_points < expected_data_points:
             raise exceptions.NotEnoughDataError(
                 expected_data_points, available_data_points
             )
 
-        return pd.DataFrame(list(event_duration.values()))
+        return pd.DataFrame(
+            {
+                "Date": days[inside].astype(object),
+                "Day": day[inside],
+                "Duration": daily.values[inside],
+                "Period": period[inside],
+            }
+        )
 
 
 class AsyncDataTransformer:
-    def __init__(self):
+    """
+    Runs the strategy it is set to.
+
+    Args:
+        cache (TransformCache, optional): A cache of strategy results. When given, runs of
+            the same strategy with the same parameters on the same events are computed once.
+    """
+
+    def __init__(self, cache: TransformCache | None = None):
         self.strategy: EventDurationStrategy = None  # type: ignore
+        self.cache = cache
 
     def set_strategy(self, strategy: EventDurationStrategy) -> None:
         self.strategy = strategy
@@ -170,6 +493,8 @@ class AsyncDataTransformer:
     ) -> pd.DataFrame:
         if not self.strategy:
             raise ValueError("Strategy is not set")
-        return await self.strategy.calculate_duration(
-            events,
-        )
+        if self.cache is not None:
+            return await self.cache.calculate_duration(
+                self.strategy, events, *args, **kwargs
+            )
+        return await self.strategy.calculate_duration(events, *args, **kwargs)
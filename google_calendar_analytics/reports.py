@@ -0,0 +1,105 @@
+"""
+# **Reports**
+
+This module renders the reports of many users at once. The events of every user
+are collected concurrently on the event loop, while their aggregation and
+plotting runs in a process pool, so a nightly batch uses every core instead of
+the one the event loop runs on. The events are sent to the workers as
+EventColumns, a few compact arrays, instead of pickled event dictionaries.
+
+```python
+jobs = [ReportJob(creds, specs) for creds in users_credentials]
+reports = await run_reports(jobs, max_workers=8, concurrency=50)
+```
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+
+import plotly.graph_objs as go
+from google.oauth2.credentials import Credentials  # type: ignore
+
+from .analytics import AnalysisSpec, AnalyzerFacade
+from .collecting.endpoints import BASE_URL
+from .collecting.pool import SessionPool
+from .collecting.scheduler import RequestScheduler
+
+
+@dataclass
+class ReportJob:
+    """
+    The analyses of one user.
+
+    Attributes:
+        creds (Credentials): The credentials of the user.
+        specs (list[AnalysisSpec]): The analyses of the report.
+        calendar_ids (list[str], optional): The calendars to aggregate events across.
+            Defaults to the primary calendar only.
+    """
+
+    creds: Credentials
+    specs: list[AnalysisSpec]
+    calendar_ids: list[str] | None = None
+
+
+async def run_reports(
+    jobs: list[ReportJob],
+    executor: Executor | None = None,
+    max_workers: int | None = None,
+    concurrency: int = 10,
+    pool: SessionPool | None = None,
+    scheduler: RequestScheduler | None = None,
+    base_url: str = BASE_URL,
+    return_exceptions: bool = False,
+) -> list:
+    """
+    Render the reports of many users.
+
+    Args:
+        jobs (list[ReportJob]): The reports to render.
+        executor (Executor, optional): The executor that aggregates and plots the events.
+            Defaults to a ProcessPoolExecutor of `max_workers` processes that is shut down
+            when the reports are rendered.
+        max_workers (int, optional): The number of worker processes of the default executor.
+            Defaults to the number of CPUs.
+        concurrency (int): The number of reports rendered at once.
+        pool (SessionPool, optional): A connection pool shared by the reports. Defaults to
+            a pool that is closed when the reports are rendered.
+        scheduler (RequestScheduler, optional): A scheduler shared by the reports, to enforce
+            a project-wide rate.
+        base_url (str): The root of the Calendar API.
+        return_exceptions (bool): If True, the error of a failed report is returned in its
+            place instead of being raised.
+
+    Returns:
+        list: The figures of every report, in the order of `jobs`.
+    """
+    workers = executor or ProcessPoolExecutor(max_workers=max_workers)
+    sessions = pool or SessionPool()
+    scheduler = scheduler or RequestScheduler()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def render(job: ReportJob) -> list[go.Figure]:
+        async with semaphore:
+            async with AnalyzerFacade(
+                job.creds,
+                scheduler=scheduler,
+                pool=sessions,
+                base_url=base_url,
+                executor=workers,
+            ) as analyzer:
+                return await analyzer.analyze_batch(
+                    job.specs, calendar_ids=job.calendar_ids
+                )
+
+    try:
+        return await asyncio.gather(
+            *(render(job) for job in jobs), return_exceptions=return_exceptions
+        )
+    finally:
+        if pool is None:
+            await sessions.close()
+        if executor is None:
+            # Waiting for the workers to exit must not block the event loop.
+            await asyncio.get_running_loop().run_in_executor(None, workers.shutdown)
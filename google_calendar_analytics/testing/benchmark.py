@@ -0,0 +1,110 @@
+"""
+# **Transformer benchmark**
+
+This module benchmarks the vectorized duration strategies against the
+per-event coroutine loop they replaced, on synthetic events. Run it from the
+command line:
+
+```
+python -m google_calendar_analytics.testing.benchmark --events 100000
+```
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from google_calendar_analytics.processing.frame import events_to_frame
+from google_calendar_analytics.processing.transformer import (
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+
+from .mock_server import generate_events
+
+
+async def _loop_duration(start: str, end: str) -> float:
+    start_time = datetime.datetime.fromisoformat(start)
+    end_time = datetime.datetime.fromisoformat(end)
+    return np.round((end_time - start_time).total_seconds() / 3600, 2)
+
+
+async def loop_many(events: list[dict], max_events: int = 5) -> pd.DataFrame:
+    """The per-event implementation of `ManyEventsDurationStrategy`, for reference."""
+    event_durations: dict[str, float] = {}
+    for event in events:
+        start = event.get("start", {}).get("dateTime")
+        end = event.get("end", {}).get("dateTime")
+        if start and end and "summary" in event:
+            duration = await _loop_duration(start, end)
+            summary = event["summary"]
+            event_durations[summary] = event_durations.get(summary, 0) + duration
+
+    top_events = (
+        pd.Series(event_durations).sort_values(ascending=False).iloc[:max_events]
+    )
+    return pd.DataFrame({"Event": top_events.index, "Duration": top_events.values})
+
+
+async def loop_one(events: list[dict], event_name: str) -> pd.DataFrame:
+    """The per-event implementation of `OneEventDurationStrategy`, for reference."""
+    one_event: dict[str, float] = {}
+    for event in events:
+        if event.get("summary") == event_name and "dateTime" in event.get("start", {}):
+            start, end = event["start"]["dateTime"], event["end"]["dateTime"]
+            duration = await _loop_duration(start, end)
+            date = datetime.datetime.fromisoformat(start).strftime("%m.%d")
+            one_event[date] = one_event.get(date, 0) + duration
+
+    return pd.DataFrame(one_event.items(), columns=["Date", "Duration"])
+
+
+def _timed(coroutine_factory, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        asyncio.run(coroutine_factory())
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_benchmark(count: int = 100_000, repeat: int = 3) -> pd.DataFrame:
+    """
+    Time the loop and vectorized strategies on `count` synthetic events.
+
+    Args:
+        count (int): The number of events.
+        repeat (int): The number of runs, the best one is reported.
+
+    Returns:
+        pd.DataFrame: The best time of every implementation, in seconds.
+    """
+    events = generate_events(
+        count, datetime.datetime(2020, 1, 1), datetime.datetime(2023, 1, 1)
+    )
+    many, one = ManyEventsDurationStrategy(), OneEventDurationStrategy()
+
+    results = {
+        "many (loop)": _timed(lambda: loop_many(events), repeat),
+        "many (vectorized)": _timed(lambda: many.calculate_duration(events), repeat),
+        "one (loop)": _timed(lambda: loop_one(events, "Meeting"), repeat),
+        "one (vectorized)": _timed(
+            lambda: one.calculate_duration(events, event_name="Meeting"), repeat
+        ),
+        "normalize only": _timed(
+            lambda: asyncio.sleep(0, events_to_frame(events)), repeat
+        ),
+    }
+    return pd.DataFrame({"Seconds": results})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip("# *"))
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(run_benchmark(args.events, args.repeat))
@@ -0,0 +1,175 @@
+"""
+# **Load harness**
+
+This module drives `AnalyzerFacade` against a `MockCalendarServer` at a
+configurable concurrency and reports the throughput, latency and memory of the
+collector. Run it from the command line:
+
+```
+python -m google_calendar_analytics.testing.load --events 50000 --concurrency 20
+```
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+from google.oauth2.credentials import Credentials  # type: ignore
+
+from google_calendar_analytics.analytics import AnalyzerFacade
+from google_calendar_analytics.collecting.pool import SessionPool
+from google_calendar_analytics.collecting.scheduler import RequestScheduler
+from google_calendar_analytics.core import exceptions
+
+from .mock_server import MockCalendarServer, generate_events
+
+
+@dataclass
+class LoadReport:
+    """
+    The results of a load run.
+
+    Attributes:
+        analyses (int): The number of analyses run.
+        errors (int): The number of analyses that raised an error.
+        seconds (float): The wall-clock duration of the run.
+        requests (int): The number of requests the server received.
+        requests_per_second (float): The request throughput of the run.
+        p50_latency (float): The median analysis latency, in seconds.
+        p99_latency (float): The 99th percentile analysis latency, in seconds.
+        peak_memory_mb (float): The peak memory allocated by Python while `concurrency`
+            analyses run at once, measured in a separate pass after the timed run, since
+            tracing the allocations slows the analyses down several times.
+    """
+
+    analyses: int
+    errors: int
+    seconds: float
+    requests: int
+    requests_per_second: float
+    p50_latency: float
+    p99_latency: float
+    peak_memory_mb: float
+
+    def __str__(self):
+        return (
+            f"{self.analyses} analyses ({self.errors} errors) in {self.seconds:.2f}s\n"
+            f"{self.requests} requests, {self.requests_per_second:.1f} requests/s\n"
+            f"latency p50 {self.p50_latency * 1000:.1f}ms, p99 {self.p99_latency * 1000:.1f}ms\n"
+            f"peak memory {self.peak_memory_mb:.1f}MB"
+        )
+
+
+async def run_load(
+    server: MockCalendarServer,
+    start_time: datetime,
+    end_time: datetime,
+    analyses: int = 100,
+    concurrency: int = 10,
+    pool: SessionPool | None = None,
+    scheduler: RequestScheduler | None = None,
+) -> LoadReport:
+    """
+    Run `analyze_many` repeatedly against a running mock server.
+
+    Every analysis uses a facade of its own, like the per-user analyzers of a
+    multi-tenant worker. The throughput and latency are measured without tracing the
+    memory, which is measured in a second, shorter pass.
+
+    Args:
+        server (MockCalendarServer): The running server to query.
+        start_time (datetime): The start of the analyzed time range.
+        end_time (datetime): The end of the analyzed time range.
+        analyses (int): The number of analyses to run.
+        concurrency (int): The number of analyses running at once.
+        pool (SessionPool, optional): A connection pool shared by the facades.
+        scheduler (RequestScheduler, optional): A scheduler shared by the facades.
+
+    Returns:
+        LoadReport: The measured throughput, latency and memory.
+    """
+    creds = Credentials(token="load-test")
+    scheduler = scheduler or RequestScheduler(project_rate=1e6, user_rate=1e6)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def analyze(timed: bool = True) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async with AnalyzerFacade(
+                    creds, scheduler=scheduler, pool=pool, base_url=server.base_url
+                ) as analyzer:
+                    await analyzer.analyze_many(start_time, end_time, plot_type="Bar")
+            except (exceptions.CalendarAPIError, exceptions.NotEnoughDataError):
+                if timed:
+                    errors += 1
+            if timed:
+                latencies.append(time.perf_counter() - started)
+
+    requests_before = server.stats.requests
+    started = time.perf_counter()
+    await asyncio.gather(*(analyze() for _ in range(analyses)))
+    seconds = time.perf_counter() - started
+    requests = server.stats.requests - requests_before
+
+    tracemalloc.start()
+    try:
+        await asyncio.gather(
+            *(analyze(timed=False) for _ in range(min(analyses, concurrency)))
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return LoadReport(
+        analyses=analyses,
+        errors=errors,
+        seconds=seconds,
+        requests=requests,
+        requests_per_second=requests / seconds if seconds else 0.0,
+        p50_latency=float(np.percentile(latencies, 50)),
+        p99_latency=float(np.percentile(latencies, 99)),
+        peak_memory_mb=peak / 2**20,
+    )
+
+
+async def main(args: argparse.Namespace) -> LoadReport:
+    start_time, end_time = datetime(2022, 1, 1), datetime(2023, 1, 1)
+    events = generate_events(args.events, start_time, end_time)
+    pool = SessionPool(limit_per_host=args.concurrency) if args.pool else None
+
+    async with MockCalendarServer(
+        {"primary": events},
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+    ) as server:
+        report = await run_load(
+            server,
+            start_time,
+            end_time,
+            analyses=args.analyses,
+            concurrency=args.concurrency,
+            pool=pool,
+        )
+
+    if pool is not None:
+        await pool.close()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip("# *"))
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--analyses", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--pool", action="store_true", help="share a SessionPool")
+    print(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,428 @@
+"""
+# **MockCalendarServer**
+
+This module provides a local stand-in for the Google Calendar API v3, built on
+`aiohttp.web`. It serves synthetic events with the pagination, opaque page
+tokens, sync tokens, partial responses and error payloads of the real API, and
+can inject latency and 429 responses. Recurring events are expanded into
+their instances with `singleEvents=true`, and listed as masters and exceptions
+otherwise. Point a collector or a facade at it with
+`base_url=server.base_url` to measure the collector offline.
+"""
+
+import asyncio
+import base64
+import bisect
+import json
+import random
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+from google_calendar_analytics.collecting.decoding import dumps
+from google_calendar_analytics.collecting.recurrence import expand_event
+from google_calendar_analytics.collecting.store import event_time
+
+DEFAULT_SUMMARIES = (
+    "Meeting",
+    "Programming",
+    "Code review",
+    "Standup",
+    "Lunch",
+    "Planning",
+    "Interview",
+    "Reading",
+)
+
+
+def generate_events(
+    count: int,
+    start_time: datetime,
+    end_time: datetime,
+    summaries: tuple[str, ...] = DEFAULT_SUMMARIES,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    Generate synthetic timed events spread over a time range.
+
+    Args:
+        count (int): The number of events.
+        start_time (datetime): The earliest start of an event. Naive datetimes are UTC.
+        end_time (datetime): The latest start of an event.
+        summaries (tuple[str, ...]): The titles the events are given.
+        seed (int): The seed of the random generator, for reproducible data.
+
+    Returns:
+        list[dict]: Event resources ordered by start time.
+    """
+    rng = random.Random(seed)
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+    if end_time.tzinfo is None:
+        end_time = end_time.replace(tzinfo=timezone.utc)
+    span = (end_time - start_time).total_seconds()
+
+    starts = sorted(
+        start_time + timedelta(minutes=int(rng.uniform(0, span) // 900 * 15))
+        for _ in range(count)
+    )
+    return [
+        {
+            "kind": "calendar#event",
+            "id": f"event{index:08d}",
+            "etag": f'"{seed}{index}"',
+            "status": "confirmed",
+            "summary": rng.choice(summaries),
+            "updated": start.isoformat(),
+            "start": {"dateTime": start.isoformat(), "timeZone": "UTC"},
+            "end": {
+                "dateTime": (
+                    start + timedelta(minutes=rng.choice((15, 30, 60, 90, 120)))
+                ).isoformat(),
+                "timeZone": "UTC",
+            },
+        }
+        for index, start in enumerate(starts)
+    ]
+
+
+@dataclass
+class MockServerStats:
+    """
+    Counters of a MockCalendarServer.
+
+    Attributes:
+        requests (int): The number of requests received.
+        rate_limited (int): The number of requests answered with 429.
+        events_served (int): The number of events sent in responses.
+    """
+
+    requests: int = 0
+    rate_limited: int = 0
+    events_served: int = 0
+
+
+class MockCalendarServer:
+    """
+    A local Calendar API v3 server serving synthetic events.
+
+    Args:
+        calendars (dict[str, list[dict]]): The events of every calendar. Defaults to a
+            "primary" calendar without events.
+        latency (float): Seconds every request is delayed by.
+        rate_limit_every (int): Answer every n-th request with 429. 0 disables it.
+        retry_after (float): The `Retry-After` of injected 429 responses.
+        host (str): The interface to listen on.
+        port (int): The port to listen on, 0 picks a free port.
+
+    Examples:
+        ```python
+        events = generate_events(10_000, datetime(2022, 1, 1), datetime(2023, 1, 1))
+        async with MockCalendarServer({"primary": events}, latency=0.05) as server:
+            async with AnalyzerFacade(creds, base_url=server.base_url) as analyzer:
+                fig = await analyzer.analyze_many(start_time, end_time, plot_type="Bar")
+        ```
+    """
+
+    DEFAULT_PAGE_SIZE = 250
+    MAX_PAGE_SIZE = 2500
+
+    def __init__(
+        self,
+        calendars: dict[str, list[dict]] | None = None,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+        self.stats = MockServerStats()
+
+        # Every event carries the version of the change that produced it, the sync
+        # token of a response is the version the client is up to date with.
+        self._version = 0
+        self._calendars: dict[str, dict[str, tuple[int, dict]]] = {}
+        self._timelines: dict[str, tuple[list[float], list[float], list[dict]]] = {}
+        for calendar_id, events in (calendars or {"primary": []}).items():
+            self._calendars[calendar_id] = {}
+            for event in events:
+                self.put_event(calendar_id, event)
+
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/calendar/v3"
+
+    def put_event(self, calendar_id: str, event: dict) -> None:
+        """Add or replace an event, as seen by the next sync."""
+        self._version += 1
+        self._calendars.setdefault(calendar_id, {})[event["id"]] = (
+            self._version,
+            event,
+        )
+        self._timelines.pop(calendar_id, None)
+
+    def delete_event(self, calendar_id: str, event_id: str) -> None:
+        """Cancel an event, as seen by the next sync."""
+        _, event = self._calendars[calendar_id][event_id]
+        self.put_event(calendar_id, {**event, "status": "cancelled"})
+
+    def _app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/calendar/v3/calendars/{calendar_id}/events", self._events)
+        app.router.add_get("/calendar/v3/users/me/calendarList", self._calendar_list)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self._app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+        self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @staticmethod
+    def _error(status: int, message: str, reason: str = "invalid") -> web.Response:
+        return web.json_response(
+            {
+                "error": {
+                    "code": status,
+                    "message": message,
+                    "errors": [{"reason": reason, "message": message}],
+                }
+            },
+            status=status,
+            dumps=dumps,
+        )
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        self.stats.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.rate_limit_every and self.stats.requests % self.rate_limit_every == 0:
+            self.stats.rate_limited += 1
+            response = self._error(429, "Rate Limit Exceeded", "rateLimitExceeded")
+            response.headers["Retry-After"] = str(self.retry_after)
+            return response
+
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return self._error(401, "Login Required", "required")
+
+        return await handler(request)
+
+    @staticmethod
+    def _encode_token(state: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+    @staticmethod
+    def _decode_token(token: str) -> dict | None:
+        try:
+            return json.loads(base64.urlsafe_b64decode(token.encode()))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _project(events: list[dict], fields: str | None) -> list[dict]:
+        """Apply the `items(...)` part of a partial-response `fields` parameter."""
+        if not fields:
+            return events
+        match = re.search(r"items\(([^)]*)\)", fields)
+        if match is None:
+            return events
+        keep = set(match.group(1).split(","))
+        return [
+            {key: value for key, value in event.items() if key in keep}
+            for event in events
+        ]
+
+    def _page_size(self, request: web.Request) -> int:
+        max_results = int(request.query.get("maxResults", self.DEFAULT_PAGE_SIZE))
+        return max(1, min(max_results, self.MAX_PAGE_SIZE))
+
+    async def _events(self, request: web.Request) -> web.Response:
+        calendar_id = request.match_info["calendar_id"]
+        if calendar_id not in self._calendars:
+            return self._error(404, "Not Found", "notFound")
+
+        query = request.query
+        page_size = self._page_size(request)
+
+        if "pageToken" in query:
+            state = self._decode_token(query["pageToken"])
+            if state is None:
+                return self._error(400, "Invalid page token")
+        elif "syncToken" in query:
+            if "timeMin" in query or "timeMax" in query:
+                return self._error(
+                    400, "Sync token cannot be used with timeMin/timeMax"
+                )
+            since = self._decode_token(query["syncToken"])
+            if since is None or since.get("version", -1) > self._version:
+                return self._error(
+                    410, "Sync token is no longer valid", "fullSyncRequired"
+                )
+            state = {"offset": 0, "since": since["version"], "version": self._version}
+        else:
+            state = {
+                "offset": 0,
+                "since": None,
+                "version": self._version,
+                "timeMin": query.get("timeMin"),
+                "timeMax": query.get("timeMax"),
+                "singleEvents": query.get("singleEvents") == "true",
+                "showDeleted": query.get("showDeleted") == "true",
+            }
+
+        events = self._select(calendar_id, state)
+        page = events[state["offset"] : state["offset"] + page_size]
+        body: dict = {
+            "kind": "calendar#events",
+            "summary": calendar_id,
+            "items": self._project(page, query.get("fields")),
+        }
+
+        if state["offset"] + page_size < len(events):
+            body["nextPageToken"] = self._encode_token(
+                {**state, "offset": state["offset"] + page_size}
+            )
+        else:
+            body["nextSyncToken"] = self._encode_token({"version": state["version"]})
+
+        self.stats.events_served += len(page)
+        return web.json_response(body, dumps=dumps)
+
+    def _timeline(
+        self, calendar_id: str
+    ) -> tuple[list[float], list[float], list[dict]]:
+        """
+        Return the live events of a calendar ordered by start, with their bounds.
+
+        Recurring masters are left out, they are expanded or listed by `_select`.
+        """
+        if calendar_id not in self._timelines:
+            events = [
+                event
+                for _, event in self._calendars[calendar_id].values()
+                if event.get("status") != "cancelled" and "recurrence" not in event
+            ]
+            events.sort(key=event_time)
+            self._timelines[calendar_id] = (
+                [event_time(event, "start").timestamp() for event in events],
+                [event_time(event, "end").timestamp() for event in events],
+                events,
+            )
+        return self._timelines[calendar_id]
+
+    def _select(self, calendar_id: str, state: dict) -> list[dict]:
+        """Return the events a listing covers, in the order they are paginated."""
+        if state["since"] is not None:
+            return [
+                event
+                for version, event in sorted(
+                    self._calendars[calendar_id].values(), key=lambda entry: entry[0]
+                )
+                if state["since"] < version <= state["version"]
+            ]
+
+        starts, ends, events = self._timeline(calendar_id)
+        last = len(events)
+        if state.get("timeMax"):
+            time_max = datetime.fromisoformat(state["timeMax"]).timestamp()
+            last = bisect.bisect_left(starts, time_max)
+        if state.get("timeMin"):
+            time_min = datetime.fromisoformat(state["timeMin"]).timestamp()
+            selected = [
+                event
+                for event, end in zip(events[:last], ends[:last])
+                if end > time_min
+            ]
+        else:
+            selected = events[:last]
+
+        recurring = self._recurring(calendar_id, state)
+        if not recurring:
+            return selected
+        return sorted(selected + recurring, key=event_time)
+
+    def _recurring(self, calendar_id: str, state: dict) -> list[dict]:
+        """
+        Return the recurring events of a time range listing.
+
+        With `singleEvents`, the masters are expanded into their instances. Otherwise
+        the masters starting before `timeMax` are listed as they are, and the cancelled
+        exceptions are added with `showDeleted`.
+        """
+        stored = [event for _, event in self._calendars[calendar_id].values()]
+        masters = [
+            event
+            for event in stored
+            if "recurrence" in event and event.get("status") != "cancelled"
+        ]
+        if not masters:
+            return []
+
+        time_max = (
+            datetime.fromisoformat(state["timeMax"])
+            if state.get("timeMax")
+            else datetime.now(timezone.utc) + timedelta(days=366)
+        )
+        if not state.get("singleEvents"):
+            cancelled = [
+                event
+                for event in stored
+                if state.get("showDeleted")
+                and event.get("status") == "cancelled"
+                and event.get("recurringEventId")
+            ]
+            return [
+                master for master in masters if event_time(master, "start") < time_max
+            ] + cancelled
+
+        instances = []
+        for master in masters:
+            time_min = (
+                datetime.fromisoformat(state["timeMin"])
+                if state.get("timeMin")
+                else event_time(master, "start")
+            )
+            exceptions = [
+                event
+                for event in stored
+                if event.get("recurringEventId") == master["id"]
+            ]
+            instances.extend(expand_event(master, time_min, time_max, exceptions))
+        return instances
+
+    async def _calendar_list(self, request: web.Request) -> web.Response:
+        items = [
+            {
+                "kind": "calendar#calendarListEntry",
+                "id": calendar_id,
+                "summary": calendar_id,
+            }
+            for calendar_id in self._calendars
+        ]
+        return web.json_response(
+            {"kind": "calendar#calendarList", "items": items}, dumps=dumps
+        )
@@ -9,6 +9,7 @@ for all visualization classes, while the ManyEventPlot and OneEventPlot classes
 define required abstract methods. The factory method PlotFactory returns an object
 of the specified visualization class based on input parameters.
 """
+
 from abc import ABC, abstractmethod
 from typing import Type
 
@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from google_calendar_analytics.collecting.cache import EventCache
+from google_calendar_analytics.collecting.collector import AsyncCalendarDataCollector
+
+
+def _event(event_id, start, end):
+    return {
+        "id": event_id,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+    }
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def cache():
+    return EventCache(ttl=60)
+
+
+def test_missing_ranges_returns_uncovered_gaps(cache):
+    cache.store("primary", datetime(2023, 3, 10), datetime(2023, 3, 20), [])
+
+    gaps = cache.missing_ranges("primary", datetime(2023, 3, 1), datetime(2023, 3, 31))
+
+    assert gaps == [
+        (_utc(2023, 3, 1), _utc(2023, 3, 10)),
+        (_utc(2023, 3, 20), _utc(2023, 3, 31)),
+    ]
+    assert cache.missing_ranges("other", datetime(2023, 3, 1), datetime(2023, 3, 2))
+
+
+def test_expired_ranges_are_evicted(cache):
+    cache.ttl = 0
+    cache.store(
+        "primary",
+        datetime(2023, 3, 1),
+        datetime(2023, 3, 31),
+        [_event("a", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00")],
+    )
+
+    gaps = cache.missing_ranges("primary", datetime(2023, 3, 1), datetime(2023, 3, 31))
+
+    assert gaps == [(_utc(2023, 3, 1), _utc(2023, 3, 31))]
+    assert cache.events_between("primary", datetime(2023, 3, 1), datetime(2023, 3, 31)) == []
+
+
+def test_cache_survives_reopening(tmp_path):
+    path = tmp_path / "events.sqlite"
+    event = _event("a", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00")
+    cache = EventCache(path)
+    cache.store("primary", datetime(2023, 3, 1), datetime(2023, 3, 31), [event])
+    cache.close()
+
+    reopened = EventCache(path)
+
+    assert reopened.missing_ranges("primary", datetime(2023, 3, 5), datetime(2023, 3, 6)) == []
+    assert reopened.events_between("primary", datetime(2023, 3, 1), datetime(2023, 3, 31)) == [event]
+
+
+@pytest.mark.asyncio
+async def test_collect_data_fetches_only_uncovered_gaps(cache):
+    collector = AsyncCalendarDataCollector(MagicMock(), MagicMock(), cache=cache)
+    cached = _event("a", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00")
+    fetched = _event("b", "2023-03-20T09:00:00+00:00", "2023-03-20T10:00:00+00:00")
+    cache.store("primary", datetime(2023, 3, 1), datetime(2023, 3, 15), [cached])
+    collector._get_events_by_time_range = AsyncMock(return_value=[fetched])
+
+    events = await collector.collect_data(datetime(2023, 3, 1), datetime(2023, 3, 31))
+
+    assert events == [cached, fetched]
+    collector._get_events_by_time_range.assert_awaited_once_with(
+        calendar_id="primary",
+        time_min="2023-03-15T00:00:00Z",
+        time_max="2023-03-31T00:00:00Z",
+        fields=AsyncCalendarDataCollector.STORED_FIELDS,
+        flat=False,
+    )
@@ -1,8 +1,18 @@
+import asyncio
 import unittest
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.parse import parse_qs, urlparse
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from google.oauth2.credentials import Credentials
 
 from google_calendar_analytics.collecting.collector import AsyncCalendarDataCollector
+from google_calendar_analytics.collecting.decoding import EventRecord
+from google_calendar_analytics.collecting.scheduler import RequestScheduler
 
 
 class CalendarDataCollectorTest(unittest.TestCase):
@@ -28,3 +38,258 @@ class CalendarDataCollectorTest(unittest.TestCase):
             time_min=start_time.isoformat() + "Z",
             time_max=end_time.isoformat() + "Z",
         )
+
+
+@pytest.fixture()
+def collector():
+    return AsyncCalendarDataCollector(MagicMock(), MagicMock())
+
+
+def _event(event_id, start, end):
+    return {
+        "id": event_id,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+    }
+
+
+@pytest.mark.asyncio
+async def test_collect_data_sharded_merges_and_deduplicates(collector):
+    spanning = _event("b", "2023-03-01T23:00:00+00:00", "2023-03-02T01:00:00+00:00")
+    windows = {
+        "2023-03-01T00:00:00Z": [
+            _event("a", "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00"),
+            spanning,
+        ],
+        "2023-03-02T00:00:00Z": [
+            spanning,
+            _event("c", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00"),
+        ],
+    }
+
+    async def fake_get_events(time_min, time_max, calendar_id, **kwargs):
+        return windows[time_min]
+
+    collector._get_events_by_time_range = AsyncMock(side_effect=fake_get_events)
+
+    events = await collector.collect_data(
+        datetime(2023, 3, 1), datetime(2023, 3, 3), shards=2, max_concurrency=2
+    )
+
+    assert [event["id"] for event in events] == ["a", "b", "c"]
+    assert collector._get_events_by_time_range.await_count == 2
+
+
+def test_split_time_range_covers_whole_range():
+    start_time = datetime(2023, 1, 1)
+    end_time = datetime(2023, 12, 31)
+
+    windows = AsyncCalendarDataCollector._split_time_range(start_time, end_time, 4)
+
+    assert len(windows) == 4
+    assert windows[0][0] == start_time
+    assert windows[-1][1] == end_time
+    assert all(prev[1] == cur[0] for prev, cur in zip(windows, windows[1:]))
+
+
+@pytest.mark.asyncio
+async def test_collect_many_tags_events_with_calendar(collector):
+    calendars = {
+        "work": [_event("a", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00")],
+        "home": [_event("b", "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00")],
+    }
+
+    async def fake_collect_data(start_time, end_time, calendar_id, **kwargs):
+        return calendars[calendar_id]
+
+    collector.collect_data = AsyncMock(side_effect=fake_collect_data)
+    collector.list_calendars = AsyncMock(
+        return_value=[{"id": "work"}, {"id": "home"}]
+    )
+
+    events = await collector.collect_many(datetime(2023, 3, 1), datetime(2023, 3, 3))
+
+    assert [(event["id"], event["calendarId"]) for event in events] == [
+        ("b", "home"),
+        ("a", "work"),
+    ]
+    assert "calendarId" not in calendars["work"][0]
+
+
+@pytest.mark.asyncio
+async def test_collect_data_requests_projected_fields_and_full_pages():
+    collector = AsyncCalendarDataCollector(Credentials(token="token"), MagicMock())
+    collector._make_request = AsyncMock(return_value={"items": []})
+
+    await collector.collect_data(
+        datetime(2023, 3, 1), datetime(2023, 3, 2), fields=("summary", "start", "end")
+    )
+
+    request = collector._make_request.await_args.args[0]
+    query = parse_qs(urlparse(request.uri).query)
+    assert query["fields"] == [
+        "nextPageToken,nextSyncToken,items(id,status,summary,start,end)"
+    ]
+    assert query["maxResults"] == ["2500"]
+
+
+@pytest.mark.asyncio
+async def test_iter_events_prefetches_next_page():
+    collector = AsyncCalendarDataCollector(Credentials(token="token"), MagicMock())
+    collector._make_request = AsyncMock(
+        side_effect=[
+            {"items": [{"id": "a"}, {"id": "b"}], "nextPageToken": "page-2"},
+            {"items": [{"id": "c"}]},
+        ]
+    )
+
+    events = []
+    async for event in collector.iter_events(datetime(2023, 3, 1), datetime(2023, 3, 2)):
+        if not events:
+            await asyncio.sleep(0)
+            assert collector._make_request.await_count == 2
+        events.append(event["id"])
+
+    assert events == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_iter_events_cancels_prefetch_when_closed_early():
+    collector = AsyncCalendarDataCollector(Credentials(token="token"), MagicMock())
+    second_page = asyncio.Event()
+    prefetches = []
+
+    async def make_request(request):
+        if "pageToken" in request.uri:
+            prefetches.append(asyncio.current_task())
+            await second_page.wait()
+            return {"items": [{"id": "b"}]}
+        return {"items": [{"id": "a"}], "nextPageToken": "page-2"}
+
+    collector._make_request = make_request
+
+    pages = collector.iter_events(datetime(2023, 3, 1), datetime(2023, 3, 2), pages=True)
+    assert await pages.__anext__() == [{"id": "a"}]
+    # Let the prefetch of the second page start before the caller stops.
+    await asyncio.sleep(0)
+    assert len(prefetches) == 1 and not prefetches[0].done()
+
+    await pages.aclose()
+    await asyncio.sleep(0)
+
+    assert prefetches[0].cancelled()
+
+
+@pytest.mark.asyncio
+async def test_collect_data_flat_returns_records():
+    collector = AsyncCalendarDataCollector(Credentials(token="token"), MagicMock())
+    collector._make_request = AsyncMock(
+        return_value={
+            "items": [
+                _event("a", "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00")
+            ]
+        }
+    )
+
+    events = await collector.collect_data(
+        datetime(2023, 3, 1), datetime(2023, 3, 2), calendar_id="work", flat=True
+    )
+
+    assert events == [
+        EventRecord(
+            "a", None, "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00", False, "work"
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_collections_share_one_fetch(collector):
+    release = asyncio.Event()
+    fetched = [_event("a", "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00")]
+
+    async def slow_get_events(**kwargs):
+        await release.wait()
+        return fetched
+
+    collector._get_events_by_time_range = AsyncMock(side_effect=slow_get_events)
+    start_time, end_time = datetime(2023, 3, 1), datetime(2023, 3, 2)
+
+    calls = [
+        asyncio.ensure_future(collector.collect_data(start_time, end_time))
+        for _ in range(3)
+    ]
+    other = asyncio.ensure_future(
+        collector.collect_data(start_time, end_time, fields=("summary",))
+    )
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*calls, other)
+
+    assert all(result == fetched for result in results)
+    assert results[0] is not results[1]
+    assert collector._get_events_by_time_range.await_count == 2
+    assert collector.coalesced == 2
+    assert collector._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_collect_columns_packs_every_page():
+    collector = AsyncCalendarDataCollector(Credentials(token="token"), MagicMock())
+    event = dict(
+        _event("a", "2023-03-01T09:00:00+00:00", "2023-03-01T10:30:00+00:00"),
+        summary="Meeting",
+    )
+    collector._make_request = AsyncMock(
+        side_effect=[
+            {"items": [event], "nextPageToken": "page-2"},
+            {"items": [dict(event, id="b", summary="Lunch")]},
+            {"items": [dict(event, id="c")]},
+        ]
+    )
+
+    columns = await collector.collect_columns(
+        datetime(2023, 3, 1), datetime(2023, 3, 2), calendar_ids=["work", "home"]
+    )
+
+    assert len(columns) == 3
+    assert columns.summaries == ["Meeting", "Lunch"]
+    assert columns.calendars == ["work", "home"]
+    assert list(columns.summary_codes) == [0, 1, 0]
+    assert list(columns.duration) == [1.5, 1.5, 1.5]
+
+
+@pytest.mark.asyncio
+async def test_make_request_retries_server_errors_without_json_body():
+    responses = [
+        web.Response(status=503, text="<html>Service Unavailable</html>"),
+        web.json_response({"items": []}),
+    ]
+
+    async def events(request):
+        return responses.pop(0)
+
+    app = web.Application()
+    app.router.add_get("/calendar/v3/calendars/primary/events", events)
+    async with TestServer(app) as server:
+        async with aiohttp.ClientSession() as session:
+            collector = AsyncCalendarDataCollector(
+                Credentials(token="token"),
+                session,
+                base_url=str(server.make_url("/calendar/v3")),
+                scheduler=RequestScheduler(base_delay=0),
+            )
+            payload = await collector._make_request(
+                collector.endpoints.events_list("primary")
+            )
+
+    assert payload == {"items": []}
+    assert collector.scheduler.stats.retries == 1
+
+
+def test_collectors_of_the_same_user_share_a_scheduler_key():
+    first = AsyncCalendarDataCollector(Credentials(token="a", refresh_token="r"), MagicMock())
+    second = AsyncCalendarDataCollector(Credentials(token="b", refresh_token="r"), MagicMock())
+    other = AsyncCalendarDataCollector(Credentials(token="a", refresh_token="s"), MagicMock())
+
+    assert first.user == second.user != other.user
+    assert "r" not in first.user
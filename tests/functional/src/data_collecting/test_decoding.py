@@ -0,0 +1,30 @@
+from google_calendar_analytics.collecting.decoding import (
+    EventRecord,
+    flatten_event,
+    loads,
+)
+
+
+def test_loads_decodes_bytes_and_empty_bodies():
+    assert loads(b'{"items": [{"id": "a"}]}') == {"items": [{"id": "a"}]}
+    assert loads(b"") is None
+
+
+def test_flatten_event_timed_and_all_day():
+    timed = flatten_event(
+        {
+            "id": "a",
+            "summary": "Standup",
+            "start": {"dateTime": "2023-03-01T09:00:00+01:00"},
+            "end": {"dateTime": "2023-03-01T09:15:00+01:00"},
+        },
+        calendar_id="work",
+    )
+    all_day = flatten_event(
+        {"id": "b", "start": {"date": "2023-03-02"}, "end": {"date": "2023-03-03"}}
+    )
+
+    assert timed == EventRecord(
+        "a", "Standup", "2023-03-01T09:00:00+01:00", "2023-03-01T09:15:00+01:00", False, "work"
+    )
+    assert all_day == EventRecord("b", None, "2023-03-02", "2023-03-03", True, None)
@@ -0,0 +1,22 @@
+from urllib.parse import parse_qs, urlparse
+
+from google_calendar_analytics.collecting.endpoints import CalendarEndpoints
+
+
+def test_events_list_quotes_calendar_id_and_formats_params():
+    request = CalendarEndpoints().events_list(
+        "team@group.calendar.google.com",
+        singleEvents=True,
+        pageToken=None,
+        maxResults=2500,
+    )
+
+    url = urlparse(request.uri)
+    assert url.path == "/calendar/v3/calendars/team%40group.calendar.google.com/events"
+    assert parse_qs(url.query) == {"singleEvents": ["true"], "maxResults": ["2500"]}
+
+
+def test_calendar_list_uses_base_url():
+    request = CalendarEndpoints("http://localhost:8080/calendar/v3/").calendar_list()
+
+    assert request.uri == "http://localhost:8080/calendar/v3/users/me/calendarList"
@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from google_calendar_analytics.analytics import AnalyzerFacade
+from google_calendar_analytics.collecting.pool import SessionPool
+from google_calendar_analytics.testing.mock_server import MockCalendarServer
+
+
+@pytest.mark.asyncio
+async def test_facades_borrow_the_pooled_session():
+    pool = SessionPool(limit=10, limit_per_host=5)
+
+    async with AnalyzerFacade(MagicMock(), pool=pool) as first:
+        async with AnalyzerFacade(MagicMock(), pool=pool) as second:
+            assert first.session is second.session
+            assert pool.stats.active_borrowers == 2
+
+    assert first.session is None
+    stats = pool.stats
+    assert stats.borrows == 2
+    assert stats.active_borrowers == 0
+    assert stats.peak_borrowers == 2
+    assert stats.limit_per_host == 5
+
+    session = pool.acquire()
+    assert not session.closed
+    pool.release()
+    await pool.close()
+    assert session.closed
+
+
+def test_shared_pool_is_process_wide():
+    assert SessionPool.shared() is SessionPool.shared()
+
+
+AUTHORIZATION = {"Authorization": "Bearer token"}
+
+
+@pytest.mark.asyncio
+async def test_stats_count_the_connections_of_the_pool():
+    pool = SessionPool()
+    async with MockCalendarServer(latency=0.2) as server:
+        url = f"{server.base_url}/calendars/primary/events"
+        async with pool.borrow() as session:
+
+            async def fetch():
+                async with session.get(url, headers=AUTHORIZATION) as response:
+                    return await response.read()
+
+            request = asyncio.ensure_future(fetch())
+            await asyncio.sleep(0.1)
+            assert pool.stats.connections_in_use == 1
+            assert pool.stats.idle_connections == 0
+            await request
+
+            # The connection is kept alive for the next request.
+            assert pool.stats.connections_in_use == 0
+            assert pool.stats.idle_connections == 1
+        await pool.close()
+
+
+def test_pool_can_be_borrowed_from_another_event_loop():
+    pool = SessionPool()
+
+    async def fetch():
+        async with MockCalendarServer() as server:
+            async with pool.borrow() as session:
+                async with session.get(
+                    f"{server.base_url}/calendars/primary/events", headers=AUTHORIZATION
+                ) as response:
+                    return response.status
+
+    assert asyncio.run(fetch()) == 200
+    first = pool._session
+    assert asyncio.run(fetch()) == 200
+    assert pool._session is not first
+    asyncio.run(pool.close())
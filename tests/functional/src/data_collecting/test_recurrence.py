@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+
+from google_calendar_analytics.collecting.recurrence import expand_event, expand_events
+
+TIME_MIN = datetime(2023, 3, 20, tzinfo=timezone.utc)
+TIME_MAX = datetime(2023, 4, 3, tzinfo=timezone.utc)
+
+
+def _standup(*recurrence):
+    return {
+        "id": "standup",
+        "summary": "Standup",
+        "start": {"dateTime": "2023-03-20T10:00:00+01:00", "timeZone": "Europe/Berlin"},
+        "end": {"dateTime": "2023-03-20T10:15:00+01:00", "timeZone": "Europe/Berlin"},
+        "recurrence": list(recurrence),
+    }
+
+
+def _starts(events):
+    return [(event["id"], event["start"]["dateTime"]) for event in events]
+
+
+def test_expand_event_keeps_wall_clock_across_dst():
+    master = _standup("RRULE:FREQ=DAILY;BYDAY=MO,TH;UNTIL=20230330T090000Z")
+
+    instances = expand_event(master, TIME_MIN, TIME_MAX)
+
+    # Berlin switches to summer time on 2023-03-26.
+    assert _starts(instances) == [
+        ("standup_20230320T090000Z", "2023-03-20T10:00:00+01:00"),
+        ("standup_20230323T090000Z", "2023-03-23T10:00:00+01:00"),
+        ("standup_20230327T080000Z", "2023-03-27T10:00:00+02:00"),
+        ("standup_20230330T080000Z", "2023-03-30T10:00:00+02:00"),
+    ]
+    assert instances[2]["end"] == {
+        "dateTime": "2023-03-27T10:15:00+02:00",
+        "timeZone": "Europe/Berlin",
+    }
+    assert instances[2]["recurringEventId"] == "standup"
+    assert instances[2]["originalStartTime"] == instances[2]["start"]
+    assert "recurrence" not in instances[2]
+
+
+def test_expand_event_applies_count_and_exdate():
+    master = _standup(
+        "RRULE:FREQ=DAILY;COUNT=5",
+        "EXDATE;TZID=Europe/Berlin:20230322T100000",
+    )
+
+    instances = expand_event(master, TIME_MIN, TIME_MAX)
+
+    assert [event["start"]["dateTime"][:10] for event in instances] == [
+        "2023-03-20",
+        "2023-03-21",
+        "2023-03-23",
+        "2023-03-24",
+    ]
+
+
+def test_expand_event_falls_back_to_the_event_zone_for_unknown_tzids():
+    master = _standup(
+        "RRULE:FREQ=DAILY;COUNT=3",
+        "EXDATE;TZID=W. Europe Standard Time:20230321T100000",
+    )
+
+    instances = expand_event(master, TIME_MIN, TIME_MAX)
+
+    assert [event["start"]["dateTime"][:10] for event in instances] == [
+        "2023-03-20",
+        "2023-03-22",
+    ]
+
+
+def test_expand_events_applies_exceptions():
+    master = _standup("RRULE:FREQ=WEEKLY;BYDAY=MO")
+    moved = {
+        "id": "standup_20230327T080000Z",
+        "summary": "Standup (moved)",
+        "recurringEventId": "standup",
+        "originalStartTime": {"dateTime": "2023-03-27T10:00:00+02:00"},
+        "start": {"dateTime": "2023-03-28T14:00:00+02:00"},
+        "end": {"dateTime": "2023-03-28T14:15:00+02:00"},
+    }
+    cancelled = {
+        "id": "standup_20230320T090000Z",
+        "status": "cancelled",
+        "recurringEventId": "standup",
+        "originalStartTime": {"dateTime": "2023-03-20T09:00:00Z"},
+    }
+    single = {
+        "id": "review",
+        "summary": "Review",
+        "start": {"dateTime": "2023-03-21T12:00:00+00:00"},
+        "end": {"dateTime": "2023-03-21T13:00:00+00:00"},
+    }
+
+    events = expand_events([master, moved, cancelled, single], TIME_MIN, TIME_MAX)
+
+    assert [(event["id"], event["summary"]) for event in events] == [
+        ("review", "Review"),
+        ("standup_20230327T080000Z", "Standup (moved)"),
+    ]
+
+
+def test_expand_event_all_day_yearly():
+    master = {
+        "id": "birthday",
+        "summary": "Birthday",
+        "start": {"date": "2020-03-25"},
+        "end": {"date": "2020-03-26"},
+        "recurrence": ["RRULE:FREQ=YEARLY"],
+    }
+
+    instances = expand_event(master, TIME_MIN, TIME_MAX)
+
+    assert [(event["id"], event["start"], event["end"]) for event in instances] == [
+        ("birthday_20230325", {"date": "2023-03-25"}, {"date": "2023-03-26"}),
+    ]
@@ -0,0 +1,97 @@
+import aiohttp
+import pytest
+
+from google_calendar_analytics.collecting.scheduler import RequestScheduler, TokenBucket
+from google_calendar_analytics.core import exceptions
+
+RATE_LIMITED = {
+    "error": {
+        "code": 403,
+        "message": "Rate Limit Exceeded",
+        "errors": [{"reason": "rateLimitExceeded"}],
+    }
+}
+
+
+def _sender(*responses):
+    responses = list(responses)
+
+    async def send():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return send
+
+
+@pytest.fixture()
+def scheduler():
+    return RequestScheduler(project_rate=1000, user_rate=1000, base_delay=0)
+
+
+@pytest.mark.asyncio
+async def test_run_retries_rate_limits_and_server_errors(scheduler):
+    send = _sender(
+        (429, {}, {}),
+        (403, {}, RATE_LIMITED),
+        (503, {}, {}),
+        aiohttp.ClientConnectionError("reset"),
+        (200, {}, {"items": []}),
+    )
+
+    assert await scheduler.run(send) == {"items": []}
+    assert scheduler.stats.retries == 4
+    assert scheduler.stats.requests == 5
+    assert scheduler.stats.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_run_honors_retry_after(scheduler):
+    send = _sender((429, {"Retry-After": "0.01"}, {}), (200, {}, {}))
+
+    await scheduler.run(send)
+
+    assert scheduler.stats.backoff_seconds == pytest.approx(0.01)
+
+
+@pytest.mark.asyncio
+async def test_run_raises_on_non_retryable_status(scheduler):
+    send = _sender((404, {}, {"error": {"code": 404, "message": "Not Found"}}))
+
+    with pytest.raises(exceptions.CalendarAPIError) as error:
+        await scheduler.run(send)
+
+    assert error.value.status == 404
+    assert scheduler.stats.retries == 0
+    assert scheduler.stats.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_run_gives_up_after_max_retries():
+    scheduler = RequestScheduler(max_retries=2, base_delay=0)
+    send = _sender(*[(500, {}, {})] * 3)
+
+    with pytest.raises(exceptions.CalendarAPIError) as error:
+        await scheduler.run(send)
+
+    assert error.value.attempts == 3
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_when_empty():
+    bucket = TokenBucket(rate=100, capacity=1)
+
+    assert await bucket.acquire() == 0
+    assert await bucket.acquire() > 0
+
+
+def test_user_buckets_are_bounded():
+    scheduler = RequestScheduler(max_users=2)
+    first = scheduler._user_bucket("a")
+    scheduler._user_bucket("b")
+    assert scheduler._user_bucket("a") is first
+
+    scheduler._user_bucket("c")
+
+    assert list(scheduler._user_buckets) == ["a", "c"]
@@ -0,0 +1,116 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from google_calendar_analytics.collecting.collector import AsyncCalendarDataCollector
+from google_calendar_analytics.collecting.store import EventStore
+from google_calendar_analytics.core import exceptions
+
+
+def _event(event_id, start, end, **extra):
+    return {
+        "id": event_id,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+        **extra,
+    }
+
+
+@pytest.fixture()
+def store():
+    return EventStore()
+
+
+def test_apply_reports_changes(store):
+    first = _event("a", "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00")
+    store.apply("primary", [first])
+
+    updated = dict(first, summary="Updated")
+    new = _event("b", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00")
+    changes = store.apply(
+        "primary", [updated, new, {"id": "missing", "status": "cancelled"}]
+    )
+
+    assert changes.added == [new]
+    assert changes.modified == [(first, updated)]
+    assert changes.removed == []
+
+    changes = store.apply("primary", [{"id": "a", "status": "cancelled"}])
+    assert changes.removed == [updated]
+    assert len(store) == 1
+
+
+def test_events_between_filters_and_sorts(store):
+    store.apply(
+        "primary",
+        [
+            _event("late", "2023-03-05T09:00:00+00:00", "2023-03-05T10:00:00+00:00"),
+            _event("early", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00"),
+            _event("out", "2023-04-01T09:00:00+00:00", "2023-04-01T10:00:00+00:00"),
+        ],
+    )
+
+    events = store.events_between("primary", datetime(2023, 3, 1), datetime(2023, 3, 31))
+
+    assert [event["id"] for event in events] == ["early", "late"]
+
+
+@pytest.mark.asyncio
+async def test_sync_uses_token_after_full_sync(store):
+    collector = AsyncCalendarDataCollector(
+        Credentials(token="token"), MagicMock(), store=store
+    )
+    responses = [
+        {
+            "items": [
+                _event("a", "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00")
+            ],
+            "nextSyncToken": "token-1",
+        },
+        {"items": [{"id": "a", "status": "cancelled"}], "nextSyncToken": "token-2"},
+    ]
+    collector._make_request = AsyncMock(side_effect=responses)
+
+    changes = await collector.sync()
+    assert len(changes.added) == 1
+
+    changes = await collector.sync()
+    assert len(changes.removed) == 1
+    assert store.sync_token("primary") == "token-2"
+
+    second_request = collector._make_request.await_args_list[1].args[0]
+    query = parse_qs(urlparse(second_request.uri).query)
+    assert query["syncToken"] == ["token-1"]
+
+
+@pytest.mark.asyncio
+async def test_sync_falls_back_to_full_sync_on_gone(store):
+    collector = AsyncCalendarDataCollector(
+        Credentials(token="token"), MagicMock(), store=store
+    )
+    store.apply(
+        "primary",
+        [_event("stale", "2023-03-01T09:00:00+00:00", "2023-03-01T10:00:00+00:00")],
+    )
+    store.set_sync_token("primary", "expired")
+    collector._make_request = AsyncMock(
+        side_effect=[
+            exceptions.CalendarAPIError(410, "Gone"),
+            {
+                "items": [
+                    _event(
+                        "fresh", "2023-03-02T09:00:00+00:00", "2023-03-02T10:00:00+00:00"
+                    )
+                ],
+                "nextSyncToken": "token-1",
+            },
+        ]
+    )
+
+    events = await collector.collect_data(datetime(2023, 3, 1), datetime(2023, 3, 31))
+
+    assert [event["id"] for event in events] == ["fresh"]
+    assert store.sync_token("primary") == "token-1"
@@ -0,0 +1,77 @@
+import asyncio
+import datetime
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from google_calendar_analytics.collecting.collector import AsyncCalendarDataCollector
+from google_calendar_analytics.collecting.tokens import TokenRefresher
+
+
+class FakeCredentials:
+    def __init__(self, expires_in: float):
+        self.token = "token-0"
+        self.refresh_token = "refresh"
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in)
+        self.refresh_calls = 0
+
+    def refresh(self, request):
+        time.sleep(0.05)
+        self.refresh_calls += 1
+        self.token = f"token-{self.refresh_calls}"
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+async def test_token_refreshes_proactively_once_for_concurrent_callers():
+    creds = FakeCredentials(expires_in=10)
+    refresher = TokenRefresher(creds, margin=60)
+
+    tokens = await asyncio.gather(*(refresher.token() for _ in range(10)))
+
+    assert tokens == ["token-1"] * 10
+    assert creds.refresh_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_token_is_not_refreshed_far_from_expiry():
+    creds = FakeCredentials(expires_in=3600)
+
+    assert await TokenRefresher(creds, margin=60).token() == "token-0"
+    assert creds.refresh_calls == 0
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status, self.headers, self._body = status, {}, body
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_make_request_replays_once_after_unauthorized():
+    creds = FakeCredentials(expires_in=3600)
+    session = MagicMock()
+    sent_tokens = []
+
+    def get(url, headers):
+        sent_tokens.append(headers["Authorization"])
+        if headers["Authorization"] == "Bearer token-0":
+            return FakeResponse(401, b'{"error": {"code": 401}}')
+        return FakeResponse(200, b'{"items": []}')
+
+    session.get = get
+    collector = AsyncCalendarDataCollector(creds, session)
+
+    response = await collector._make_request(collector.endpoints.calendar_list())
+
+    assert response == {"items": []}
+    assert sent_tokens == ["Bearer token-0", "Bearer token-1"]
@@ -0,0 +1,12 @@
+import datetime
+
+import pytest
+
+from google_calendar_analytics.testing.mock_server import generate_events
+
+
+@pytest.fixture()
+def events():
+    return generate_events(
+        2000, datetime.datetime(2022, 1, 1), datetime.datetime(2022, 4, 1)
+    )
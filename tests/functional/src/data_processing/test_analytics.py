@@ -0,0 +1,242 @@
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from google_calendar_analytics import analytics, reports
+from google_calendar_analytics.analytics import AnalysisSpec, AnalyzerFacade
+from google_calendar_analytics.collecting.pool import SessionPool
+from google_calendar_analytics.collecting.scheduler import RequestScheduler
+from google_calendar_analytics.core import exceptions
+from google_calendar_analytics.processing.columnar import EventColumns
+from google_calendar_analytics.processing.memo import TransformCache
+from google_calendar_analytics.processing.summary_index import SummaryIndex
+from google_calendar_analytics.reports import ReportJob, run_reports
+from google_calendar_analytics.testing.mock_server import MockCalendarServer, generate_events
+
+START_TIME = datetime(2022, 1, 1)
+END_TIME = datetime(2023, 1, 1)
+
+
+@pytest.fixture()
+def events():
+    return generate_events(6000, START_TIME, END_TIME)
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_collects_the_union_range_once(events):
+    march = (datetime(2022, 3, 1), datetime(2022, 4, 1))
+    specs = [
+        AnalysisSpec("many", START_TIME, END_TIME, "Pie"),
+        AnalysisSpec("many", *march, "Bar", max_events=3),
+        AnalysisSpec("many", *march, "Pie", ascending=True),
+    ]
+
+    async with MockCalendarServer({"primary": events}) as server:
+        async with AnalyzerFacade(
+            Credentials(token="token"), base_url=server.base_url
+        ) as analyzer:
+            figures = await analyzer.analyze_batch(specs)
+            batch_requests = server.stats.requests
+
+            separate = [
+                await analyzer.analyze_many(START_TIME, END_TIME, plot_type="Pie"),
+                await analyzer.analyze_many(*march, plot_type="Bar", max_events=3),
+                await analyzer.analyze_many(*march, plot_type="Pie", ascending=True),
+            ]
+
+    # 6000 events fill three pages for the year, and one page for each month.
+    assert batch_requests == 3
+    assert server.stats.requests - batch_requests == 3 + 1 + 1
+    assert [figure.to_json() for figure in figures] == [
+        figure.to_json() for figure in separate
+    ]
+
+
+class _FramePlot:
+    @classmethod
+    async def create(cls, plot_type, style_class=None):
+        return cls()
+
+    async def plot(self, events, event_name=None):
+        return events
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_shares_the_summary_index(events, monkeypatch):
+    specs = [
+        AnalysisSpec("one", START_TIME, END_TIME, "Line", event_name="meeting", match="casefold"),
+        AnalysisSpec("one", START_TIME, END_TIME, "Line", event_name="Code", match="prefix"),
+        AnalysisSpec("one", START_TIME, END_TIME, "Line", event_name="Programming"),
+    ]
+    built = []
+    from_frame = SummaryIndex.from_frame
+
+    def counting_from_frame(frame):
+        built.append(len(frame))
+        return from_frame(frame)
+
+    monkeypatch.setattr(SummaryIndex, "from_frame", counting_from_frame)
+    # Plot the aggregated frames as they are, only their rows matter here.
+    monkeypatch.setattr(analytics, "PlotFactory", _FramePlot.create)
+    async with MockCalendarServer({"primary": events}) as server:
+        async with AnalyzerFacade(
+            Credentials(token="token"), base_url=server.base_url
+        ) as analyzer:
+            meeting, review, programming = await analyzer.analyze_batch(specs)
+            indexed = list(built)
+            separate = await analyzer.analyze_one(
+                START_TIME, END_TIME, "Meeting", plot_type="Line"
+            )
+
+    assert indexed == [len(events)]
+    assert meeting.equals(separate)
+    assert len(review) and len(programming)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyses_on_one_facade_keep_their_options(events):
+    async with MockCalendarServer({"primary": events}) as server:
+        async with AnalyzerFacade(
+            Credentials(token="token"), base_url=server.base_url
+        ) as analyzer:
+            pie, bar = await asyncio.gather(
+                analyzer.analyze_many(START_TIME, END_TIME, plot_type="Pie"),
+                analyzer.analyze_many(START_TIME, END_TIME, plot_type="Bar", max_events=2),
+            )
+
+    assert pie.data[0].type == "pie"
+    assert len(pie.data[0].labels) == 5
+    assert bar.data[0].type == "bar"
+    assert len(bar.data[0].x) == 2
+
+
+def test_analysis_spec_validates_plot_type():
+    with pytest.raises(exceptions.InvalidPlotTypeError):
+        AnalysisSpec("many", START_TIME, END_TIME, "Line")
+    with pytest.raises(ValueError):
+        AnalysisSpec("one", START_TIME, END_TIME, "Line")
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_runs_interval_analyses(events):
+    async with MockCalendarServer({"primary": events}) as server:
+        async with AnalyzerFacade(
+            Credentials(token="token"), base_url=server.base_url
+        ) as analyzer:
+            (pie,) = await analyzer.analyze_batch(
+                [AnalysisSpec("intervals", START_TIME, END_TIME, "Pie")]
+            )
+
+    assert list(pie.data[0].labels) == ["Busy", "Double-booked", "Free"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_counts_untitled_events_as_busy_time():
+    untitled = generate_events(1, datetime(2022, 3, 1, 10), datetime(2022, 3, 1, 11))[0]
+    del untitled["summary"]
+    titled = {**untitled, "id": "titled", "summary": "Meeting"}
+    specs = [
+        AnalysisSpec("many", START_TIME, END_TIME, "Pie"),
+        AnalysisSpec("intervals", START_TIME, END_TIME, "Pie"),
+    ]
+    async with MockCalendarServer({"primary": [titled, untitled]}) as server:
+        async with AnalyzerFacade(
+            Credentials(token="token"), base_url=server.base_url
+        ) as analyzer:
+            many, intervals = await analyzer.analyze_batch(specs)
+
+    assert list(many.data[0].labels) == ["Meeting"]
+    # The untitled event is a copy of the titled one, so all the busy time overlaps.
+    totals = dict(zip(intervals.data[0].labels, intervals.data[0].values))
+    assert totals["Busy"] == 0
+    assert totals["Double-booked"] > 0
+
+
+@pytest.mark.asyncio
+async def test_run_reports_renders_in_worker_processes(events):
+    specs = [
+        AnalysisSpec("many", START_TIME, END_TIME, "Pie"),
+        AnalysisSpec("intervals", START_TIME, END_TIME, "Bar"),
+    ]
+    async with MockCalendarServer({"primary": events}) as server:
+        async with AnalyzerFacade(
+            Credentials(token="token"), base_url=server.base_url
+        ) as analyzer:
+            expected = await analyzer.analyze_batch(specs)
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            reports = await run_reports(
+                [ReportJob(Credentials(token=f"user{user}"), specs) for user in range(3)],
+                executor=executor,
+                scheduler=RequestScheduler(project_rate=1e6, user_rate=1e6, base_delay=0),
+                base_url=server.base_url,
+            )
+
+    assert len(reports) == 3
+    for figures in reports:
+        assert [json.loads(figure.to_json()) for figure in figures] == [
+            json.loads(figure.to_json()) for figure in expected
+        ]
+
+
+@pytest.mark.asyncio
+async def test_run_reports_owns_its_default_pool_and_executor(events, monkeypatch):
+    pools = []
+
+    class RecordingPool(SessionPool):
+        def __init__(self):
+            super().__init__()
+            pools.append(self)
+
+    monkeypatch.setattr(reports, "SessionPool", RecordingPool)
+    specs = [AnalysisSpec("many", START_TIME, END_TIME, "Pie")]
+    async with MockCalendarServer({"primary": events}) as server:
+        (figures,) = await run_reports(
+            [ReportJob(Credentials(token="token"), specs)],
+            max_workers=1,
+            scheduler=RequestScheduler(project_rate=1e6, user_rate=1e6, base_delay=0),
+            base_url=server.base_url,
+        )
+
+    assert figures[0].data[0].type == "pie"
+    assert len(pools) == 1
+    assert pools[0].stats.borrows == 1
+    assert pools[0]._session is None
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_reuses_cached_results(events, monkeypatch):
+    cache = TransformCache()
+    specs = [
+        AnalysisSpec("many", START_TIME, END_TIME, "Pie"),
+        AnalysisSpec("many", START_TIME, END_TIME, "Bar"),
+    ]
+    normalized = []
+    from_events = EventColumns.from_events
+
+    def counting_from_events(events, **kwargs):
+        normalized.append(len(events))
+        return from_events(events, **kwargs)
+
+    monkeypatch.setattr(EventColumns, "from_events", counting_from_events)
+    async with MockCalendarServer({"primary": events}) as server:
+        async with AnalyzerFacade(
+            Credentials(token="token"), base_url=server.base_url, transform_cache=cache
+        ) as analyzer:
+            first = await analyzer.analyze_batch(specs)
+            second = await analyzer.analyze_batch(specs)
+            assert len(normalized) == 1
+
+            server.put_event(
+                "primary", {**events[0], "summary": "Renamed", "etag": '"renamed"'}
+            )
+            third = await analyzer.analyze_batch(specs)
+
+    assert (cache.stats.misses, cache.stats.hits) == (2, 4)
+    assert len(normalized) == 2
+    assert list(second[0].data[0].labels) == list(first[0].data[0].labels)
+    assert list(third[0].data[0].labels) == list(first[0].data[0].labels)
@@ -0,0 +1,97 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from google_calendar_analytics.collecting.decoding import flatten_events
+from google_calendar_analytics.processing.columnar import EventColumns
+from google_calendar_analytics.processing.frame import events_to_frame
+from google_calendar_analytics.processing.transformer import (
+    EventDurationPeriodsStrategy,
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+
+
+def test_extend_page_by_page_matches_one_batch(events):
+    columns = EventColumns()
+    for offset in range(0, len(events), 300):
+        columns.extend(events[offset:offset + 300])
+
+    batch = EventColumns.from_events(events)
+
+    assert len(columns) == len(batch) == len(events)
+    assert columns.summaries == batch.summaries
+    assert (columns.start == batch.start).all()
+    assert (columns.summary_codes == batch.summary_codes).all()
+    assert columns.nbytes == 32 * len(events)
+
+
+def test_to_frame_matches_events_to_frame(events):
+    expected = events_to_frame(events)
+    frame = EventColumns.from_events(flatten_events(events)).to_frame()
+
+    pd.testing.assert_frame_equal(frame, expected)
+
+
+def test_pickle_sends_arrays_not_events(events):
+    columns = EventColumns()
+    for offset in range(0, len(events), 300):
+        columns.extend(events[offset:offset + 300])
+
+    data = pickle.dumps(columns)
+    restored = pickle.loads(data)
+
+    assert len(data) < len(pickle.dumps(events)) / 4
+    pd.testing.assert_frame_equal(restored.to_frame(), columns.to_frame())
+    assert len(restored.to_frame(summary="Meeting")) == len(columns.to_frame(summary="Meeting"))
+    assert len(pickle.loads(pickle.dumps(EventColumns()))) == 0
+
+
+def test_to_frame_filters_summary(events):
+    columns = EventColumns.from_events(events)
+
+    assert set(columns.to_frame(summary="Meeting")["summary"]) == {"Meeting"}
+    assert len(columns.to_frame(summary="Unknown")) == 0
+    assert len(EventColumns().to_frame()) == 0
+
+
+def test_columns_keep_local_day_and_calendar():
+    columns = EventColumns.from_events(
+        [
+            {
+                "summary": "Late",
+                "calendarId": "work",
+                "start": {"dateTime": "2022-03-17T23:30:00-05:00"},
+                "end": {"dateTime": "2022-03-18T00:30:00-05:00"},
+            },
+            {"summary": "All day", "start": {"date": "2022-03-18"}, "end": {"date": "2022-03-19"}},
+        ]
+    )
+
+    frame = columns.to_frame()
+
+    assert len(columns) == 1
+    assert frame["day"].iloc[0] == pd.Timestamp("2022-03-17")
+    assert frame["start"].iloc[0] == pd.Timestamp("2022-03-18T04:30:00Z")
+    assert frame["calendar_id"].iloc[0] == "work"
+
+
+@pytest.mark.asyncio
+async def test_strategies_accept_columns(events):
+    columns = EventColumns.from_events(events)
+
+    many = await ManyEventsDurationStrategy().calculate_duration(columns)
+    one = await OneEventDurationStrategy().calculate_duration(columns, event_name="Meeting")
+
+    pd.testing.assert_frame_equal(
+        many, await ManyEventsDurationStrategy().calculate_duration(events)
+    )
+    pd.testing.assert_frame_equal(
+        one,
+        await OneEventDurationStrategy().calculate_duration(events, event_name="Meeting"),
+    )
+    with pytest.raises(ValueError):
+        await EventDurationPeriodsStrategy().calculate_duration(
+            columns, event_name="Meeting", period_days=7, num_periods=2
+        )
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from google_calendar_analytics.collecting.decoding import flatten_events
+from google_calendar_analytics.processing.frame import events_to_frame
+from google_calendar_analytics.processing.transformer import (
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+from google_calendar_analytics.testing.benchmark import loop_many, loop_one
+
+
+def test_events_to_frame_mixed_offsets():
+    events = [
+        {
+            "summary": "Late",
+            "start": {"dateTime": "2022-03-17T23:30:00-05:00"},
+            "end": {"dateTime": "2022-03-18T01:00:00.500-05:00"},
+        },
+        {
+            "summary": "Early",
+            "start": {"dateTime": "2022-03-18T00:15:00Z"},
+            "end": {"dateTime": "2022-03-18T00:45:00Z"},
+        },
+        {"summary": "All day", "start": {"date": "2022-03-18"}, "end": {"date": "2022-03-19"}},
+    ]
+
+    frame = events_to_frame(events)
+
+    assert list(frame["summary"]) == ["Late", "Early"]
+    assert frame["start"].iloc[0] == pd.Timestamp("2022-03-18T04:30:00Z")
+    assert list(frame["duration"]) == [1.5, 0.5]
+    # The day is the local date the event starts on, not the UTC one.
+    assert list(frame["day"].dt.strftime("%m.%d")) == ["03.17", "03.18"]
+
+
+def test_events_to_frame_filters_summary(events):
+    frame = events_to_frame(events)
+    meetings = events_to_frame(events, summary="Meeting")
+
+    assert set(meetings["summary"]) == {"Meeting"}
+    assert len(meetings) == (frame["summary"] == "Meeting").sum()
+    assert events_to_frame(frame, summary="Meeting")["duration"].sum() == pytest.approx(
+        meetings["duration"].sum()
+    )
+
+
+@pytest.mark.asyncio
+async def test_vectorized_strategies_match_loop(events):
+    expected_many = await loop_many(events, max_events=8)
+    expected_one = await loop_one(events, "Meeting")
+
+    for source in (events, flatten_events(events)):
+        many = await ManyEventsDurationStrategy().calculate_duration(source, max_events=8)
+        one = await OneEventDurationStrategy().calculate_duration(
+            source, event_name="Meeting"
+        )
+
+        assert dict(zip(many["Event"], many["Duration"])) == pytest.approx(
+            dict(zip(expected_many["Event"], expected_many["Duration"]))
+        )
+        assert dict(zip(one["Date"], one["Duration"])) == pytest.approx(
+            dict(zip(expected_one["Date"], expected_one["Duration"]))
+        )
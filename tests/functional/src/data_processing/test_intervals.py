@@ -0,0 +1,172 @@
+import datetime
+import random
+
+import numpy as np
+import pytest
+
+from google_calendar_analytics.processing.frame import events_to_frame
+from google_calendar_analytics.processing.intervals import (
+    BusyTimeStrategy,
+    FreeTimeStrategy,
+    IntervalTotalsStrategy,
+    daily_sweep,
+)
+
+
+def _event(start, end, summary="Meeting"):
+    return {
+        "summary": summary,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end},
+    }
+
+
+@pytest.fixture()
+def events():
+    return [
+        _event("2023-03-01T09:00:00+00:00", "2023-03-01T11:00:00+00:00"),
+        _event("2023-03-01T10:00:00+00:00", "2023-03-01T12:00:00+00:00"),
+        _event("2023-03-01T10:30:00+00:00", "2023-03-01T10:45:00+00:00"),
+        _event("2023-03-01T12:00:00+00:00", "2023-03-01T13:00:00+00:00"),
+        _event("2023-03-02T23:00:00+00:00", "2023-03-03T01:00:00+00:00"),
+    ]
+
+
+def test_daily_sweep_metrics(events):
+    daily = daily_sweep(events_to_frame(events))
+
+    assert daily["Date"].tolist() == [
+        datetime.date(2023, 3, 1),
+        datetime.date(2023, 3, 2),
+        datetime.date(2023, 3, 3),
+    ]
+    assert daily["Busy"].tolist() == [4.0, 1.0, 1.0]
+    assert daily["Overlap"].tolist() == [1.0, 0.0, 0.0]
+    assert daily["MaxConcurrent"].tolist() == [3, 1, 1]
+    assert daily["Free"].tolist() == [5.0, 9.0, 9.0]
+    assert daily["LongestFree"].tolist() == [5.0, 9.0, 9.0]
+
+
+def test_daily_sweep_uses_local_days(events):
+    daily = daily_sweep(events_to_frame(events), timezone="Europe/Berlin")
+
+    assert daily["Busy"].tolist() == [4.0, 0.0, 2.0]
+    # Free from 9:00 to 10:00 and from 14:00 to 18:00, Berlin time.
+    assert daily["Free"].tolist()[0] == 5.0
+    assert daily["LongestFree"].tolist()[0] == 4.0
+
+
+def test_daily_sweep_matches_a_minute_grid():
+    rng = random.Random(0)
+    base = datetime.datetime(2023, 3, 1, tzinfo=datetime.timezone.utc)
+    events = []
+    for _ in range(300):
+        start = base + datetime.timedelta(minutes=15 * rng.randrange(4 * 24 * 5))
+        end = start + datetime.timedelta(minutes=15 * rng.randrange(1, 12))
+        events.append(_event(start.isoformat(), end.isoformat()))
+
+    grid = np.zeros(6 * 24 * 60, dtype=int)
+    for event in events:
+        start = datetime.datetime.fromisoformat(event["start"]["dateTime"])
+        end = datetime.datetime.fromisoformat(event["end"]["dateTime"])
+        grid[int((start - base).total_seconds() // 60):int((end - base).total_seconds() // 60)] += 1
+
+    daily = daily_sweep(events_to_frame(events), work_hours=(0, 24))
+
+    for index, row in daily.iterrows():
+        minutes = grid[index * 1440:(index + 1) * 1440]
+        assert row["Busy"] == pytest.approx((minutes >= 1).sum() / 60, abs=0.01)
+        assert row["Overlap"] == pytest.approx((minutes >= 2).sum() / 60, abs=0.01)
+        assert row["MaxConcurrent"] == minutes.max()
+        assert row["Free"] == pytest.approx((minutes == 0).sum() / 60, abs=0.01)
+        assert row["LongestFree"] == pytest.approx(_longest_run(minutes == 0) / 60, abs=0.01)
+
+
+def _longest_run(mask):
+    longest = current = 0
+    for value in mask:
+        current = current + 1 if value else 0
+        longest = max(longest, current)
+    return longest
+
+
+def test_daily_sweep_splits_free_blocks_at_midnight():
+    events = [
+        _event("2023-03-01T12:00:00+00:00", "2023-03-01T13:00:00+00:00"),
+        _event("2023-03-03T10:00:00+00:00", "2023-03-03T11:00:00+00:00"),
+    ]
+
+    daily = daily_sweep(events_to_frame(events), work_hours=(0, 24))
+
+    assert daily["Free"].tolist() == [23.0, 24.0, 23.0]
+    assert daily["LongestFree"].tolist() == [12.0, 24.0, 13.0]
+
+
+def test_daily_sweep_covers_the_time_range(events):
+    daily = daily_sweep(
+        events_to_frame(events),
+        start_time=datetime.datetime(2023, 2, 28),
+        end_time=datetime.datetime(2023, 3, 3),
+    )
+
+    # The free day before the first event is reported, the event that runs past the
+    # end of the range only counts until midnight.
+    assert daily["Date"].tolist() == [
+        datetime.date(2023, 2, 28),
+        datetime.date(2023, 3, 1),
+        datetime.date(2023, 3, 2),
+    ]
+    assert daily["Busy"].tolist() == [0.0, 4.0, 1.0]
+    assert daily["Free"].tolist() == [9.0, 5.0, 9.0]
+    assert daily["LongestFree"].tolist() == [9.0, 5.0, 9.0]
+
+
+def test_daily_sweep_clips_events_to_a_partial_day(events):
+    daily = daily_sweep(
+        events_to_frame(events),
+        start_time=datetime.datetime(2023, 3, 1, 10, 30, tzinfo=datetime.timezone.utc),
+        end_time=datetime.datetime(2023, 3, 1, 16, tzinfo=datetime.timezone.utc),
+    )
+
+    assert daily["Busy"].tolist() == [2.5]
+    assert daily["Overlap"].tolist() == [0.5]
+    assert daily["Free"].tolist() == [3.0]
+
+
+def test_daily_sweep_of_a_range_without_events():
+    daily = daily_sweep(
+        events_to_frame([]),
+        start_time=datetime.datetime(2023, 3, 1),
+        end_time=datetime.datetime(2023, 3, 3),
+    )
+
+    assert daily["Busy"].tolist() == [0.0, 0.0]
+    assert daily["Free"].tolist() == [9.0, 9.0]
+
+
+@pytest.mark.asyncio
+async def test_interval_strategies_count_untitled_events():
+    untitled = _event("2023-03-01T10:30:00+00:00", "2023-03-01T12:00:00+00:00")
+    del untitled["summary"]
+    events = [_event("2023-03-01T10:00:00+00:00", "2023-03-01T11:00:00+00:00"), untitled]
+
+    busy = await BusyTimeStrategy().calculate_duration(events)
+    free = await IntervalTotalsStrategy().calculate_duration(events)
+
+    assert BusyTimeStrategy.required_fields == ("start", "end")
+    assert busy["Duration"].tolist() == [2.0]
+    assert free.set_index("Event")["Duration"]["Free"] == 7.0
+
+
+@pytest.mark.asyncio
+async def test_interval_strategies_feed_the_plots(events):
+    busy = await BusyTimeStrategy().calculate_duration(events)
+    free = await FreeTimeStrategy().calculate_duration(events, work_hours=(8, 12))
+    totals = await IntervalTotalsStrategy().calculate_duration(events)
+
+    assert busy.columns.tolist() == ["Date", "Duration"]
+    assert busy["Duration"].tolist() == [4.0, 1.0, 1.0]
+    assert free["Duration"].tolist() == [1.0, 4.0, 4.0]
+    assert totals["Event"].tolist() == ["Busy", "Double-booked", "Free"]
+    assert totals["Duration"].tolist() == [5.0, 1.0, 23.0]
+    assert (await BusyTimeStrategy().calculate_duration([])).empty
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from google_calendar_analytics.collecting.decoding import flatten_events
+from google_calendar_analytics.processing.columnar import EventColumns
+from google_calendar_analytics.processing.memo import TransformCache, event_fingerprint
+from google_calendar_analytics.processing.transformer import (
+    AsyncDataTransformer,
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+
+
+def test_fingerprint_follows_the_content(events):
+    for convert in (list, flatten_events, EventColumns.from_events):
+        assert event_fingerprint(convert(events)) == event_fingerprint(convert(list(events)))
+
+    changed = [{**events[0], "etag": '"changed"'}] + events[1:]
+    assert event_fingerprint(changed) != event_fingerprint(events)
+    assert event_fingerprint(events[:-1]) != event_fingerprint(events)
+
+    records = flatten_events(events)
+    retitled = [records[0]._replace(summary="Other")] + records[1:]
+    assert event_fingerprint(retitled) != event_fingerprint(records)
+
+
+@pytest.mark.asyncio
+async def test_transformer_memoizes_by_events_and_parameters(events):
+    cache = TransformCache()
+    transformer = AsyncDataTransformer(cache=cache)
+    transformer.set_strategy(ManyEventsDurationStrategy())
+
+    first = await transformer.calculate_duration(events, max_events=3)
+    first.loc[0, "Duration"] = -1.0
+    second = await transformer.calculate_duration(list(events), max_events=3)
+    other = await transformer.calculate_duration(events, max_events=4)
+
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+    assert len(second) == 3 and second["Duration"].min() > 0
+    assert len(other) == 4
+
+    transformer.set_strategy(OneEventDurationStrategy())
+    await transformer.calculate_duration(events, event_name="Meeting")
+    assert cache.stats.misses == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used_and_expired(events):
+    cache = TransformCache(maxsize=2, ttl=60)
+    strategy = ManyEventsDurationStrategy()
+
+    with patch("google_calendar_analytics.processing.memo.time.monotonic", return_value=0):
+        for max_events in (1, 2):
+            await cache.calculate_duration(strategy, events, max_events=max_events)
+        await cache.calculate_duration(strategy, events, max_events=1)
+        await cache.calculate_duration(strategy, events, max_events=3)
+
+        assert cache.stats.evictions == 1
+        assert cache.get(cache.key(strategy, event_fingerprint(events), max_events=2)) is None
+        assert isinstance(
+            cache.get(cache.key(strategy, event_fingerprint(events), max_events=1)),
+            pd.DataFrame,
+        )
+
+    with patch("google_calendar_analytics.processing.memo.time.monotonic", return_value=61):
+        await cache.calculate_duration(strategy, events, max_events=1)
+
+    assert cache.stats.expirations == 1
+    assert len(cache) == 2
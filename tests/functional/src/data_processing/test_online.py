@@ -0,0 +1,128 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from google_calendar_analytics.collecting.store import EventChanges, EventStore
+from google_calendar_analytics.processing.frame import events_to_frame
+from google_calendar_analytics.processing.online import (
+    DailyTotals,
+    PeriodTotals,
+    SummaryTotals,
+)
+from google_calendar_analytics.processing.transformer import (
+    EventDurationPeriodsStrategy,
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+from google_calendar_analytics.testing.mock_server import generate_events
+
+
+def _changed(events):
+    """Drop, retitle and shift some events, as a sync would report them."""
+    removed = events[::7]
+    modified = []
+    for event in events[1::7]:
+        start = datetime.datetime.fromisoformat(event["start"]["dateTime"])
+        end = datetime.datetime.fromisoformat(event["end"]["dateTime"])
+        shifted = start + datetime.timedelta(days=2, minutes=30)
+        modified.append(
+            (
+                event,
+                {
+                    **event,
+                    "summary": "Meeting",
+                    "start": {"dateTime": shifted.isoformat()},
+                    "end": {"dateTime": (shifted + (end - start) * 2).isoformat()},
+                },
+            )
+        )
+    added = generate_events(
+        200, datetime.datetime(2022, 3, 1), datetime.datetime(2022, 4, 1), seed=1
+    )
+    added = [{**event, "id": f"new{event['id']}"} for event in added]
+
+    gone = {event["id"] for event in removed}
+    current = {event["id"]: event for event in events if event["id"] not in gone}
+    current.update({after["id"]: after for _, after in modified})
+    current.update({event["id"]: event for event in added})
+    return added, removed, modified, list(current.values())
+
+
+def test_summary_totals_match_recomputation(events):
+    added, removed, modified, current = _changed(events)
+    totals = SummaryTotals()
+    totals.apply(added=events)
+    totals.apply(added=added, removed=removed, modified=modified)
+
+    expected = ManyEventsDurationStrategy().calculate_frame(
+        events_to_frame(current), max_events=5, other=True
+    )
+    pd.testing.assert_frame_equal(totals.to_frame(max_events=5, other=True), expected)
+
+    totals.apply(removed=current)
+    assert len(totals) == 0
+
+
+def test_daily_and_period_totals_match_recomputation(events):
+    added, removed, modified, current = _changed(events)
+    daily = DailyTotals("Meeting")
+    periods = PeriodTotals(
+        "Meeting", period_days=7, num_periods=2, reference_date=datetime.date(2022, 3, 20)
+    )
+    for aggregate in (daily, periods):
+        aggregate.apply(added=events)
+        aggregate.apply(added=added, removed=removed, modified=modified)
+
+    frame = events_to_frame(current, summary="Meeting").sort_values("start")
+    expected = OneEventDurationStrategy().calculate_frame(frame, event_name="Meeting")
+    pd.testing.assert_frame_equal(daily.to_frame(), expected)
+
+    expected = EventDurationPeriodsStrategy().calculate_frame(
+        frame,
+        event_name="Meeting",
+        period_days=7,
+        num_periods=2,
+        reference_date=datetime.date(2022, 3, 20),
+    )
+    pd.testing.assert_frame_equal(periods.to_frame(), expected)
+
+
+def test_time_range_only_counts_overlapping_events(events):
+    start_time = datetime.datetime(2022, 2, 1)
+    end_time = datetime.datetime(2022, 3, 1)
+    totals = SummaryTotals(start_time=start_time, end_time=end_time)
+    totals.apply(added=events)
+
+    frame = events_to_frame(events)
+    inside = frame[
+        (frame["end"] > pd.Timestamp(start_time, tz="UTC"))
+        & (frame["start"] < pd.Timestamp(end_time, tz="UTC"))
+    ]
+    expected = inside["duration"].groupby(inside["summary"]).sum()
+    assert totals.totals()[expected.index].tolist() == pytest.approx(expected.tolist())
+
+
+def test_apply_changes_follows_the_store(events):
+    store = EventStore()
+    totals = SummaryTotals()
+    totals.apply_changes(store.apply("primary", events))
+
+    first = events[0]
+    changes = store.apply(
+        "primary",
+        [{"id": first["id"], "status": "cancelled"}, {**events[1], "summary": "Lunch"}],
+    )
+    totals.apply_changes(changes)
+
+    stored = store.events_between(
+        "primary", datetime.datetime(2022, 1, 1), datetime.datetime(2023, 1, 1)
+    )
+    expected = ManyEventsDurationStrategy().calculate_frame(
+        events_to_frame(stored), max_events=8
+    )
+    pd.testing.assert_frame_equal(totals.to_frame(max_events=8), expected)
+
+    # A full sync reports every event as added again.
+    totals.apply_changes(EventChanges(added=stored, reset=True))
+    pd.testing.assert_frame_equal(totals.to_frame(max_events=8), expected)
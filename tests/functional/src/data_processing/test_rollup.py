@@ -0,0 +1,81 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from google_calendar_analytics.processing.frame import events_to_frame
+from google_calendar_analytics.processing.rollup import RollupIndex
+from google_calendar_analytics.processing.transformer import (
+    ManyEventsDurationStrategy,
+    OneEventDurationStrategy,
+)
+
+
+def _in_range(events, start, end):
+    return [
+        event
+        for event in events
+        if start.isoformat() <= event["start"]["dateTime"][:10] <= end.isoformat()
+    ]
+
+
+def test_totals_match_a_scan_of_the_range(events):
+    index = RollupIndex.from_events(events)
+    start, end = datetime.date(2022, 2, 3), datetime.date(2022, 2, 20)
+
+    expected = events_to_frame(_in_range(events, start, end))
+    expected = expected["duration"].groupby(expected["summary"]).sum()
+
+    totals = index.totals(start, end)
+    assert totals[expected.index].tolist() == pytest.approx(expected.tolist())
+    assert index.total("Meeting", start, end) == pytest.approx(expected["Meeting"])
+    assert index.total("Unknown", start, end) == 0.0
+    assert index.totals(end, start).sum() == 0.0
+
+
+def test_strategies_on_rollup_match_event_scan(events):
+    index = RollupIndex.from_events(events)
+    start, end = datetime.date(2022, 3, 1), datetime.date(2022, 3, 10)
+    subset = _in_range(events, start, end)
+
+    many = ManyEventsDurationStrategy()
+    expected = many.calculate_frame(events_to_frame(subset), max_events=3)
+    result = many.calculate_rollup(index, start, end, max_events=3)
+    assert result["Event"].tolist() == expected["Event"].tolist()
+    assert result["Duration"].tolist() == pytest.approx(expected["Duration"].tolist())
+
+    one = OneEventDurationStrategy()
+    expected = one.calculate_frame(events_to_frame(subset), event_name="Meeting")
+    result = one.calculate_rollup(index, start, end, event_name="Meeting")
+    assert dict(zip(result["Date"], result["Duration"])) == pytest.approx(
+        dict(zip(expected["Date"], expected["Duration"]))
+    )
+
+
+def test_incremental_updates_grow_and_shrink(events):
+    early, late = events[:1000], events[1000:]
+    index = RollupIndex.from_events(late)
+    index.add(early)
+
+    full = RollupIndex.from_events(events)
+    assert index.first_day == full.first_day
+    assert index.last_day == full.last_day
+    pd.testing.assert_series_equal(
+        index.totals().sort_index(), full.totals().sort_index()
+    )
+
+    index.remove(early)
+    assert index.totals()[index.summaries].tolist() == pytest.approx(
+        RollupIndex.from_events(late).totals()[index.summaries].tolist()
+    )
+
+
+def test_serialization_round_trip(events):
+    index = RollupIndex.from_events(events)
+
+    restored = RollupIndex.from_bytes(index.to_bytes())
+
+    assert restored.summaries == index.summaries
+    assert restored.first_day == index.first_day
+    pd.testing.assert_series_equal(restored.daily("Meeting"), index.daily("Meeting"))
+    assert len(RollupIndex.from_bytes(RollupIndex().to_bytes())) == 0
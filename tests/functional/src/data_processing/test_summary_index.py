@@ -0,0 +1,86 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from google_calendar_analytics.processing.frame import events_to_frame
+from google_calendar_analytics.processing.summary_index import SummaryIndex
+from google_calendar_analytics.processing.transformer import (
+    EventDurationPeriodsStrategy,
+    OneEventDurationStrategy,
+)
+from google_calendar_analytics.testing.mock_server import generate_events
+
+SUMMARIES = (
+    "Project Alpha",
+    "project alpha",
+    "Project  Alpha ",
+    "Project Beta",
+    "Ｐroject Alpha",
+    "Review",
+)
+
+
+@pytest.fixture()
+def frame():
+    events = generate_events(
+        600,
+        datetime.datetime(2023, 3, 1),
+        datetime.datetime(2023, 3, 15),
+        summaries=SUMMARIES,
+    )
+    return events_to_frame(events)
+
+
+def _expected(frame, summaries):
+    return frame.index[frame["summary"].isin(summaries)].tolist()
+
+
+def test_positions_of_every_match_mode(frame):
+    index = SummaryIndex.from_frame(frame)
+
+    assert index.positions("Project Alpha").tolist() == _expected(frame, ["Project Alpha"])
+    assert index.positions("PROJECT ALPHA", match="casefold").tolist() == _expected(
+        frame, ["Project Alpha", "project alpha"]
+    )
+    assert sorted(index.names("project alpha", match="normalized")) == sorted(
+        ["Project Alpha", "project alpha", "Project  Alpha ", "Ｐroject Alpha"]
+    )
+    assert index.positions("Project", match="prefix").tolist() == _expected(
+        frame, ["Project Alpha", "Project  Alpha ", "Project Beta"]
+    )
+    assert index.positions(r"(?i)beta|^review$", match="regex").tolist() == _expected(
+        frame, ["Project Beta", "Review"]
+    )
+    assert len(index.positions("Unknown")) == 0
+    assert SummaryIndex(["Review", None, "Review"]).positions("Review").tolist() == [0, 2]
+    with pytest.raises(ValueError):
+        index.positions("Review", match="fuzzy")
+
+
+def test_strategies_use_the_index(frame):
+    index = SummaryIndex.from_frame(frame)
+    expected = OneEventDurationStrategy().calculate_frame(
+        frame[frame["summary"].isin(["Project Alpha", "project alpha"])],
+        event_name="Project Alpha",
+        match="casefold",
+    )
+
+    result = OneEventDurationStrategy().calculate_frame(
+        frame, event_name="project ALPHA", match="casefold", index=index
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+    periods = EventDurationPeriodsStrategy().calculate_frame(
+        frame,
+        event_name="Review",
+        period_days=7,
+        num_periods=2,
+        reference_date=datetime.date(2023, 3, 14),
+        index=index,
+    )
+    assert periods["Duration"].sum() == pytest.approx(
+        frame.loc[
+            (frame["summary"] == "Review") & (frame["day"] <= "2023-03-14"), "duration"
+        ].sum()
+    )
@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from google_calendar_analytics.collecting.decoding import flatten_events
+from google_calendar_analytics.processing.topk import SpaceSaving, top_k
+from google_calendar_analytics.processing.transformer import ManyEventsDurationStrategy
+
+
+def _event(summary, hours):
+    return {
+        "summary": summary,
+        "start": {"dateTime": "2023-03-01T09:00:00+00:00"},
+        "end": {"dateTime": f"2023-03-01T{9 + hours:02d}:00:00+00:00"},
+    }
+
+
+def test_top_k_matches_a_full_sort():
+    values = np.random.default_rng(0).integers(0, 50, 10_000).astype(float)
+
+    expected = sorted(range(len(values)), key=lambda index: (-values[index], index))[:20]
+    assert top_k(values, 20).tolist() == expected
+
+    expected = sorted(range(len(values)), key=lambda index: (values[index], index))[:20]
+    assert top_k(values, 20, ascending=True).tolist() == expected
+    assert top_k(values[:3], 5).tolist() == [int(i) for i in np.argsort(-values[:3], kind="stable")]
+    assert len(top_k(values, 0)) == 0
+
+
+def test_space_saving_finds_the_heavy_hitters():
+    rng = random.Random(0)
+    stream = [("heavy-a", 3.0)] * 400 + [("heavy-b", 2.0)] * 300
+    stream += [(f"noise-{rng.randrange(5000)}", 1.0) for _ in range(3000)]
+    rng.shuffle(stream)
+
+    sketch = SpaceSaving(capacity=50)
+    for key, weight in stream:
+        sketch.update(key, weight)
+
+    top = sketch.top(2)
+    assert [key for key, _, _ in top] == ["heavy-a", "heavy-b"]
+    for key, estimate, error in top:
+        true_total = sum(weight for name, weight in stream if name == key)
+        assert estimate - error <= true_total <= estimate
+    assert len(sketch) == 50
+    assert sketch.total == pytest.approx(sum(weight for _, weight in stream))
+
+
+@pytest.mark.asyncio
+async def test_many_events_strategy_other_bucket():
+    events = [_event("A", 4), _event("B", 3), _event("C", 2), _event("D", 1)]
+
+    result = await ManyEventsDurationStrategy().calculate_duration(
+        events, max_events=2, other=True
+    )
+
+    assert result["Event"].tolist() == ["A", "B", "Other"]
+    assert result["Duration"].tolist() == [4.0, 3.0, 3.0]
+
+    everything = await ManyEventsDurationStrategy().calculate_duration(
+        events, max_events=10, other=True
+    )
+    assert "Other" not in everything["Event"].tolist()
+
+
+@pytest.mark.asyncio
+async def test_many_events_strategy_stream_matches_exact_result():
+    events = [_event(f"Task {index % 7}", 1 + index % 3) for index in range(700)]
+
+    async def pages():
+        for offset in range(0, len(events), 100):
+            yield flatten_events(events[offset:offset + 100])
+
+    strategy = ManyEventsDurationStrategy()
+    approximate = await strategy.calculate_stream(pages(), max_events=3, capacity=20, other=True)
+    exact = await strategy.calculate_duration(events, max_events=3, other=True)
+
+    assert approximate.equals(exact)
@@ -1,6 +1,9 @@
+import datetime
+
 import pandas as pd
 import pytest
 
+from google_calendar_analytics.collecting.decoding import EventRecord, flatten_events
 from google_calendar_analytics.processing.transformer import (
     AsyncDataTransformer,
     EventDurationPeriodsStrategy,
@@ -105,3 +108,127 @@ async def test_async_data_transformer_no_strategy(
 ):
     with pytest.raises(ValueError):
         await async_data_transformer.calculate_duration(sample_events)
+
+
+@pytest.mark.asyncio
+async def test_many_events_duration_strategy_by_calendar(
+    many_events_duration_strategy, sample_events
+):
+    events = [
+        dict(sample_events[0], calendarId="work"),
+        dict(sample_events[0], calendarId="home"),
+        dict(sample_events[1], calendarId="work"),
+    ]
+
+    merged = await many_events_duration_strategy.calculate_duration(events)
+    split = await many_events_duration_strategy.calculate_duration(
+        events, by_calendar=True
+    )
+
+    assert dict(zip(merged["Event"], merged["Duration"])) == {
+        "Event 1": 4.0,
+        "Event 2": 3.0,
+    }
+    assert dict(zip(split["Event"], split["Duration"])) == {
+        "Event 1 (work)": 2.0,
+        "Event 1 (home)": 2.0,
+        "Event 2 (work)": 3.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_strategies_accept_event_records(
+    many_events_duration_strategy, one_event_duration_strategy, sample_events
+):
+    records = flatten_events(sample_events) + [
+        EventRecord("all-day", "Event 1", "2022-03-17", "2022-03-18", True),
+        EventRecord("untitled", None, "2022-03-17T09:00:00+00:00", "2022-03-17T10:00:00+00:00", False),
+    ]
+
+    many = await many_events_duration_strategy.calculate_duration(records, max_events=3)
+    one = await one_event_duration_strategy.calculate_duration(records, event_name="Event 1")
+
+    assert all(many["Duration"].values == [4.0, 3.0, 2.0])
+    assert all(one["Duration"].values == [2.0])
+
+
+def _daily_events(name, first_day, days, hours=1):
+    return [
+        {
+            "summary": name,
+            "start": {"dateTime": f"{first_day + datetime.timedelta(days=offset)}T09:00:00+02:00"},
+            "end": {"dateTime": f"{first_day + datetime.timedelta(days=offset)}T{9 + hours:02d}:00:00+02:00"},
+        }
+        for offset in range(days)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_event_duration_periods_strategy_rolling_periods(
+    event_duration_periods_strategy,
+):
+    events = _daily_events("Focus", datetime.date(2023, 1, 1), 60)
+
+    result = await event_duration_periods_strategy.calculate_duration(
+        events,
+        event_name="Focus",
+        period_days=7,
+        num_periods=3,
+        reference_date=datetime.date(2023, 2, 15),
+    )
+
+    assert len(result) == 21
+    assert result["Date"].min() == datetime.date(2023, 1, 26)
+    assert result["Date"].max() == datetime.date(2023, 2, 15)
+    latest = result[result["Period"] == 0]
+    assert latest["Date"].min() == datetime.date(2023, 2, 9)
+    assert sorted(latest["Day"]) == list(range(1, 8))
+    assert set(result["Duration"]) == {1.0}
+
+
+@pytest.mark.asyncio
+async def test_event_duration_periods_strategy_weeks_and_months(
+    event_duration_periods_strategy,
+):
+    events = _daily_events("Focus", datetime.date(2023, 1, 1), 90)
+
+    weeks = await event_duration_periods_strategy.calculate_duration(
+        events,
+        event_name="Focus",
+        period_days=7,
+        num_periods=2,
+        reference_date=datetime.date(2023, 3, 8),  # a Wednesday
+        mode="week",
+    )
+    assert weeks["Period"].tolist() == [1] * 7 + [0] * 3
+    assert weeks["Day"].tolist() == list(range(1, 8)) + [1, 2, 3]
+    assert weeks["Date"].iloc[0] == datetime.date(2023, 2, 27)
+
+    months = await event_duration_periods_strategy.calculate_duration(
+        events,
+        event_name="Focus",
+        period_days=7,
+        num_periods=3,
+        reference_date=datetime.date(2023, 3, 10),
+        mode="month",
+    )
+    assert months.groupby("Period")["Day"].max().to_dict() == {0: 10, 1: 28, 2: 31}
+
+
+@pytest.mark.asyncio
+async def test_event_duration_periods_strategy_many_periods(
+    event_duration_periods_strategy,
+):
+    events = _daily_events("Focus", datetime.date(2020, 1, 1), 1200)
+
+    result = await event_duration_periods_strategy.calculate_duration(
+        events,
+        event_name="Focus",
+        period_days=14,
+        num_periods=80,
+        reference_date=datetime.date(2023, 4, 1),
+    )
+
+    assert len(result) == 80 * 14
+    assert result["Period"].nunique() == 80
+    assert (result.groupby("Period")["Day"].max() == 14).all()
@@ -0,0 +1,197 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import aiohttp
+import pytest
+from google.oauth2.credentials import Credentials
+
+from google_calendar_analytics.collecting.collector import AsyncCalendarDataCollector
+from google_calendar_analytics.collecting.scheduler import RequestScheduler
+from google_calendar_analytics.collecting.store import EventStore
+from google_calendar_analytics.testing.load import run_load
+from google_calendar_analytics.testing.mock_server import (
+    MockCalendarServer,
+    generate_events,
+)
+
+START_TIME = datetime(2022, 1, 1)
+END_TIME = datetime(2023, 1, 1)
+
+
+@pytest.fixture()
+def events():
+    return generate_events(6000, START_TIME, END_TIME)
+
+
+def _collector(session, server, **kwargs):
+    return AsyncCalendarDataCollector(
+        Credentials(token="token"),
+        session,
+        base_url=server.base_url,
+        scheduler=RequestScheduler(project_rate=1e6, user_rate=1e6, base_delay=0),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_collect_data_walks_every_page(events):
+    async with MockCalendarServer({"primary": events}) as server:
+        async with aiohttp.ClientSession() as session:
+            collector = _collector(session, server)
+            collected = await collector.collect_data(
+                START_TIME, END_TIME, fields=("summary", "start", "end")
+            )
+
+    assert [event["id"] for event in collected] == [event["id"] for event in events]
+    assert set(collected[0]) == {"id", "status", "summary", "start", "end"}
+    assert server.stats.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_collect_data_sharded_matches_serial(events):
+    async with MockCalendarServer({"primary": events}) as server:
+        async with aiohttp.ClientSession() as session:
+            collector = _collector(session, server)
+            serial = await collector.collect_data(START_TIME, END_TIME)
+            sharded = await collector.collect_data(START_TIME, END_TIME, shards=12)
+
+    assert [event["id"] for event in sharded] == [event["id"] for event in serial]
+
+
+@pytest.mark.asyncio
+async def test_collect_data_retries_injected_rate_limits(events):
+    async with MockCalendarServer({"primary": events}, rate_limit_every=2) as server:
+        async with aiohttp.ClientSession() as session:
+            collector = _collector(session, server)
+            collected = await collector.collect_data(START_TIME, END_TIME)
+
+    assert len(collected) == len(events)
+    assert server.stats.rate_limited == collector.scheduler.stats.retries > 0
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_fetches_only_changes(events):
+    async with MockCalendarServer({"primary": events}) as server:
+        async with aiohttp.ClientSession() as session:
+            collector = _collector(session, server, store=EventStore())
+            await collector.sync()
+
+            server.put_event("primary", {**events[0], "summary": "Renamed"})
+            server.delete_event("primary", events[1]["id"])
+            served_before = server.stats.events_served
+            changes = await collector.sync()
+
+    assert [new["summary"] for _, new in changes.modified] == ["Renamed"]
+    assert [event["id"] for event in changes.removed] == [events[1]["id"]]
+    assert server.stats.events_served - served_before == 2
+    assert len(collector.store) == len(events) - 1
+
+
+@pytest.mark.asyncio
+async def test_run_load_reports_throughput():
+    events = generate_events(500, START_TIME, END_TIME)
+    async with MockCalendarServer({"primary": events}) as server:
+        report = await run_load(server, START_TIME, END_TIME, analyses=6, concurrency=3)
+
+    assert report.analyses == 6
+    assert report.errors == 0
+    # The memory pass runs three more analyses, which are not counted.
+    assert report.requests == 6
+    assert server.stats.requests == 6 + 3
+    assert report.p99_latency >= report.p50_latency > 0
+    assert report.peak_memory_mb > 0
+
+
+def _recurring_events():
+    standup = {
+        "id": "standup",
+        "summary": "Standup",
+        "start": {"dateTime": "2022-01-03T10:00:00+01:00", "timeZone": "Europe/Berlin"},
+        "end": {"dateTime": "2022-01-03T10:15:00+01:00", "timeZone": "Europe/Berlin"},
+        "recurrence": ["RRULE:FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR"],
+    }
+    planning = {
+        "id": "planning",
+        "summary": "Planning",
+        "start": {"dateTime": "2022-01-05T15:00:00+00:00", "timeZone": "UTC"},
+        "end": {"dateTime": "2022-01-05T16:00:00+00:00", "timeZone": "UTC"},
+        "recurrence": [
+            "RRULE:FREQ=WEEKLY;UNTIL=20220601T000000Z",
+            "EXDATE:20220112T150000Z",
+        ],
+    }
+    moved = {
+        "id": "standup_20220301T090000Z",
+        "summary": "Standup",
+        "recurringEventId": "standup",
+        "originalStartTime": {"dateTime": "2022-03-01T10:00:00+01:00"},
+        "start": {"dateTime": "2022-03-01T11:00:00+01:00"},
+        "end": {"dateTime": "2022-03-01T11:30:00+01:00"},
+    }
+    cancelled = {
+        "id": "standup_20220302T090000Z",
+        "status": "cancelled",
+        "recurringEventId": "standup",
+        "originalStartTime": {"dateTime": "2022-03-02T10:00:00+01:00"},
+    }
+    return [standup, planning, moved, cancelled] + generate_events(500, START_TIME, END_TIME)
+
+
+def _standup_instances():
+    """The instances of the standup the API returns with singleEvents=true."""
+    berlin = ZoneInfo("Europe/Berlin")
+    day, instances = date(2022, 1, 3), []
+    while day < date(2023, 1, 1):
+        start = datetime(day.year, day.month, day.day, 10, tzinfo=berlin)
+        event_id = f"standup_{start.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+        if day == date(2022, 3, 1):
+            instances.append((event_id, "2022-03-01T10:00:00+00:00", "2022-03-01T10:30:00+00:00"))
+        elif day != date(2022, 3, 2) and day.weekday() < 5:
+            end = start + timedelta(minutes=15)
+            instances.append((event_id, _utc(start), _utc(end)))
+        day += timedelta(days=1)
+    return instances
+
+
+def _utc(moment):
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+PLANNING_DAYS = [
+    "01-05", "01-19", "01-26", "02-02", "02-09", "02-16", "02-23", "03-02", "03-09", "03-16",
+    "03-23", "03-30", "04-06", "04-13", "04-20", "04-27", "05-04", "05-11", "05-18", "05-25",
+]
+
+
+@pytest.mark.asyncio
+async def test_expand_recurring_matches_server_expansion():
+    async with MockCalendarServer({"primary": _recurring_events()}) as server:
+        async with aiohttp.ClientSession() as session:
+            collector = _collector(session, server, expand_recurring=True)
+            events = await collector.collect_data(
+                START_TIME, END_TIME, fields=("summary", "start", "end")
+            )
+
+    recurring = sorted(
+        (
+            event["id"],
+            _utc(datetime.fromisoformat(event["start"]["dateTime"])),
+            _utc(datetime.fromisoformat(event["end"]["dateTime"])),
+        )
+        for event in events
+        if not event["id"].startswith("event")
+    )
+    planning = [
+        (f"planning_2022{day.replace('-', '')}T150000Z", f"2022-{day}T15:00:00+00:00",
+         f"2022-{day}T16:00:00+00:00")
+        for day in PLANNING_DAYS
+    ]
+    assert recurring == sorted(planning + _standup_instances())
+    # Berlin switches to summer time on 2022-03-27, the standup keeps its wall clock.
+    assert ("standup_20220325T090000Z", "2022-03-25T09:00:00+00:00",
+            "2022-03-25T09:15:00+00:00") in recurring
+    assert ("standup_20220328T080000Z", "2022-03-28T08:00:00+00:00",
+            "2022-03-28T08:15:00+00:00") in recurring
+    # 260 weekdays minus the cancelled standup, 21 Wednesdays minus the EXDATE.
+    assert len(events) == 500 + 259 + 20
+    assert server.stats.events_served == 500 + 4